@@ -3,5 +3,10 @@
 
 from .core import SCADExporter
 from .utils import CM_TO_MM, sanitize_name, format_value
+from .snapshot import SNAPSHOT_VERSION, load_snapshot, save_snapshot
+from .fragment_cache import FragmentCache
 
-__all__ = ['SCADExporter', 'CM_TO_MM', 'sanitize_name', 'format_value']
+__all__ = [
+    'SCADExporter', 'CM_TO_MM', 'sanitize_name', 'format_value',
+    'SNAPSHOT_VERSION', 'load_snapshot', 'save_snapshot', 'FragmentCache'
+]
@@ -0,0 +1,8 @@
+#Author: Fusion2SCAD
+#Description: Command-line entry point: python -m exporter SNAPSHOT_DIR
+
+import sys
+
+from .batch import main
+
+sys.exit(main())
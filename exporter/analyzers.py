@@ -1,74 +1,32 @@
 #Author: Fusion2SCAD
 #Description: Feature analysis functions for Fusion 360 to OpenSCAD export
+#
+# Analyzers work on records captured by exporter.capture (or loaded from a
+# snapshot file), so they run the same inside Fusion and headless.
 
 import math
-import adsk.core
-import adsk.fusion
 
 from .utils import CM_TO_MM, get_rotation_matrix_from_axis
 
-
-def extract_sketch_geometry(sketch: adsk.fusion.Sketch) -> dict:
-    """Extract geometry from a Fusion 360 sketch"""
-    geometry = {
-        'lines': [],
-        'circles': [],
-        'arcs': [],
-        'rectangles': [],
-        'points': [],
-        'profiles': []
-    }
-
-    # Extract sketch curves
-    for curve in sketch.sketchCurves:
-        if isinstance(curve, adsk.fusion.SketchLine):
-            start = curve.startSketchPoint.geometry
-            end = curve.endSketchPoint.geometry
-            geometry['lines'].append({
-                'start': (start.x * CM_TO_MM, start.y * CM_TO_MM),
-                'end': (end.x * CM_TO_MM, end.y * CM_TO_MM)
-            })
-        elif isinstance(curve, adsk.fusion.SketchCircle):
-            center = curve.centerSketchPoint.geometry
-            geometry['circles'].append({
-                'center': (center.x * CM_TO_MM, center.y * CM_TO_MM),
-                'radius': curve.radius * CM_TO_MM
-            })
-        elif isinstance(curve, adsk.fusion.SketchArc):
-            center = curve.centerSketchPoint.geometry
-            geometry['arcs'].append({
-                'center': (center.x * CM_TO_MM, center.y * CM_TO_MM),
-                'radius': curve.radius * CM_TO_MM,
-                'start_angle': math.degrees(curve.startAngle),
-                'end_angle': math.degrees(curve.endAngle)
-            })
-
-    # Try to detect rectangles from sketch profiles
-    for profile in sketch.profiles:
-        loops = profile.profileLoops
-        for loop in loops:
-            curves = loop.profileCurves
-            if len(curves) == 4:
-                all_lines = all(isinstance(c.sketchEntity, adsk.fusion.SketchLine) for c in curves)
-                if all_lines:
-                    bbox = profile.boundingBox
-                    min_pt = bbox.minPoint
-                    max_pt = bbox.maxPoint
-                    width = (max_pt.x - min_pt.x) * CM_TO_MM
-                    height = (max_pt.y - min_pt.y) * CM_TO_MM
-                    center_x = (min_pt.x + max_pt.x) / 2 * CM_TO_MM
-                    center_y = (min_pt.y + max_pt.y) / 2 * CM_TO_MM
-                    geometry['rectangles'].append({
-                        'width': width,
-                        'height': height,
-                        'center': (center_x, center_y)
-                    })
-
-    return geometry
-
-
-def analyze_profile(profile: adsk.fusion.Profile) -> dict:
-    """Analyze a sketch profile to determine its shape"""
+# adsk.fusion.FeatureOperations values
+OPERATION_NAMES = {
+    0: 'JoinFeatureOperation',
+    1: 'CutFeatureOperation',
+    2: 'IntersectFeatureOperation',
+    3: 'NewBodyFeatureOperation',
+    4: 'NewComponentFeatureOperation'
+}
+
+# adsk.fusion.HoleTypes values
+HOLE_TYPE_NAMES = {
+    0: 'SimpleHole',
+    1: 'CounterboreHole',
+    2: 'CountersinkHole'
+}
+
+
+def analyze_profile(profile: dict) -> dict:
+    """Analyze a captured sketch profile to determine its shape"""
     info = {
         'shape': 'polygon',
         'bbox': None,
@@ -76,52 +34,42 @@ def analyze_profile(profile: adsk.fusion.Profile) -> dict:
         'is_circle': False,
         'is_rectangle': False,
         'is_rounded_rect': False,
-        'profile_obj': profile
+        'profile_data': profile
     }
 
-    bbox = profile.boundingBox
-    min_pt = bbox.minPoint
-    max_pt = bbox.maxPoint
+    min_pt = profile['bbox']['min']
+    max_pt = profile['bbox']['max']
 
-    width = (max_pt.x - min_pt.x) * CM_TO_MM
-    height = (max_pt.y - min_pt.y) * CM_TO_MM
-    center_x = (min_pt.x + max_pt.x) / 2 * CM_TO_MM
-    center_y = (min_pt.y + max_pt.y) / 2 * CM_TO_MM
+    width = (max_pt[0] - min_pt[0]) * CM_TO_MM
+    height = (max_pt[1] - min_pt[1]) * CM_TO_MM
+    center_x = (min_pt[0] + max_pt[0]) / 2 * CM_TO_MM
+    center_y = (min_pt[1] + max_pt[1]) / 2 * CM_TO_MM
 
     info['bbox'] = {'width': width, 'height': height}
     info['center'] = (center_x, center_y)
 
     # Check if it's a circle
-    loops = profile.profileLoops
-    if loops.count == 1:
-        curves = loops.item(0).profileCurves
-        if curves.count == 1:
-            entity = curves.item(0).sketchEntity
-            if isinstance(entity, adsk.fusion.SketchCircle):
+    loops = profile['loops']
+    if len(loops) == 1:
+        curves = loops[0]['curves']
+        if len(curves) == 1:
+            curve = curves[0]
+            if curve['type'] == 'SketchCircle':
                 info['is_circle'] = True
                 info['shape'] = 'circle'
-                info['radius'] = entity.radius * CM_TO_MM
-        elif curves.count == 4:
-            all_lines = all(
-                isinstance(curves.item(i).sketchEntity, adsk.fusion.SketchLine)
-                for i in range(4)
-            )
+                info['radius'] = curve['radius'] * CM_TO_MM
+        elif len(curves) == 4:
+            all_lines = all(c['type'] == 'SketchLine' for c in curves)
             if all_lines:
                 info['is_rectangle'] = True
                 info['shape'] = 'rectangle'
 
-        elif curves.count == 8:
-            lines = []
-            arcs = []
-            for i in range(curves.count):
-                entity = curves.item(i).sketchEntity
-                if isinstance(entity, adsk.fusion.SketchLine):
-                    lines.append(entity)
-                elif isinstance(entity, adsk.fusion.SketchArc):
-                    arcs.append(entity)
+        elif len(curves) == 8:
+            lines = [c for c in curves if c['type'] == 'SketchLine']
+            arcs = [c for c in curves if c['type'] == 'SketchArc']
 
             if len(lines) == 4 and len(arcs) == 4:
-                radii = [arc.radius * CM_TO_MM for arc in arcs]
+                radii = [arc['radius'] * CM_TO_MM for arc in arcs]
                 if max(radii) - min(radii) < 0.01:
                     info['is_rounded_rect'] = True
                     info['shape'] = 'rounded_rect'
@@ -133,19 +81,19 @@ def analyze_profile(profile: adsk.fusion.Profile) -> dict:
 def get_operation_type(operation) -> str:
     """Convert Fusion operation type to OpenSCAD equivalent"""
     op_map = {
-        adsk.fusion.FeatureOperations.NewBodyFeatureOperation: 'new',
-        adsk.fusion.FeatureOperations.JoinFeatureOperation: 'union',
-        adsk.fusion.FeatureOperations.CutFeatureOperation: 'difference',
-        adsk.fusion.FeatureOperations.IntersectFeatureOperation: 'intersection'
+        3: 'new',           # NewBodyFeatureOperation
+        0: 'union',         # JoinFeatureOperation
+        1: 'difference',    # CutFeatureOperation
+        2: 'intersection'   # IntersectFeatureOperation
     }
     return op_map.get(operation, 'union')
 
 
-def analyze_extrude_feature(feature: adsk.fusion.ExtrudeFeature) -> dict:
-    """Analyze an extrude feature and determine best BOSL2 representation"""
+def analyze_extrude_feature(feature: dict) -> dict:
+    """Analyze a captured extrude feature and determine best BOSL2 representation"""
     result = {
         'type': 'extrude',
-        'operation': get_operation_type(feature.operation),
+        'operation': get_operation_type(feature['operation']),
         'height': None,
         'profiles': [],
         'is_symmetric': False,
@@ -157,116 +105,75 @@ def analyze_extrude_feature(feature: adsk.fusion.ExtrudeFeature) -> dict:
     }
 
     # Get extrusion extent
-    extent_def = feature.extentOne
-    if isinstance(extent_def, adsk.fusion.DistanceExtentDefinition):
-        result['height'] = extent_def.distance.value * CM_TO_MM
+    extent = feature['extent_one']
+    if extent and extent['type'] == 'distance':
+        result['height'] = extent['value'] * CM_TO_MM
 
     # Check for symmetric extrusion
-    if feature.extentTwo:
+    if feature['has_extent_two']:
         result['is_symmetric'] = True
 
     # Get taper angle if present
-    if feature.taperAngleOne:
-        result['taper_angle'] = math.degrees(feature.taperAngleOne.value)
+    if feature['taper_angle_one']:
+        result['taper_angle'] = math.degrees(feature['taper_angle_one']['value'])
 
     # Get the sketch plane orientation and origin
-    try:
-        profiles = feature.profile
-        profile = profiles if isinstance(profiles, adsk.fusion.Profile) else profiles.item(0)
-        sketch = profile.parentSketch
-
-        if sketch:
-            origin = sketch.origin
-            result['plane_origin'] = (
-                origin.x * CM_TO_MM,
-                origin.y * CM_TO_MM,
-                origin.z * CM_TO_MM
-            )
-
-            transform = sketch.transform
-            if transform:
-                cs = transform.getAsCoordinateSystem()
-                origin_pt, x_axis, y_axis, z_axis = cs
-
-                result['sketch_transform'] = {
-                    'origin': (origin_pt.x, origin_pt.y, origin_pt.z),
-                    'x_axis': (x_axis.x, x_axis.y, x_axis.z),
-                    'y_axis': (y_axis.x, y_axis.y, y_axis.z),
-                    'z_axis': (z_axis.x, z_axis.y, z_axis.z)
-                }
-
-                result['plane_normal'] = (z_axis.x, z_axis.y, z_axis.z)
-
-                nx, ny, nz = z_axis.x, z_axis.y, z_axis.z
-                tolerance = 0.001
-
-                if abs(nz - 1) < tolerance or abs(nz + 1) < tolerance:
-                    result['sketch_plane'] = 'XY'
-                elif abs(ny - 1) < tolerance or abs(ny + 1) < tolerance:
-                    result['sketch_plane'] = 'XZ'
-                elif abs(nx - 1) < tolerance or abs(nx + 1) < tolerance:
-                    result['sketch_plane'] = 'YZ'
-                else:
-                    result['sketch_plane'] = 'CUSTOM'
-    except:
-        pass
+    sketch = feature.get('sketch')
+    if sketch:
+        ox, oy, oz = sketch['origin']
+        result['plane_origin'] = (ox * CM_TO_MM, oy * CM_TO_MM, oz * CM_TO_MM)
+
+        transform = sketch['transform']
+        if transform:
+            result['sketch_transform'] = {
+                'origin': tuple(transform['origin']),
+                'x_axis': tuple(transform['x_axis']),
+                'y_axis': tuple(transform['y_axis']),
+                'z_axis': tuple(transform['z_axis'])
+            }
+
+            nx, ny, nz = transform['z_axis']
+            result['plane_normal'] = (nx, ny, nz)
+
+            tolerance = 0.001
+
+            if abs(nz - 1) < tolerance or abs(nz + 1) < tolerance:
+                result['sketch_plane'] = 'XY'
+            elif abs(ny - 1) < tolerance or abs(ny + 1) < tolerance:
+                result['sketch_plane'] = 'XZ'
+            elif abs(nx - 1) < tolerance or abs(nx + 1) < tolerance:
+                result['sketch_plane'] = 'YZ'
+            else:
+                result['sketch_plane'] = 'CUSTOM'
 
     # Analyze the profile to determine shape type
-    profiles = feature.profile
-    if isinstance(profiles, adsk.fusion.Profile):
-        profile_info = analyze_profile(profiles)
-        result['profiles'].append(profile_info)
-    else:
-        try:
-            for i in range(profiles.count):
-                profile = profiles.item(i)
-                if isinstance(profile, adsk.fusion.Profile):
-                    profile_info = analyze_profile(profile)
-                    result['profiles'].append(profile_info)
-        except:
-            try:
-                for profile in profiles:
-                    if isinstance(profile, adsk.fusion.Profile):
-                        profile_info = analyze_profile(profile)
-                        result['profiles'].append(profile_info)
-            except:
-                pass
+    for profile in feature['profiles']:
+        result['profiles'].append(analyze_profile(profile))
 
     return result
 
 
-def analyze_revolve_feature(feature: adsk.fusion.RevolveFeature) -> dict:
-    """Analyze a revolve feature"""
+def analyze_revolve_feature(feature: dict) -> dict:
+    """Analyze a captured revolve feature"""
     result = {
         'type': 'revolve',
-        'operation': get_operation_type(feature.operation),
+        'operation': get_operation_type(feature['operation']),
         'angle': 360,
         'profiles': []
     }
 
-    extent_def = feature.extentDefinition
-    if isinstance(extent_def, adsk.fusion.AngleExtentDefinition):
-        result['angle'] = math.degrees(extent_def.angle.value)
+    extent = feature['extent']
+    if extent and extent['type'] == 'angle':
+        result['angle'] = math.degrees(extent['value'])
 
-    profiles = feature.profile
-    if isinstance(profiles, adsk.fusion.Profile):
-        profile_info = analyze_profile(profiles)
-        result['profiles'].append(profile_info)
-    else:
-        try:
-            for i in range(profiles.count):
-                profile = profiles.item(i)
-                if isinstance(profile, adsk.fusion.Profile):
-                    profile_info = analyze_profile(profile)
-                    result['profiles'].append(profile_info)
-        except:
-            pass
+    for profile in feature['profiles']:
+        result['profiles'].append(analyze_profile(profile))
 
     return result
 
 
-def analyze_hole_feature(feature: adsk.fusion.HoleFeature) -> dict:
-    """Analyze a hole feature by inspecting its geometry"""
+def analyze_hole_feature(feature: dict) -> dict:
+    """Analyze a captured hole feature"""
     result = {
         'type': 'hole',
         'hole_type': 'simple',  # simple, countersink, counterbore
@@ -282,115 +189,106 @@ def analyze_hole_feature(feature: adsk.fusion.HoleFeature) -> dict:
         'counterbore_depth': 0
     }
 
-    try:
-        if feature.holeDiameter:
-            result['diameter'] = feature.holeDiameter.value * CM_TO_MM
-
-        # Detect hole type
-        hole_type = feature.holeType
-        if hole_type == adsk.fusion.HoleTypes.CountersinkHoleType:
-            result['hole_type'] = 'countersink'
-            if feature.countersinkAngle:
-                result['countersink_angle'] = math.degrees(feature.countersinkAngle.value)
-            if feature.countersinkDiameter:
-                result['countersink_diameter'] = feature.countersinkDiameter.value * CM_TO_MM
-        elif hole_type == adsk.fusion.HoleTypes.CounterboreHoleType:
-            result['hole_type'] = 'counterbore'
-            if feature.counterboreDiameter:
-                result['counterbore_diameter'] = feature.counterboreDiameter.value * CM_TO_MM
-            if feature.counterboreDepth:
-                result['counterbore_depth'] = feature.counterboreDepth.value * CM_TO_MM
-
-        extent = feature.extentDefinition
-        if isinstance(extent, adsk.fusion.DistanceExtentDefinition):
-            result['depth'] = extent.distance.value * CM_TO_MM
-        elif isinstance(extent, adsk.fusion.ThroughAllExtentDefinition):
-            result['depth'] = 200
-
-        start_pos = None
-        if feature.position:
-            p = feature.position
-            start_pos = (p.x * CM_TO_MM, p.y * CM_TO_MM, p.z * CM_TO_MM)
-
-        faces = feature.faces
-        for i in range(faces.count):
-            face = faces.item(i)
-            geom = face.geometry
-            if isinstance(geom, adsk.core.Cylinder):
-                origin = geom.origin
-                axis = geom.axis
-
-                if not start_pos:
-                    start_pos = (
-                        origin.x * CM_TO_MM,
-                        origin.y * CM_TO_MM,
-                        origin.z * CM_TO_MM
-                    )
-
-                if result['matrix'] is None:
-                    result['matrix'] = get_rotation_matrix_from_axis(axis)
-
-                break
-
-        if start_pos:
-            result['positions'].append(start_pos)
-
-    except:
-        pass
+    if feature['diameter']:
+        result['diameter'] = feature['diameter']['value'] * CM_TO_MM
+
+    # Detect hole type
+    hole_type = HOLE_TYPE_NAMES.get(feature['hole_type'])
+    if hole_type == 'CountersinkHole':
+        result['hole_type'] = 'countersink'
+        if feature.get('countersink_angle'):
+            result['countersink_angle'] = math.degrees(feature['countersink_angle']['value'])
+        if feature.get('countersink_diameter'):
+            result['countersink_diameter'] = feature['countersink_diameter']['value'] * CM_TO_MM
+    elif hole_type == 'CounterboreHole':
+        result['hole_type'] = 'counterbore'
+        if feature.get('counterbore_diameter'):
+            result['counterbore_diameter'] = feature['counterbore_diameter']['value'] * CM_TO_MM
+        if feature.get('counterbore_depth'):
+            result['counterbore_depth'] = feature['counterbore_depth']['value'] * CM_TO_MM
+
+    extent = feature['extent']
+    if extent and extent['type'] == 'distance':
+        result['depth'] = extent['value'] * CM_TO_MM
+    elif extent and extent['type'] == 'through_all':
+        result['depth'] = 200
+
+    start_pos = None
+    if feature['position']:
+        x, y, z = feature['position']
+        start_pos = (x * CM_TO_MM, y * CM_TO_MM, z * CM_TO_MM)
+
+    cylinder = feature['cylinder']
+    if cylinder:
+        if not start_pos:
+            x, y, z = cylinder['origin']
+            start_pos = (x * CM_TO_MM, y * CM_TO_MM, z * CM_TO_MM)
+
+        result['matrix'] = get_rotation_matrix_from_axis(cylinder['axis'])
+
+    if start_pos:
+        result['positions'].append(start_pos)
 
     return result
 
 
-def classify_edge(edge, body_bbox_min_z, body_bbox_max_z) -> str:
-    """Classify an edge as TOP, BOTTOM, Z (vertical), or None.
+def classify_edge(edge: dict) -> str:
+    """Classify a captured edge as TOP, BOTTOM, Z (vertical), or None.
 
     Returns one of: 'TOP', 'BOTTOM', 'Z', or None if unclassifiable.
     """
-    try:
-        geom = edge.geometry
-        evaluator = geom.evaluator
+    start_pt = edge['start']
+    end_pt = edge['end']
+    if start_pt is None or end_pt is None or edge['body_z_range'] is None:
+        return None
 
-        # Get start and end points of the edge
-        ret, start_param, end_param = evaluator.getParameterExtents()
-        if not ret:
-            return None
+    body_bbox_min_z, body_bbox_max_z = edge['body_z_range']
 
-        ret, start_pt = evaluator.getPointAtParameter(start_param)
-        ret2, end_pt = evaluator.getPointAtParameter(end_param)
-        if not ret or not ret2:
-            return None
+    # Calculate edge direction vector
+    dx = abs(end_pt[0] - start_pt[0])
+    dy = abs(end_pt[1] - start_pt[1])
+    dz = abs(end_pt[2] - start_pt[2])
 
-        # Calculate edge direction vector
-        dx = abs(end_pt.x - start_pt.x)
-        dy = abs(end_pt.y - start_pt.y)
-        dz = abs(end_pt.z - start_pt.z)
+    tolerance = 0.001  # 0.01mm tolerance
 
-        tolerance = 0.001  # 0.01mm tolerance
+    # Check if edge is vertical (parallel to Z axis)
+    if dx < tolerance and dy < tolerance and dz > tolerance:
+        return 'Z'
 
-        # Check if edge is vertical (parallel to Z axis)
-        if dx < tolerance and dy < tolerance and dz > tolerance:
-            return 'Z'
+    # Check if edge is horizontal (lies in XY plane)
+    if dz < tolerance:
+        # Get the Z position of this edge
+        edge_z = (start_pt[2] + end_pt[2]) / 2
 
-        # Check if edge is horizontal (lies in XY plane)
-        if dz < tolerance:
-            # Get the Z position of this edge
-            edge_z = (start_pt.z + end_pt.z) / 2
+        # Compare to body bounds (with small tolerance)
+        z_tolerance = 0.01  # 0.1mm
 
-            # Compare to body bounds (with small tolerance)
-            z_tolerance = 0.01  # 0.1mm
+        if abs(edge_z - body_bbox_max_z) < z_tolerance:
+            return 'TOP'
+        elif abs(edge_z - body_bbox_min_z) < z_tolerance:
+            return 'BOTTOM'
 
-            if abs(edge_z - body_bbox_max_z) < z_tolerance:
-                return 'TOP'
-            elif abs(edge_z - body_bbox_min_z) < z_tolerance:
-                return 'BOTTOM'
+    return None
 
-        return None
-    except:
-        return None
+
+def _analyze_edge_modifier(feature: dict, result: dict) -> dict:
+    """Fill affected bodies and edge types shared by fillets and chamfers"""
+    # Affected bodies come from faces (more reliable than edges)
+    for body in feature['affected_bodies']:
+        result['affected_body_names'].add(body['name'])
+        result['affected_bodies'].add(body['token'])
+
+    # Edges may not have been accessible due to timeline issues
+    for edge in feature['edges'] or []:
+        edge_type = classify_edge(edge)
+        if edge_type:
+            result['edge_types'].add(edge_type)
+
+    return result
 
 
-def analyze_fillet_feature(feature: adsk.fusion.FilletFeature) -> dict:
-    """Analyze a fillet feature and track which bodies it affects.
+def analyze_fillet_feature(feature: dict) -> dict:
+    """Analyze a captured fillet feature and track which bodies it affects.
 
     Classifies edges into BOSL2 edge selector categories:
     - 'Z': vertical edges
@@ -406,58 +304,15 @@ def analyze_fillet_feature(feature: adsk.fusion.FilletFeature) -> dict:
         'affected_body_names': set()  # Body names (more stable)
     }
 
-    # Get radius from edge sets
-    edge_sets = feature.edgeSets
-    if edge_sets.count > 0:
-        edge_set = edge_sets.item(0)
-        if isinstance(edge_set, adsk.fusion.ConstantRadiusFilletEdgeSet):
-            result['radius'] = edge_set.radius.value * CM_TO_MM
-
-    # Get affected bodies from faces (more reliable than edges)
-    try:
-        faces = feature.faces
-        for i in range(faces.count):
-            face = faces.item(i)
-            if face.body:
-                result['affected_body_names'].add(face.body.name)
-                result['affected_bodies'].add(face.body.entityToken)
-    except:
-        pass
-
-    # Try to get edge types from edges (may fail due to timeline issues)
-    if edge_sets.count > 0:
-        edge_set = edge_sets.item(0)
-        if isinstance(edge_set, adsk.fusion.ConstantRadiusFilletEdgeSet):
-            try:
-                edges = edge_set.edges
-
-                # Collect body bounding boxes for edge classification
-                body_bounds = {}
-                for body_name in result['affected_body_names']:
-                    # Get bounds from design bodies
-                    pass  # We'll skip edge classification if edges aren't accessible
-
-                # Classify each edge
-                for edge in edges:
-                    body = edge.body
-                    if body:
-                        bbox = body.boundingBox
-                        edge_type = classify_edge(
-                            edge,
-                            bbox.minPoint.z,
-                            bbox.maxPoint.z
-                        )
-                        if edge_type:
-                            result['edge_types'].add(edge_type)
-            except:
-                # Edges not accessible, that's OK - we still have body names
-                pass
+    # Radius comes from the first constant radius edge set
+    if feature['radius']:
+        result['radius'] = feature['radius']['value'] * CM_TO_MM
 
-    return result
+    return _analyze_edge_modifier(feature, result)
 
 
-def analyze_chamfer_feature(feature: adsk.fusion.ChamferFeature) -> dict:
-    """Analyze a chamfer feature and track which bodies it affects.
+def analyze_chamfer_feature(feature: dict) -> dict:
+    """Analyze a captured chamfer feature and track which bodies it affects.
 
     Classifies edges into BOSL2 edge selector categories:
     - 'Z': vertical edges
@@ -472,45 +327,109 @@ def analyze_chamfer_feature(feature: adsk.fusion.ChamferFeature) -> dict:
         'affected_body_names': set()  # Body names (more stable)
     }
 
-    # Get distance from edge sets
-    edge_sets = feature.edgeSets
-    if edge_sets.count > 0:
-        edge_set = edge_sets.item(0)
-        if isinstance(edge_set, adsk.fusion.EqualDistanceChamferEdgeSet):
-            result['distance'] = edge_set.distance.value * CM_TO_MM
-
-    # Get affected bodies from faces (more reliable than edges)
-    try:
-        faces = feature.faces
-        for i in range(faces.count):
-            face = faces.item(i)
-            if face.body:
-                result['affected_body_names'].add(face.body.name)
-                result['affected_bodies'].add(face.body.entityToken)
-    except:
-        pass
-
-    # Try to get edge types from edges (may fail due to timeline issues)
-    if edge_sets.count > 0:
-        edge_set = edge_sets.item(0)
-        if isinstance(edge_set, adsk.fusion.EqualDistanceChamferEdgeSet):
-            try:
-                edges = edge_set.edges
-
-                # Classify each edge
-                for edge in edges:
-                    body = edge.body
-                    if body:
-                        bbox = body.boundingBox
-                        edge_type = classify_edge(
-                            edge,
-                            bbox.minPoint.z,
-                            bbox.maxPoint.z
-                        )
-                        if edge_type:
-                            result['edge_types'].add(edge_type)
-            except:
-                # Edges not accessible, that's OK - we still have body names
-                pass
+    # Distance comes from the first equal distance edge set
+    if feature['distance']:
+        result['distance'] = feature['distance']['value'] * CM_TO_MM
+
+    return _analyze_edge_modifier(feature, result)
+
+
+def _element_angle(transform: list, axis: tuple) -> float:
+    """Rotation angle (degrees) of a row-major 4x4 transform about a unit axis"""
+    cos_a = (transform[0] + transform[5] + transform[10] - 1) / 2
+    sin_a = (
+        axis[0] * (transform[9] - transform[6]) +
+        axis[1] * (transform[2] - transform[8]) +
+        axis[2] * (transform[4] - transform[1])
+    ) / 2
+    return math.degrees(math.atan2(sin_a, cos_a))
+
+
+def analyze_pattern_feature(feature: dict) -> dict:
+    """Analyze a captured rectangular or circular feature pattern.
+
+    Regular patterns keep their quantities and spacing so they can be written
+    as range loops. When elements are suppressed, or the captured elements do
+    not match the expected count, the copies are taken from the element
+    transforms instead ('offsets' or 'angles').
+    """
+    if not feature.get('input_features'):
+        raise ValueError("Only patterns of timeline features are supported")
+
+    result = {
+        'type': 'pattern',
+        'pattern_type': feature['pattern_type'],
+        'inputs': feature['input_features'],
+        'offsets': None,
+        'angles': None
+    }
+
+    def quantity(key):
+        return max(1, int(round(feature[key]['value']))) if feature.get(key) else 1
+
+    elements = feature.get('elements') or []
+    active = [e['transform'] for e in elements if not e['suppressed']]
+
+    if feature['pattern_type'] == 'rectangular':
+        expected = 1
+        for n in ('one', 'two'):
+            count = quantity(f'quantity_{n}')
+            distance = feature[f'distance_{n}']['value'] * CM_TO_MM if feature.get(f'distance_{n}') else 0
+            if feature.get('distance_type') == 'extent':
+                distance = distance / (count - 1) if count > 1 else 0
+            default = (1, 0, 0) if n == 'one' else (0, 1, 0)
+            result[f'quantity_{n}'] = count
+            result[f'spacing_{n}'] = distance
+            result[f'direction_{n}'] = tuple(feature.get(f'direction_{n}') or default)
+            result[f'symmetric_{n}'] = bool(feature.get(f'symmetric_{n}'))
+            expected *= 2 * count - 1 if result[f'symmetric_{n}'] else count
+
+        if elements and len(active) != expected:
+            result['offsets'] = [
+                (t[3] * CM_TO_MM, t[7] * CM_TO_MM, t[11] * CM_TO_MM) for t in active
+                if max(abs(t[3]), abs(t[7]), abs(t[11])) > 1e-9
+            ]
+
+    else:
+        count = quantity('quantity')
+        total = math.degrees(feature['total_angle']['value']) if feature.get('total_angle') else 360
+        axis = feature.get('axis') or {'origin': (0, 0, 0), 'direction': (0, 0, 1)}
+        result['quantity'] = count
+        result['total_angle'] = total
+        result['full_circle'] = abs(abs(total) - 360) < 1e-6
+        result['symmetric'] = bool(feature.get('symmetric'))
+        result['axis_origin'] = tuple(v * CM_TO_MM for v in axis['origin'])
+        result['axis_direction'] = tuple(axis['direction'])
+
+        if result['full_circle']:
+            step = total / count
+        else:
+            step = total / (count - 1) if count > 1 else 0
+        start = -total / 2 if result['symmetric'] and not result['full_circle'] else 0
+        result['step_angle'] = step
+
+        if elements and (len(active) != count or start):
+            angles = [_element_angle(t, result['axis_direction']) for t in active]
+        elif start:
+            angles = [start + i * step for i in range(count)]
+        else:
+            angles = None
+        if angles is not None:
+            result['angles'] = [a for a in angles if abs(a) > 1e-9]
 
     return result
+
+
+def analyze_mirror_feature(feature: dict) -> dict:
+    """Analyze a captured mirror of timeline features"""
+    if not feature.get('input_features'):
+        raise ValueError("Only mirrors of timeline features are supported")
+    if not feature.get('plane'):
+        raise ValueError("Mirror plane is not planar")
+
+    return {
+        'type': 'mirror',
+        'inputs': feature['input_features'],
+        'plane_origin': tuple(v * CM_TO_MM for v in feature['plane']['origin']),
+        'plane_normal': tuple(feature['plane']['normal'])
+    }
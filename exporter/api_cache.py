@@ -0,0 +1,203 @@
+#Author: Fusion2SCAD
+#Description: Memoizing proxy for read-only Fusion 360 API access during capture
+
+import time
+
+# Values that are returned as-is instead of being wrapped in a proxy
+_PLAIN_TYPES = (bool, int, float, str, bytes, type(None))
+
+# Methods that return a new object the caller may change; always called
+_FACTORY_METHODS = frozenset({'copy', 'createCopy', 'vectorTo', 'crossProduct'})
+
+# Methods that change the object they are called on; always called, and
+# every memoized value is dropped afterwards since any of them may share it
+_MUTATING_METHODS = frozenset({
+    'normalize', 'add', 'subtract', 'scaleBy', 'transformBy', 'translateBy',
+    'setWithArray', 'setToIdentity', 'setCell', 'invert', 'set', 'deleteMe'
+})
+
+
+class FusionAPICache:
+    """Memoizes Fusion API property reads and method calls for one export.
+
+    Wrap the design with wrap() and read it through the returned proxy.
+    Every object reached from it is proxied too, so repeated reads such as
+    profile.boundingBox or loops.item(i) cost a dict lookup instead of a
+    round trip to Fusion. Call invalidate() before the next export so
+    stale values are never served.
+
+    Args:
+        memoize: Cache values; with False the proxies only pass through
+        stats: Optional FusionAPIStats that counts and times every API call
+    """
+
+    def __init__(self, memoize: bool = True, stats=None):
+        self.memoize = memoize
+        self.stats = stats
+        self.generation = 0
+        self.hits = 0
+        self.misses = 0
+
+    def invalidate(self):
+        """Drop all memoized values (lazily, on next access of each proxy)"""
+        self.generation += 1
+        self.hits = 0
+        self.misses = 0
+
+    def drop_values(self):
+        """Drop all memoized values but keep the hit/miss counts"""
+        self.generation += 1
+
+    def fetch(self, label: str, func):
+        """Make one API call, timing it when stats are enabled"""
+        if self.stats is None:
+            return func()
+        start = time.perf_counter()
+        try:
+            return func()
+        finally:
+            self.stats.record(label, time.perf_counter() - start)
+
+    def wrap(self, value):
+        """Wrap an API object (or tuple/list of them) in caching proxies"""
+        if isinstance(value, _PLAIN_TYPES) or isinstance(value, CachedEntity):
+            return value
+        if isinstance(value, tuple):
+            return tuple(self.wrap(v) for v in value)
+        if isinstance(value, list):
+            return [self.wrap(v) for v in value]
+        return CachedEntity(value, self)
+
+
+def unwrap(value):
+    """Return the underlying API object of a proxy (or the value itself)"""
+    if isinstance(value, CachedEntity):
+        return object.__getattribute__(value, '_entity')
+    return value
+
+
+class CachedEntity:
+    """Proxy that memoizes attribute reads and method calls on one API object.
+
+    isinstance() checks see the wrapped object's type, so capture code works
+    the same with or without the cache. Only use it for read-only access;
+    copy() and in-place methods such as normalize() are passed through.
+    """
+
+    __slots__ = ('_entity', '_cache', '_values', '_generation')
+
+    def __init__(self, entity, cache: FusionAPICache):
+        object.__setattr__(self, '_entity', entity)
+        object.__setattr__(self, '_cache', cache)
+        object.__setattr__(self, '_values', {})
+        object.__setattr__(self, '_generation', cache.generation)
+
+    @property
+    def __class__(self):
+        return type(object.__getattribute__(self, '_entity'))
+
+    def _label(self, name: str) -> str:
+        return f"{type(object.__getattribute__(self, '_entity')).__name__}.{name}"
+
+    def _memoized(self, key, fetch, label: str = None):
+        cache = object.__getattribute__(self, '_cache')
+        if not cache.memoize:
+            cache.misses += 1
+            return fetch()
+
+        values = object.__getattribute__(self, '_values')
+
+        if object.__getattribute__(self, '_generation') != cache.generation:
+            values.clear()
+            object.__setattr__(self, '_generation', cache.generation)
+
+        if key in values:
+            value = values[key]
+            cache.hits += 1
+            if cache.stats is not None and label and not isinstance(value, _CachedMethod):
+                cache.stats.record_hit(label)
+            return value
+
+        cache.misses += 1
+        value = fetch()
+        values[key] = value
+        return value
+
+    def __getattr__(self, name):
+        entity = object.__getattribute__(self, '_entity')
+        cache = object.__getattribute__(self, '_cache')
+        label = self._label(name)
+
+        def fetch():
+            # Bound methods are looked up locally; only their calls reach Fusion
+            if callable(getattr(type(entity), name, None)):
+                return _CachedMethod(self, name, getattr(entity, name))
+            return cache.wrap(cache.fetch(label, lambda: getattr(entity, name)))
+
+        return self._memoized(name, fetch, label)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("CachedEntity proxies are read-only")
+
+    def __iter__(self):
+        entity = object.__getattribute__(self, '_entity')
+        cache = object.__getattribute__(self, '_cache')
+        label = self._label('__iter__')
+        return iter(self._memoized(
+            '__iter__', lambda: [cache.wrap(v) for v in cache.fetch(label, lambda: list(entity))], label
+        ))
+
+    def __len__(self):
+        entity = object.__getattribute__(self, '_entity')
+        cache = object.__getattribute__(self, '_cache')
+        label = self._label('__len__')
+        return self._memoized('__len__', lambda: cache.fetch(label, lambda: len(entity)), label)
+
+    def __bool__(self):
+        entity = object.__getattribute__(self, '_entity')
+        cache = object.__getattribute__(self, '_cache')
+        label = self._label('__bool__')
+        return self._memoized('__bool__', lambda: cache.fetch(label, lambda: bool(entity)), label)
+
+    def __repr__(self):
+        return f"CachedEntity({object.__getattribute__(self, '_entity')!r})"
+
+
+class _CachedMethod:
+    """Bound API method whose results are memoized per argument tuple.
+
+    Factory and mutating methods (see _FACTORY_METHODS, _MUTATING_METHODS)
+    are never memoized.
+    """
+
+    __slots__ = ('_owner', '_name', '_method')
+
+    def __init__(self, owner: CachedEntity, name: str, method):
+        self._owner = owner
+        self._name = name
+        self._method = method
+
+    def __call__(self, *args):
+        owner = self._owner
+        cache = object.__getattribute__(owner, '_cache')
+        label = owner._label(self._name)
+
+        def call():
+            return cache.wrap(cache.fetch(label, lambda: self._method(*(unwrap(a) for a in args))))
+
+        if self._name in _MUTATING_METHODS:
+            cache.misses += 1
+            try:
+                return call()
+            finally:
+                cache.drop_values()
+        if self._name in _FACTORY_METHODS:
+            cache.misses += 1
+            return call()
+
+        try:
+            key = (self._name, args)
+            hash(key)
+        except TypeError:
+            return call()
+        return owner._memoized(key, call, label)
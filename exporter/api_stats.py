@@ -0,0 +1,129 @@
+#Author: Fusion2SCAD
+#Description: Fusion 360 API call counters and latency histograms for capture
+
+# Upper bounds (ms) of the latency histogram buckets; the last bucket is open
+LATENCY_BUCKETS_MS = (0.01, 0.1, 1, 10, 100)
+
+
+def _bucket_labels() -> list:
+    labels = [f"<{bound}ms" for bound in LATENCY_BUCKETS_MS]
+    labels.append(f">={LATENCY_BUCKETS_MS[-1]}ms")
+    return labels
+
+
+class _CallStats:
+    """Count, timing and latency histogram for one group of API calls"""
+
+    __slots__ = ('calls', 'cached', 'total', 'max', 'histogram')
+
+    def __init__(self):
+        self.calls = 0
+        self.cached = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.histogram = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+
+    def add(self, seconds: float):
+        self.calls += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+        ms = seconds * 1000
+        for i, bound in enumerate(LATENCY_BUCKETS_MS):
+            if ms < bound:
+                self.histogram[i] += 1
+                break
+        else:
+            self.histogram[-1] += 1
+
+    def as_dict(self) -> dict:
+        return {
+            'calls': self.calls,
+            'cached': self.cached,
+            'total_ms': round(self.total * 1000, 3),
+            'mean_ms': round(self.total * 1000 / self.calls, 4) if self.calls else 0,
+            'max_ms': round(self.max * 1000, 3),
+            'histogram': dict(zip(_bucket_labels(), self.histogram))
+        }
+
+
+class FusionAPIStats:
+    """Records every Fusion API property read and method call made during capture.
+
+    Calls are grouped by property name ('Profile.boundingBox') and by the
+    timeline feature being captured when they happened. Reads served from a
+    FusionAPICache count as 'cached' and take no time.
+    """
+
+    def __init__(self):
+        self.by_property = {}
+        self.by_feature = {}
+        self.feature_names = {}
+        self.feature = '(design)'
+
+    def set_feature(self, key, name: str = None):
+        """Attribute subsequent calls to a timeline feature (or other group)"""
+        self.feature = key
+        if name is not None:
+            self.feature_names[key] = name
+
+    def _groups(self, label: str) -> tuple:
+        prop = self.by_property.get(label)
+        if prop is None:
+            prop = self.by_property[label] = _CallStats()
+
+        feature = self.by_feature.get(self.feature)
+        if feature is None:
+            feature = self.by_feature[self.feature] = {}
+        feature_prop = feature.get(label)
+        if feature_prop is None:
+            feature_prop = feature[label] = _CallStats()
+
+        return prop, feature_prop
+
+    def record(self, label: str, seconds: float):
+        """Record one API round trip"""
+        for stats in self._groups(label):
+            stats.add(seconds)
+
+    def record_hit(self, label: str):
+        """Record one read served from the cache"""
+        for stats in self._groups(label):
+            stats.cached += 1
+
+    def summary(self, top: int = 10) -> dict:
+        """Build a JSON-serializable report, slowest properties first"""
+        properties = sorted(self.by_property.items(), key=lambda kv: kv[1].total, reverse=True)
+
+        features = []
+        for key, props in self.by_feature.items():
+            total = _CallStats()
+            for stats in props.values():
+                total.calls += stats.calls
+                total.cached += stats.cached
+                total.total += stats.total
+                total.max = max(total.max, stats.max)
+                total.histogram = [a + b for a, b in zip(total.histogram, stats.histogram)]
+
+            hottest = sorted(props.items(), key=lambda kv: kv[1].total, reverse=True)[:top]
+            features.append({
+                'feature': key,
+                'name': self.feature_names.get(key),
+                **total.as_dict(),
+                'top_properties': {label: stats.as_dict() for label, stats in hottest}
+            })
+        features.sort(key=lambda f: f['total_ms'], reverse=True)
+
+        total_calls = sum(stats.calls for stats in self.by_property.values())
+        total_cached = sum(stats.cached for stats in self.by_property.values())
+        total_time = sum(stats.total for stats in self.by_property.values())
+
+        return {
+            'total_calls': total_calls,
+            'total_cached': total_cached,
+            'total_ms': round(total_time * 1000, 3),
+            'histogram_buckets': _bucket_labels(),
+            'by_property': {label: stats.as_dict() for label, stats in properties},
+            'by_feature': features
+        }
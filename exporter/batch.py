@@ -0,0 +1,196 @@
+#Author: Fusion2SCAD
+#Description: Batch export of captured design snapshots across worker processes
+
+import os
+import sys
+import json
+import time
+import argparse
+import concurrent.futures
+
+from .core import SCADExporter
+
+# Suffix written by the add-in for snapshot files ("part_snapshot.json")
+SNAPSHOT_SUFFIX = '_snapshot.json'
+
+
+def _positive_float(text: str) -> float:
+    """argparse type for options that must be greater than zero"""
+    value = float(text)
+    if value <= 0:
+        raise argparse.ArgumentTypeError(f"must be positive, got {text}")
+    return value
+
+
+def _positive_int(text: str) -> int:
+    """argparse type for counts that must be at least 1"""
+    value = int(text)
+    if value < 1:
+        raise argparse.ArgumentTypeError(f"must be 1 or more, got {text}")
+    return value
+
+
+def _non_negative_int(text: str) -> int:
+    """argparse type for counts that may be zero"""
+    value = int(text)
+    if value < 0:
+        raise argparse.ArgumentTypeError(f"must be 0 or more, got {text}")
+    return value
+
+
+def find_snapshots(directory: str) -> list:
+    """Return the snapshot files in a directory, sorted by name"""
+    return sorted(
+        os.path.join(directory, name) for name in os.listdir(directory)
+        if name.endswith(SNAPSHOT_SUFFIX)
+    )
+
+
+def export_snapshot(snapshot_path: str, output_dir: str, write_debug: bool = True,
+                    options: dict = None) -> dict:
+    """Export one snapshot file to .scad (and _debug.json) in output_dir.
+
+    Runs in a worker process; returns a summary dict instead of raising so
+    one broken design does not stop the batch. options are SCADExporter
+    keyword arguments.
+    """
+    base = os.path.basename(snapshot_path)[:-len(SNAPSHOT_SUFFIX)]
+    scad_path = os.path.join(output_dir, base + '.scad')
+    result = {
+        'snapshot': snapshot_path,
+        'scad': scad_path,
+        'features': 0,
+        'bytes': 0,
+        'seconds': 0.0,
+        'error': None
+    }
+
+    start = time.perf_counter()
+    try:
+        exporter = SCADExporter.from_snapshot_file(snapshot_path, **(options or {}))
+        exporter.export_file(scad_path)
+        result['features'] = len(exporter.snapshot['timeline'])
+        result['bytes'] = os.path.getsize(scad_path)
+
+        if write_debug:
+            debug_path = os.path.join(output_dir, base + '_debug.json')
+            with open(debug_path, 'w') as f:
+                json.dump(exporter.export_debug_json(), f, indent=2)
+            result['bytes'] += os.path.getsize(debug_path)
+    except Exception as e:
+        result['error'] = str(e)
+    result['seconds'] = time.perf_counter() - start
+
+    return result
+
+
+def export_directory(snapshot_dir: str, output_dir: str = None, jobs: int = None,
+                     write_debug: bool = True, options: dict = None) -> dict:
+    """Export every snapshot in a directory using a pool of worker processes.
+
+    Args:
+        snapshot_dir: Directory containing *_snapshot.json files
+        output_dir: Where to write the outputs (defaults to snapshot_dir)
+        jobs: Worker processes (defaults to the CPU count); 1 exports in-process
+        write_debug: Also write a _debug.json per design
+        options: SCADExporter keyword arguments for every design
+
+    Returns:
+        Throughput summary with per-design results
+    """
+    output_dir = output_dir or snapshot_dir
+    os.makedirs(output_dir, exist_ok=True)
+    snapshots = find_snapshots(snapshot_dir)
+    if jobs is not None and jobs < 1:
+        raise ValueError(f"jobs must be 1 or more, got {jobs}")
+    jobs = jobs or os.cpu_count() or 1
+
+    start = time.perf_counter()
+    if jobs == 1 or len(snapshots) <= 1:
+        results = [export_snapshot(path, output_dir, write_debug, options) for path in snapshots]
+    else:
+        with concurrent.futures.ProcessPoolExecutor(max_workers=jobs) as executor:
+            results = list(executor.map(
+                export_snapshot, snapshots,
+                [output_dir] * len(snapshots), [write_debug] * len(snapshots),
+                [options] * len(snapshots)
+            ))
+    elapsed = time.perf_counter() - start
+
+    exported = [r for r in results if r['error'] is None]
+    features = sum(r['features'] for r in exported)
+    total_bytes = sum(r['bytes'] for r in exported)
+
+    return {
+        'designs': len(exported),
+        'failed': len(results) - len(exported),
+        'features': features,
+        'bytes': total_bytes,
+        'jobs': jobs,
+        'seconds': elapsed,
+        'designs_per_s': len(exported) / elapsed if elapsed else 0,
+        'features_per_s': features / elapsed if elapsed else 0,
+        'bytes_per_s': total_bytes / elapsed if elapsed else 0,
+        'results': results
+    }
+
+
+def main(argv: list = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog='python -m exporter',
+        description='Export a directory of Fusion2SCAD snapshots to OpenSCAD'
+    )
+    parser.add_argument('snapshot_dir', help='directory containing *_snapshot.json files')
+    parser.add_argument('-o', '--output-dir', help='output directory (default: snapshot_dir)')
+    parser.add_argument('-j', '--jobs', type=_positive_int, default=None,
+                        help='worker processes (default: CPU count)')
+    parser.add_argument('--no-debug', action='store_true', help='skip the _debug.json files')
+    parser.add_argument('--hoist-profiles', action='store_true',
+                        help='write every polygon profile as top-level points/paths constants')
+    parser.add_argument('--chord-tolerance', type=_positive_float, default=0.05,
+                        help='max deviation of tessellated arcs from the true curve in mm '
+                             '(default: 0.05)')
+    parser.add_argument('--max-segment-angle', type=_positive_float, default=15.0,
+                        help='max angle of one arc segment in degrees (default: 15)')
+    parser.add_argument('--simplify-tolerance', type=_positive_float, default=None,
+                        help='drop polygon points within this distance in mm of the '
+                             'simplified outline (default: off)')
+    parser.add_argument('--snap-decimals', type=_non_negative_int, default=None,
+                        help='snap polygon points to a grid of 10^-N mm, e.g. 3 for '
+                             '1 micron (default: off)')
+    parser.add_argument('--exact-arcs', action='store_true',
+                        help='write profile arcs as BOSL2 arc() path segments')
+    args = parser.parse_args(argv)
+
+    if not os.path.isdir(args.snapshot_dir):
+        parser.error(f"not a directory: {args.snapshot_dir}")
+
+    options = {
+        'hoist_profiles': args.hoist_profiles,
+        'chord_tolerance': args.chord_tolerance,
+        'max_segment_angle': args.max_segment_angle,
+        'exact_arcs': args.exact_arcs,
+        'simplify_tolerance': args.simplify_tolerance,
+        'snap_decimals': args.snap_decimals
+    }
+    summary = export_directory(
+        args.snapshot_dir, args.output_dir, jobs=args.jobs, write_debug=not args.no_debug,
+        options=options
+    )
+
+    for result in summary['results']:
+        if result['error'] is not None:
+            print(f"FAILED {result['snapshot']}: {result['error']}", file=sys.stderr)
+
+    print(
+        f"Exported {summary['designs']} designs ({summary['failed']} failed), "
+        f"{summary['features']} features, {summary['bytes']} bytes "
+        f"in {summary['seconds']:.2f}s with {summary['jobs']} workers"
+    )
+    print(
+        f"Throughput: {summary['designs_per_s']:.2f} designs/s, "
+        f"{summary['features_per_s']:.1f} features/s, "
+        f"{summary['bytes_per_s'] / 1024:.1f} KiB/s"
+    )
+
+    return 1 if summary['failed'] else 0
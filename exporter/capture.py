@@ -0,0 +1,701 @@
+#Author: Fusion2SCAD
+#Description: Capture Fusion 360 design data into a plain snapshot for analysis
+
+import adsk.core
+import adsk.fusion
+
+from .utils import CM_TO_MM
+from .snapshot import new_snapshot
+from .api_cache import FusionAPICache
+from .generators import PROFILE_UTILS_AVAILABLE
+
+if PROFILE_UTILS_AVAILABLE:
+    from profile_utils import tessellation_segments
+
+# Upper bound on the samples taken along one spline with a chord tolerance
+MAX_SPLINE_SAMPLES = 1024
+
+
+def _xy(point) -> list:
+    return [point.x, point.y]
+
+
+def _xyz(point) -> list:
+    return [point.x, point.y, point.z]
+
+
+def _value(value_input) -> dict:
+    """Capture a ModelParameter-like value with its expression"""
+    if not value_input:
+        return None
+    try:
+        expression = value_input.expression
+    except:
+        expression = None
+    return {'value': value_input.value, 'expression': expression}
+
+
+def _points_at_parameters(evaluator, params: list) -> list:
+    """Evaluate a curve at several parameters in one getPointsAtParameters call.
+
+    Falls back to one getPointAtParameter call per parameter if the batched
+    call fails. Points that could not be evaluated are None.
+    """
+    try:
+        (ret, points) = evaluator.getPointsAtParameters(params)
+        if ret and len(points) == len(params):
+            return list(points)
+    except Exception:
+        pass
+
+    points = []
+    for t in params:
+        (ret, pt) = evaluator.getPointAtParameter(t)
+        points.append(pt if ret else None)
+    return points
+
+
+def _sample_parameters(start_param: float, end_param: float, count: int) -> list:
+    """count parameters from start_param up to (not including) end_param"""
+    param_span = end_param - start_param
+    return [start_param + (i / count) * param_span for i in range(count)]
+
+
+def _sample_curve(evaluator, start_param: float, end_param: float, count: int) -> list:
+    """Sample count points from start_param up to (not including) end_param"""
+    points = _points_at_parameters(evaluator, _sample_parameters(start_param, end_param, count))
+    return [_xy(pt) for pt in points if pt is not None]
+
+
+def _spline_sample_count(evaluator, start_param: float, end_param: float, arc_segments: int,
+                         chord_tolerance: float = None, max_segment_angle: float = 15.0) -> int:
+    """Samples for a spline, from its length and tightest curvature when a
+    chord tolerance is set (as if it were an arc of that radius), otherwise
+    a fixed arc_segments * 2
+    """
+    fixed = arc_segments * 2
+    if chord_tolerance is None or not PROFILE_UTILS_AVAILABLE:
+        return fixed
+    try:
+        (ret, length) = evaluator.getLengthAtParameter(start_param, end_param)
+        if not ret:
+            return fixed
+        params = _sample_parameters(start_param, end_param, fixed) + [end_param]
+        (ret, _, curvatures) = evaluator.getCurvatures(params)
+        if not ret or not curvatures:
+            return fixed
+    except Exception:
+        return fixed
+
+    curvature = max(curvatures)
+    if curvature <= 0:
+        return 1
+    count = tessellation_segments(
+        CM_TO_MM / curvature, length * curvature, chord_tolerance, max_segment_angle
+    )
+    return min(count, MAX_SPLINE_SAMPLES)
+
+
+def capture_curve(profile_curve, arc_segments: int = 16, chord_tolerance: float = None,
+                  max_segment_angle: float = 15.0) -> dict:
+    """Capture a profile curve's sketch entity data and evaluated points.
+
+    Curves with 'start'/'end' were evaluated successfully. Curves flagged
+    'fallback' could not be evaluated and carry sketch entity data only.
+    Arcs are not sampled: their center, radius, end points and 'mid' point
+    (which gives the direction) describe them exactly. Splines are sampled
+    to chord_tolerance when it is set (see _spline_sample_count()).
+    """
+    entity = profile_curve.sketchEntity
+    record = {'type': entity.__class__.__name__}
+
+    try:
+        if isinstance(entity, (adsk.fusion.SketchArc, adsk.fusion.SketchCircle,
+                               adsk.fusion.SketchEllipse)):
+            record['center'] = _xy(entity.centerSketchPoint.geometry)
+        if isinstance(entity, (adsk.fusion.SketchArc, adsk.fusion.SketchCircle)):
+            record['radius'] = entity.radius
+        if isinstance(entity, adsk.fusion.SketchEllipse):
+            record['major_radius'] = entity.majorRadius
+            record['minor_radius'] = entity.minorRadius
+    except:
+        pass
+
+    try:
+        evaluator = profile_curve.geometry.evaluator
+        (ret, start_param, end_param) = evaluator.getParameterExtents()
+        if not ret:
+            return record
+
+        # End points, then the midpoint or samples, fetched in one batched call
+        exact_arc = isinstance(entity, adsk.fusion.SketchArc) and 'radius' in record
+        if exact_arc:
+            extra_params = [(start_param + end_param) / 2]
+        elif isinstance(entity, (adsk.fusion.SketchFittedSpline, adsk.fusion.SketchFixedSpline)):
+            count = _spline_sample_count(
+                evaluator, start_param, end_param, arc_segments, chord_tolerance, max_segment_angle
+            )
+            extra_params = _sample_parameters(start_param, end_param, count)
+        elif not isinstance(entity, (adsk.fusion.SketchLine, adsk.fusion.SketchCircle,
+                                     adsk.fusion.SketchEllipse)):
+            extra_params = _sample_parameters(start_param, end_param, arc_segments)
+        else:
+            extra_params = []
+
+        points = _points_at_parameters(evaluator, [start_param, end_param] + extra_params)
+        start_pt, end_pt = points[0], points[1]
+        if start_pt is None or end_pt is None:
+            return record
+
+        record['start'] = _xy(start_pt)
+        record['end'] = _xy(end_pt)
+
+        if exact_arc:
+            if points[2] is not None:
+                record['mid'] = _xy(points[2])
+            else:
+                record['samples'] = _sample_curve(evaluator, start_param, end_param, arc_segments)
+        elif extra_params:
+            record['samples'] = [_xy(pt) for pt in points[2:] if pt is not None]
+
+    except Exception:
+        record.pop('start', None)
+        record.pop('end', None)
+        record['fallback'] = True
+        try:
+            if isinstance(entity, adsk.fusion.SketchLine):
+                record['start'] = _xy(entity.startSketchPoint.geometry)
+                record['end'] = _xy(entity.endSketchPoint.geometry)
+            elif isinstance(entity, adsk.fusion.SketchArc):
+                record['start_angle'] = entity.startAngle
+                record['end_angle'] = entity.endAngle
+        except Exception:
+            pass
+
+    return record
+
+
+def capture_profile(profile: adsk.fusion.Profile, arc_segments: int = 16,
+                    chord_tolerance: float = None, max_segment_angle: float = 15.0) -> dict:
+    """Capture a sketch profile's bounding box and loops of curves"""
+    bbox = profile.boundingBox
+    record = {
+        'bbox': {'min': _xyz(bbox.minPoint), 'max': _xyz(bbox.maxPoint)},
+        'loops': []
+    }
+
+    loops = profile.profileLoops
+    for loop_idx in range(loops.count):
+        loop = loops.item(loop_idx)
+        curves = loop.profileCurves
+        record['loops'].append({
+            'is_outer': loop.isOuter,
+            'curves': [
+                capture_curve(curves.item(i), arc_segments, chord_tolerance, max_segment_angle)
+                for i in range(curves.count)
+            ]
+        })
+
+    return record
+
+
+def _profile_list(profiles) -> list:
+    """Normalize a feature's profile property to a list of Profile objects"""
+    if isinstance(profiles, adsk.fusion.Profile):
+        return [profiles]
+    result = []
+    try:
+        for i in range(profiles.count):
+            profile = profiles.item(i)
+            if isinstance(profile, adsk.fusion.Profile):
+                result.append(profile)
+    except:
+        try:
+            for profile in profiles:
+                if isinstance(profile, adsk.fusion.Profile):
+                    result.append(profile)
+        except:
+            pass
+    return result
+
+
+def capture_sketch_placement(sketch: adsk.fusion.Sketch) -> dict:
+    """Capture a sketch's name, origin and coordinate system"""
+    record = {
+        'name': sketch.name,
+        'origin': _xyz(sketch.origin),
+        'transform': None
+    }
+
+    transform = sketch.transform
+    if transform:
+        origin_pt, x_axis, y_axis, z_axis = transform.getAsCoordinateSystem()
+        record['transform'] = {
+            'origin': _xyz(origin_pt),
+            'x_axis': _xyz(x_axis),
+            'y_axis': _xyz(y_axis),
+            'z_axis': _xyz(z_axis)
+        }
+
+    try:
+        ref_plane = sketch.referencePlane
+        if ref_plane:
+            record['reference_plane'] = {'type': ref_plane.__class__.__name__}
+            if hasattr(ref_plane, 'geometry'):
+                plane_geom = ref_plane.geometry
+                if hasattr(plane_geom, 'normal'):
+                    record['reference_plane']['normal'] = _xyz(plane_geom.normal)
+                if hasattr(plane_geom, 'origin'):
+                    record['reference_plane']['origin'] = _xyz(plane_geom.origin)
+    except:
+        pass
+
+    return record
+
+
+def capture_body(body) -> dict:
+    """Capture a body's name, entity token and bounding box"""
+    record = {'name': body.name, 'token': body.entityToken, 'bbox': None}
+    try:
+        bbox = body.boundingBox
+        record['bbox'] = {'min': _xyz(bbox.minPoint), 'max': _xyz(bbox.maxPoint)}
+    except:
+        pass
+    return record
+
+
+def _capture_bodies(feature) -> list:
+    bodies = []
+    try:
+        for body in feature.bodies:
+            bodies.append(capture_body(body))
+    except:
+        pass
+    return bodies
+
+
+def _capture_face_normal(feature, faces_attr: str) -> list:
+    """Capture the normal of the first face in a face collection, if planar"""
+    try:
+        faces = getattr(feature, faces_attr)
+        if faces and faces.count > 0:
+            face = faces.item(0)
+            if hasattr(face, 'geometry') and hasattr(face.geometry, 'normal'):
+                return _xyz(face.geometry.normal)
+    except:
+        pass
+    return None
+
+
+def _capture_extent(extent_def) -> dict:
+    if isinstance(extent_def, adsk.fusion.DistanceExtentDefinition):
+        return {'type': 'distance', **_value(extent_def.distance)}
+    if isinstance(extent_def, adsk.fusion.AngleExtentDefinition):
+        return {'type': 'angle', **_value(extent_def.angle)}
+    if isinstance(extent_def, adsk.fusion.ThroughAllExtentDefinition):
+        return {'type': 'through_all'}
+    return {'type': extent_def.__class__.__name__ if extent_def else None}
+
+
+def capture_extrude_feature(feature: adsk.fusion.ExtrudeFeature, arc_segments: int = 16,
+                            chord_tolerance: float = None, max_segment_angle: float = 15.0) -> dict:
+    """Capture the data analyze_extrude_feature() reads from an extrude"""
+    record = {
+        'operation': feature.operation,
+        'extent_one': _capture_extent(feature.extentOne),
+        'has_extent_two': bool(feature.extentTwo),
+        'taper_angle_one': _value(feature.taperAngleOne),
+        'sketch': None,
+        'profiles': [],
+        'bodies': _capture_bodies(feature),
+        'start_face_normal': _capture_face_normal(feature, 'startFaces'),
+        'end_face_normal': _capture_face_normal(feature, 'endFaces')
+    }
+
+    profiles = _profile_list(feature.profile)
+
+    try:
+        sketch = profiles[0].parentSketch
+        if sketch:
+            record['sketch'] = capture_sketch_placement(sketch)
+    except:
+        pass
+
+    record['profiles'] = [
+        capture_profile(p, arc_segments, chord_tolerance, max_segment_angle) for p in profiles
+    ]
+    return record
+
+
+def capture_revolve_feature(feature: adsk.fusion.RevolveFeature, arc_segments: int = 16,
+                            chord_tolerance: float = None, max_segment_angle: float = 15.0) -> dict:
+    """Capture the data analyze_revolve_feature() reads from a revolve"""
+    return {
+        'operation': feature.operation,
+        'extent': _capture_extent(feature.extentDefinition),
+        'profiles': [
+            capture_profile(p, arc_segments, chord_tolerance, max_segment_angle)
+            for p in _profile_list(feature.profile)
+        ],
+        'bodies': _capture_bodies(feature)
+    }
+
+
+def capture_hole_feature(feature: adsk.fusion.HoleFeature) -> dict:
+    """Capture the data analyze_hole_feature() reads from a hole"""
+    record = {
+        'hole_type': None,
+        'diameter': None,
+        'extent': None,
+        'position': None,
+        'cylinder': None,
+        'bodies': _capture_bodies(feature)
+    }
+
+    try:
+        record['diameter'] = _value(feature.holeDiameter)
+        record['hole_type'] = feature.holeType
+
+        if feature.holeType == adsk.fusion.HoleTypes.CountersinkHoleType:
+            record['countersink_angle'] = _value(feature.countersinkAngle)
+            record['countersink_diameter'] = _value(feature.countersinkDiameter)
+        elif feature.holeType == adsk.fusion.HoleTypes.CounterboreHoleType:
+            record['counterbore_diameter'] = _value(feature.counterboreDiameter)
+            record['counterbore_depth'] = _value(feature.counterboreDepth)
+
+        record['extent'] = _capture_extent(feature.extentDefinition)
+
+        if feature.position:
+            record['position'] = _xyz(feature.position)
+
+        faces = feature.faces
+        for i in range(faces.count):
+            geom = faces.item(i).geometry
+            if isinstance(geom, adsk.core.Cylinder):
+                record['cylinder'] = {'origin': _xyz(geom.origin), 'axis': _xyz(geom.axis)}
+                break
+    except:
+        pass
+
+    return record
+
+
+def capture_edge(edge) -> dict:
+    """Capture an edge's end points and its body's Z extents for classification"""
+    record = {'start': None, 'end': None, 'body_z_range': None}
+
+    body = edge.body
+    if not body:
+        return record
+    bbox = body.boundingBox
+    record['body_z_range'] = [bbox.minPoint.z, bbox.maxPoint.z]
+
+    try:
+        evaluator = edge.geometry.evaluator
+        ret, start_param, end_param = evaluator.getParameterExtents()
+        if ret:
+            start_pt, end_pt = _points_at_parameters(evaluator, [start_param, end_param])
+            if start_pt is not None and end_pt is not None:
+                record['start'] = _xyz(start_pt)
+                record['end'] = _xyz(end_pt)
+    except:
+        pass
+
+    return record
+
+
+def _capture_edge_modifier(feature, edge_set_type, size_attr: str) -> dict:
+    """Shared capture for fillets and chamfers: size, affected bodies, edges"""
+    record = {
+        'edge_set_count': 0,
+        'edge_set_type': None,
+        size_attr: None,
+        'face_count': 0,
+        'affected_bodies': [],
+        'edges': None
+    }
+
+    edge_sets = feature.edgeSets
+    record['edge_set_count'] = edge_sets.count
+    edge_set = edge_sets.item(0) if edge_sets.count > 0 else None
+    if edge_set:
+        record['edge_set_type'] = edge_set.__class__.__name__
+        if isinstance(edge_set, edge_set_type):
+            record[size_attr] = _value(getattr(edge_set, size_attr))
+
+    try:
+        faces = feature.faces
+        record['face_count'] = faces.count
+        seen = set()
+        for i in range(faces.count):
+            body = faces.item(i).body
+            if body:
+                key = (body.name, body.entityToken)
+                if key not in seen:
+                    seen.add(key)
+                    record['affected_bodies'].append({'name': body.name, 'token': body.entityToken})
+    except:
+        pass
+
+    if edge_set and isinstance(edge_set, edge_set_type):
+        try:
+            record['edges'] = [capture_edge(edge) for edge in edge_set.edges]
+        except:
+            # Edges not accessible, that's OK - we still have body names
+            record['edges'] = None
+
+    return record
+
+
+def capture_fillet_feature(feature: adsk.fusion.FilletFeature) -> dict:
+    """Capture the data analyze_fillet_feature() reads from a fillet"""
+    return _capture_edge_modifier(feature, adsk.fusion.ConstantRadiusFilletEdgeSet, 'radius')
+
+
+def capture_chamfer_feature(feature: adsk.fusion.ChamferFeature) -> dict:
+    """Capture the data analyze_chamfer_feature() reads from a chamfer"""
+    return _capture_edge_modifier(feature, adsk.fusion.EqualDistanceChamferEdgeSet, 'distance')
+
+
+def capture_axis(entity) -> dict:
+    """Capture the origin and unit direction of an axis-like entity.
+
+    Handles construction axes, linear edges and sketch lines (in world
+    coordinates) and cylindrical faces. Returns None for anything else.
+    """
+    try:
+        if hasattr(entity, 'worldGeometry'):
+            geom = entity.worldGeometry
+        else:
+            geom = entity.geometry
+        if hasattr(geom, 'direction'):
+            origin, direction = geom.origin, geom.direction.copy()
+        elif hasattr(geom, 'axis'):
+            origin, direction = geom.origin, geom.axis.copy()
+        else:
+            origin = geom.startPoint
+            direction = geom.startPoint.vectorTo(geom.endPoint)
+        direction.normalize()
+        return {'origin': _xyz(origin), 'direction': _xyz(direction)}
+    except:
+        return None
+
+
+def _capture_input_features(feature) -> list:
+    """Capture the timeline features a pattern or mirror copies, by name and token"""
+    inputs = []
+    entities = feature.inputEntities
+    for i in range(entities.count):
+        entity = entities.item(i)
+        if hasattr(entity, 'timelineObject'):
+            inputs.append({'name': entity.name, 'token': entity.entityToken})
+    return inputs
+
+
+def _capture_pattern_elements(feature) -> list:
+    """Capture each pattern element's transform (row-major, cm) and suppression"""
+    elements = []
+    try:
+        pattern_elements = feature.patternElements
+        for i in range(pattern_elements.count):
+            element = pattern_elements.item(i)
+            elements.append({
+                'transform': list(element.transform.asArray()),
+                'suppressed': element.isSuppressed
+            })
+    except:
+        pass
+    return elements
+
+
+def capture_rectangular_pattern_feature(feature: adsk.fusion.RectangularPatternFeature) -> dict:
+    """Capture the data analyze_pattern_feature() reads from a rectangular pattern"""
+    record = {
+        'pattern_type': 'rectangular',
+        'input_features': [],
+        'quantity_one': _value(feature.quantityOne),
+        'quantity_two': _value(feature.quantityTwo),
+        'distance_one': _value(feature.distanceOne),
+        'distance_two': _value(feature.distanceTwo),
+        'distance_type': None,
+        'direction_one': None,
+        'direction_two': None,
+        'symmetric_one': feature.isSymmetricInDirectionOne,
+        'symmetric_two': feature.isSymmetricInDirectionTwo,
+        'elements': _capture_pattern_elements(feature),
+        'bodies': _capture_bodies(feature)
+    }
+
+    if feature.patternDistanceType == adsk.fusion.PatternDistanceType.SpacingPatternDistanceType:
+        record['distance_type'] = 'spacing'
+    else:
+        record['distance_type'] = 'extent'
+
+    axis = capture_axis(feature.directionOneEntity)
+    if axis:
+        record['direction_one'] = axis['direction']
+    if feature.directionTwoEntity:
+        axis = capture_axis(feature.directionTwoEntity)
+        if axis:
+            record['direction_two'] = axis['direction']
+
+    record['input_features'] = _capture_input_features(feature)
+    return record
+
+
+def capture_circular_pattern_feature(feature: adsk.fusion.CircularPatternFeature) -> dict:
+    """Capture the data analyze_pattern_feature() reads from a circular pattern"""
+    return {
+        'pattern_type': 'circular',
+        'input_features': _capture_input_features(feature),
+        'quantity': _value(feature.quantity),
+        'total_angle': _value(feature.totalAngle),
+        'symmetric': feature.isSymmetric,
+        'axis': capture_axis(feature.axis),
+        'elements': _capture_pattern_elements(feature),
+        'bodies': _capture_bodies(feature)
+    }
+
+
+def capture_plane(entity) -> dict:
+    """Capture the origin and normal of a construction plane or planar face"""
+    try:
+        geom = entity.geometry
+        return {'origin': _xyz(geom.origin), 'normal': _xyz(geom.normal)}
+    except:
+        return None
+
+
+def capture_mirror_feature(feature: adsk.fusion.MirrorFeature) -> dict:
+    """Capture the data analyze_mirror_feature() reads from a mirror"""
+    return {
+        'input_features': _capture_input_features(feature),
+        'plane': capture_plane(feature.mirrorPlane),
+        'bodies': _capture_bodies(feature)
+    }
+
+
+def capture_sketch(sketch: adsk.fusion.Sketch) -> dict:
+    """Capture summary counts for a sketch"""
+    return {
+        'profile_count': sketch.profiles.count,
+        'curve_count': sketch.sketchCurves.count
+    }
+
+
+def capture_parameters(design: adsk.fusion.Design) -> list:
+    """Capture all user parameters in definition order"""
+    parameters = []
+    params = design.userParameters
+    for i in range(params.count):
+        param = params.item(i)
+        parameters.append({
+            'name': param.name,
+            'value': param.value,
+            'unit': param.unit,
+            'expression': param.expression,
+            'comment': param.comment if param.comment else ""
+        })
+    return parameters
+
+
+# objectType -> capture(entity, arc_segments, chord_tolerance, max_segment_angle),
+# matching the handlers in
+# exporter.features
+CAPTURE_FUNCTIONS = {
+    'adsk::fusion::ExtrudeFeature': capture_extrude_feature,
+    'adsk::fusion::RevolveFeature': capture_revolve_feature,
+    'adsk::fusion::HoleFeature': lambda entity, *curve_options: capture_hole_feature(entity),
+    'adsk::fusion::FilletFeature': lambda entity, *curve_options: capture_fillet_feature(entity),
+    'adsk::fusion::ChamferFeature': lambda entity, *curve_options: capture_chamfer_feature(entity),
+    'adsk::fusion::RectangularPatternFeature':
+        lambda entity, *curve_options: capture_rectangular_pattern_feature(entity),
+    'adsk::fusion::CircularPatternFeature':
+        lambda entity, *curve_options: capture_circular_pattern_feature(entity),
+    'adsk::fusion::MirrorFeature': lambda entity, *curve_options: capture_mirror_feature(entity),
+    'adsk::fusion::Sketch': lambda entity, *curve_options: capture_sketch(entity)
+}
+
+
+def capture_timeline_item(item, index: int, arc_segments: int = 16,
+                          chord_tolerance: float = None, max_segment_angle: float = 15.0) -> dict:
+    """Capture one timeline item. Returns None for items without an entity."""
+    entity = item.entity
+    if entity is None:
+        return None
+
+    record = {
+        'index': index,
+        'name': item.name if hasattr(item, 'name') else f"feature_{index}",
+        'type': entity.__class__.__name__,
+        'object_type': entity.objectType,
+        'entity_token': None
+    }
+
+    try:
+        record['entity_token'] = entity.entityToken
+    except:
+        pass
+
+    try:
+        capture = CAPTURE_FUNCTIONS.get(record['object_type'])
+        if capture is not None:
+            record.update(capture(entity, arc_segments, chord_tolerance, max_segment_angle))
+    except Exception as e:
+        record['error'] = str(e)
+
+    return record
+
+
+def capture_design(design: adsk.fusion.Design, arc_segments: int = 16,
+                   api_cache: FusionAPICache = None, chord_tolerance: float = None,
+                   max_segment_angle: float = 15.0) -> dict:
+    """Walk the design once and capture everything the analyzers need.
+
+    Args:
+        design: Active Fusion 360 design
+        arc_segments: Samples per curve without exact geometry (splines use
+            twice as many unless chord_tolerance is set)
+        api_cache: Optional cache that memoizes repeated API reads
+        chord_tolerance: Maximum chord deviation in mm that spline samples keep to
+        max_segment_angle: Maximum angle per spline segment in degrees
+
+    Returns:
+        Snapshot dict that can be saved with save_snapshot() and replayed
+        with SCADExporter.from_snapshot() without the Fusion API
+    """
+    stats = None
+    if api_cache is not None:
+        design = api_cache.wrap(design)
+        stats = api_cache.stats
+
+    snapshot = new_snapshot(design.rootComponent.name)
+    snapshot['capture']['arc_segments'] = arc_segments
+    snapshot['capture']['chord_tolerance'] = chord_tolerance
+    snapshot['capture']['max_segment_angle'] = max_segment_angle
+
+    if stats:
+        stats.set_feature('(parameters)')
+    snapshot['parameters'] = capture_parameters(design)
+
+    timeline = design.timeline
+    for i in range(timeline.count):
+        if stats:
+            stats.set_feature(i)
+        record = capture_timeline_item(
+            timeline.item(i), i, arc_segments, chord_tolerance, max_segment_angle
+        )
+        if record is not None:
+            snapshot['timeline'].append(record)
+            if stats:
+                stats.set_feature(i, record['name'])
+
+    if stats:
+        stats.set_feature('(bodies)')
+    try:
+        bodies = design.rootComponent.bRepBodies
+        snapshot['bodies'] = [capture_body(bodies.item(i)) for i in range(bodies.count)]
+    except:
+        pass
+
+    return snapshot
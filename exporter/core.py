@@ -1,32 +1,104 @@
 #Author: Fusion2SCAD
 #Description: Main SCADExporter class for Fusion 360 to OpenSCAD export
 
-import adsk.core
-import adsk.fusion
-
-from .utils import CM_TO_MM, sanitize_name, format_value
-from .analyzers import (
-    analyze_extrude_feature,
-    analyze_revolve_feature,
-    analyze_hole_feature,
-    analyze_fillet_feature,
-    analyze_chamfer_feature
-)
-from .generators import (
-    generate_header,
-    generate_parameters_section,
-    generate_extrude_scad,
-    generate_revolve_scad,
-    generate_hole_scad
+import io
+import tempfile
+import concurrent.futures
+
+# The Fusion API is only needed to capture a live design; snapshots can be
+# replayed headless without it.
+try:
+    from .capture import capture_design
+    FUSION_AVAILABLE = True
+except ImportError:
+    FUSION_AVAILABLE = False
+
+from .utils import CM_TO_MM, sanitize_name
+from .expressions import (
+    to_output_units,
+    translate_expression,
+    referenced_parameters,
+    is_compound
 )
+from .snapshot import validate_snapshot, save_snapshot, load_snapshot
+from .api_cache import FusionAPICache
+from .api_stats import FusionAPIStats
+from .profiler import ExportProfiler
+from .fragment_cache import FragmentCache, fingerprint_record
+from .writer import SCADWriter
+from .csg import build_body_trees, group_repeats, group_tree_repeats, iter_leaves, write_node
+from .features import FeatureHandler, get_feature_handler, generate_feature_scad
+from .debug import debug_body
+from .profiles import find_shared_profiles, generate_profile_function, generate_profile_constants
+from .generators import generate_header, generate_parameters_section, generate_instances_scad
+
+# Module definitions beyond this size are spilled to a temporary file until
+# they are copied to the end of the output
+MODULE_SPILL_BYTES = 1 << 20
+
+def new_modifiers() -> dict:
+    """Fresh fillet/chamfer modifiers for one body"""
+    return {
+        'rounding': 0,
+        'chamfer': 0,
+        'rounding_edges': set(),
+        'chamfer_edges': set()
+    }
 
 
 class SCADExporter:
-    """Main exporter class that converts Fusion 360 design to OpenSCAD/BOSL2 code"""
+    """Main exporter class that converts Fusion 360 design to OpenSCAD/BOSL2 code.
+
+    Construct with a live design to capture it on first use, or with
+    from_snapshot()/from_snapshot_file() to replay a captured design headless.
+    """
+
+    def __init__(self, design=None, snapshot: dict = None, cache_api_reads: bool = False,
+                 collect_api_stats: bool = False, profiler: ExportProfiler = None,
+                 fragment_cache: FragmentCache = None, workers: int = 1, executor=None,
+                 parametric: bool = True, share_profiles: bool = True,
+                 hoist_profiles: bool = False, chord_tolerance: float = 0.05,
+                 max_segment_angle: float = 15.0, exact_arcs: bool = False,
+                 simplify_tolerance: float = None, snap_decimals: int = None):
+        if chord_tolerance is not None and chord_tolerance <= 0:
+            raise ValueError(f"chord_tolerance must be positive, got {chord_tolerance}")
+        if max_segment_angle <= 0:
+            raise ValueError(f"max_segment_angle must be positive, got {max_segment_angle}")
+        if simplify_tolerance is not None and simplify_tolerance <= 0:
+            raise ValueError(f"simplify_tolerance must be positive, got {simplify_tolerance}")
+        if snap_decimals is not None and snap_decimals < 0:
+            raise ValueError(f"snap_decimals must be 0 or more, got {snap_decimals}")
 
-    def __init__(self, design: adsk.fusion.Design):
         self.design = design
+        self.profiler = profiler if profiler is not None else ExportProfiler(enabled=False)
+        self.snapshot = validate_snapshot(snapshot) if snapshot is not None else None
+        self.api_cache = None
+        self.api_stats = None
+        if cache_api_reads or collect_api_stats:
+            self.api_cache = FusionAPICache(memoize=cache_api_reads)
+        self.collect_api_stats = collect_api_stats
+        self.fragment_cache = fragment_cache
+        self.workers = workers
+        self.executor = executor
+        self.parametric = parametric
+        self.share_profiles = share_profiles
+        self.hoist_profiles = hoist_profiles
+        # Arc tessellation: max chord deviation (mm) and max segment angle (deg);
+        # chord_tolerance=None keeps the fixed per-curve segment counts.
+        # simplify_tolerance (mm) drops polygon points with Ramer-Douglas-Peucker;
+        # snap_decimals keeps polygon points as integers on a 10**-n mm grid
+        self.tessellation = {
+            'chord_tolerance': chord_tolerance,
+            'max_segment_angle': max_segment_angle,
+            'simplify_tolerance': simplify_tolerance,
+            'snap_decimals': snap_decimals
+        }
+        # Write polygon profiles as BOSL2 arc()/point paths, tessellated by OpenSCAD
+        self.exact_arcs = exact_arcs
         self.parameters = {}
+        self.parameter_index = {}
+        self._parameter_values = {}
+        self._expression_params = {}
         self.scad_lines = []
         self.indent_level = 0
         self.processed_bodies = set()
@@ -34,6 +106,63 @@ class SCADExporter:
         self.body_to_feature = {}
         self.feature_modifiers = {}
 
+    @classmethod
+    def from_snapshot(cls, snapshot: dict, **options) -> 'SCADExporter':
+        """Create an exporter that replays a captured snapshot; options go to __init__"""
+        return cls(snapshot=snapshot, **options)
+
+    @classmethod
+    def from_snapshot_file(cls, filepath: str, **options) -> 'SCADExporter':
+        """Create an exporter that replays a snapshot file; options go to __init__"""
+        return cls(snapshot=load_snapshot(filepath), **options)
+
+    def capture(self, refresh: bool = False) -> dict:
+        """Capture the design into a snapshot (once) and return it.
+
+        Args:
+            refresh: Re-capture the live design even if a snapshot exists
+        """
+        if self.snapshot is None or (refresh and self.design is not None):
+            if self.design is None:
+                raise ValueError("No design or snapshot to export")
+            if not FUSION_AVAILABLE:
+                raise RuntimeError("The Fusion 360 API is required to capture a live design")
+            if self.api_cache is not None:
+                self.api_cache.invalidate()
+            if self.collect_api_stats:
+                self.api_stats = FusionAPIStats()
+                self.api_cache.stats = self.api_stats
+            with self.profiler.stage('capture'):
+                self.snapshot = capture_design(
+                    self.design, api_cache=self.api_cache,
+                    chord_tolerance=self.tessellation['chord_tolerance'],
+                    max_segment_angle=self.tessellation['max_segment_angle']
+                )
+        return self.snapshot
+
+    def api_stats_report(self) -> dict:
+        """Return the Fusion API call summary of the last capture, if collected"""
+        if self.api_stats is None:
+            return None
+        return self.api_stats.summary()
+
+    def profile_report(self) -> dict:
+        """Return the stage/feature profile of this export as a JSON-ready dict"""
+        snapshot = self.snapshot or {}
+        extra = {}
+        if self.fragment_cache is not None:
+            extra['fragment_cache'] = self.fragment_cache.stats()
+        return self.profiler.report(
+            design_name=snapshot.get('design_name'),
+            feature_count=len(snapshot.get('timeline', [])),
+            parameter_count=len(self.parameters),
+            **extra
+        )
+
+    def save_snapshot(self, filepath: str):
+        """Capture the design if needed and write the snapshot to a file"""
+        save_snapshot(self.capture(), filepath)
+
     def indent(self):
         return "    " * self.indent_level
 
@@ -45,233 +174,480 @@ class SCADExporter:
 
     def extract_parameters(self):
         """Extract all user-defined parameters from the design"""
-        params = self.design.userParameters
-        for i in range(params.count):
-            param = params.item(i)
-            name = sanitize_name(param.name)
-            value = param.value * CM_TO_MM
-            unit = param.unit
-            comment = param.comment if param.comment else ""
-            self.parameters[param.name] = {
+        for param in self.capture()['parameters']:
+            name = sanitize_name(param['name'])
+            value = to_output_units(param['value'], param['unit'])
+            self.parameters[param['name']] = {
                 'name': name,
                 'value': value,
-                'unit': unit,
-                'comment': comment,
-                'expression': param.expression
+                'unit': param['unit'],
+                'comment': param['comment'],
+                'expression': param['expression'],
+                'scad_expression': None,
+                'depends_on': []
             }
-        return self.parameters
 
-    def _get_param_or_value(self, fusion_value: float, fusion_expression: str = None) -> str:
-        """Return parameter name if it matches, otherwise return the numeric value"""
-        value_mm = fusion_value * CM_TO_MM
+        # Index parameter names for expression lookups in _bind_expression
+        self.parameter_index = {
+            orig_name: info['name'] for orig_name, info in self.parameters.items()
+        }
+        self._parameter_values = {
+            orig_name: info['value'] for orig_name, info in self.parameters.items()
+        }
+        self._expression_params = {}
+
+        if self.parametric:
+            # Keep parameters that depend on others as OpenSCAD expressions
+            for info in self.parameters.values():
+                translated = translate_expression(
+                    info['expression'], info['value'], self.parameter_index, self._parameter_values
+                )
+                if translated and translated[0][0] != 'num':
+                    node, code = translated
+                    info['scad_expression'] = code
+                    info['depends_on'] = referenced_parameters(node)
 
-        if fusion_expression:
-            for orig_name, param_info in self.parameters.items():
-                if orig_name in fusion_expression:
-                    return param_info['name']
+        return self.parameters
 
-        return format_value(value_mm)
+    def _bind_expression(self, fusion_value: float, fusion_expression: str,
+                         unit: str = 'mm') -> str:
+        """Translate the expression behind a captured value into OpenSCAD code.
+
+        Returns None when the expression is a plain number, cannot be
+        translated, or does not reproduce the value. Compound expressions
+        are parenthesized so they can be embedded in larger ones.
+        """
+        if not self.parametric or not fusion_expression or not self.parameter_index:
+            return None
+
+        value = to_output_units(fusion_value, unit)
+        key = (fusion_expression, unit, value)
+        if key not in self._expression_params:
+            code = None
+            translated = translate_expression(
+                fusion_expression, value, self.parameter_index, self._parameter_values
+            )
+            if translated and translated[0][0] != 'num':
+                node, code = translated
+                if is_compound(node):
+                    code = f"({code})"
+            self._expression_params[key] = code
+        return self._expression_params[key]
+
+    def _bind_feature_expressions(self, entity: dict, handler: FeatureHandler,
+                                  info: dict) -> dict:
+        """Attach OpenSCAD expressions for analyzed values driven by parameters"""
+        expressions = {}
+        for key, source, unit in handler.bound_values:
+            captured = entity.get(source)
+            if not captured or captured.get('value') is None or info.get(key) is None:
+                continue
+            # Only bind values the analyzer took from this expression
+            if abs(to_output_units(captured['value'], unit) - info[key]) > 1e-9:
+                continue
+            code = self._bind_expression(captured['value'], captured.get('expression'), unit)
+            if code is not None:
+                expressions[key] = code
+        if expressions:
+            info['expressions'] = expressions
+        return info
 
     def process_timeline(self) -> list:
-        """Process the design timeline and generate SCAD code for each feature.
+        """Process the design timeline and return the SCAD geometry lines.
+
+        Kept for callers that want a list; export() and export_to() stream
+        the same lines through write_timeline() instead.
+        """
+        buffer = io.StringIO()
+        writer = SCADWriter(buffer)
+        self.write_timeline(writer)
+        writer.flush()
+        return buffer.getvalue().split('\n') if writer.line_count else []
+
+    def write_timeline(self, writer: SCADWriter):
+        """Stream SCAD code for every timeline feature to a SCADWriter.
         Uses a two-pass approach to associate fillets/chamfers with their parent shapes."""
-        scad_code = []
-        timeline = self.design.timeline
+        timeline = self.capture()['timeline']
+        if self.fragment_cache is not None:
+            self.fragment_cache.start_export()
+
+        analysis_errors = []
+        with self.profiler.stage('analysis'):
+            features_data, feature_to_body_name, body_modifiers, shared = self._analyze_timeline(
+                timeline, analysis_errors
+            )
+        writer.write_lines(analysis_errors)
+
+        with self.profiler.stage('combine'):
+            bodies, global_cutters = build_body_trees(
+                list(enumerate(features_data)), self._feature_operation
+            )
+
+            # Identical cutters that differ only in position share one module
+            def repeat_key(item):
+                return None if item[0] in shared else self._repeat_key(item)
+
+            for body in bodies:
+                group_tree_repeats(body['node'], repeat_key)
+            global_cutters = group_repeats(global_cutters, repeat_key)
+
+            # Cutters that touch several bodies are written once per body
+            uses = {}
+            items = []
+            for node in [body['node'] for body in bodies] + global_cutters:
+                for item in iter_leaves(node):
+                    if item[0] not in uses:
+                        uses[item[0]] = 0
+                        items.append(item)
+                    uses[item[0]] += 1
+
+            modifiers = {
+                idx: body_modifiers.get(feature_to_body_name.get(idx)) or new_modifiers()
+                for idx, _ in items
+            }
 
+            # Polygon profiles used more than once (or all, when hoisting)
+            # are defined once ahead of the geometry and referenced by name.
+            # Exact arc paths are written in place instead.
+            profile_refs, profile_definitions = {}, {}
+            if (self.share_profiles or self.hoist_profiles) and not self.exact_arcs:
+                profile_refs, profile_definitions = find_shared_profiles(
+                    [(idx, item[2]) for idx, item in items], hoist=self.hoist_profiles
+                )
+            for idx, refs in profile_refs.items():
+                modifiers[idx] = dict(modifiers[idx], profiles=refs)
+
+        executor = self.executor
+        try:
+            with self.profiler.stage('generation'):
+                if executor is None and self.workers > 1:
+                    executor = concurrent.futures.ProcessPoolExecutor(max_workers=self.workers)
+                pending = {}
+                if executor is not None:
+                    pending = self._submit_features(executor, items, modifiers)
+
+            reused = {}
+
+            def lines_for(item):
+                idx = item[0]
+                uses[idx] -= 1
+                if idx in reused:
+                    return reused.pop(idx) if uses[idx] == 0 else reused[idx]
+                # Features are generated lazily while writing, but timed as generation
+                with self.profiler.resume('generation'):
+                    lines = self._generate_feature(item, modifiers[idx], pending)
+                if uses[idx] > 0:
+                    reused[idx] = lines
+                return lines
+
+            # Module definitions are written out as soon as they are registered;
+            # modules maps each key to its name
+            modules = {}
+            module_stream = tempfile.SpooledTemporaryFile(max_size=MODULE_SPILL_BYTES, mode='w+')
+            module_writer = SCADWriter(module_stream)
+
+            def repeat_lines(node):
+                return self._repeat_lines(node, modules, module_writer)
+
+            def leaf_lines(item):
+                # Features copied by patterns and mirrors are drawn by a shared module
+                lines = lines_for(item)
+                if item[0] not in shared:
+                    return lines
+                key = ('feature', item[0])
+                if key not in modules:
+                    modules[key] = shared[item[0]]
+                    self._write_module(module_writer, shared[item[0]], lines)
+                return [f"// {item[1][1]}", f"{shared[item[0]]}();"]
+
+            try:
+                with self.profiler.stage('join'):
+                    self._write_profiles(writer, profile_definitions)
+                    self._write_bodies(writer, bodies, global_cutters, leaf_lines, repeat_lines)
+                    self._write_modules(writer, module_writer)
+            finally:
+                module_stream.close()
+        finally:
+            if executor is not None and executor is not self.executor:
+                executor.shutdown()
+
+    def _analyze_timeline(self, timeline: list, errors: list) -> tuple:
+        """Pass 1: analyze features and collect fillet/chamfer modifiers per body"""
         # PASS 1: Collect all features and associate modifiers
         # Use body NAMES instead of entityToken for matching, as tokens change
         # when bodies are modified by subsequent features
         features_data = []
         feature_to_body_name = {}  # Maps feature index to body name
         body_modifiers = {}  # Maps body name to modifiers
+        feature_index = {}  # Maps entity token and name to feature index
+        shared = {}  # Maps index of a feature copied by a pattern or mirror to its module name
 
-        for i in range(timeline.count):
-            item = timeline.item(i)
-            entity = item.entity
+        for entity in timeline:
+            feature_name = entity['name']
 
-            if entity is None:
-                continue
+            with self.profiler.feature(feature_name):
+                try:
+                    if 'error' in entity:
+                        raise RuntimeError(entity['error'])
 
-            feature_name = item.name if hasattr(item, 'name') else f"feature_{i}"
+                    handler = get_feature_handler(entity)
+                    if handler is None or handler.analyze is None:
+                        continue
 
-            try:
-                if isinstance(entity, adsk.fusion.ExtrudeFeature):
-                    info = analyze_extrude_feature(entity)
-                    features_data.append((entity, feature_name, info, 'extrude'))
-
-                    try:
-                        for body in entity.bodies:
-                            body_name = body.name
-                            feature_to_body_name[len(features_data) - 1] = body_name
-                            if body_name not in body_modifiers:
-                                body_modifiers[body_name] = {
-                                    'rounding': 0,
-                                    'chamfer': 0,
-                                    'rounding_edges': set(),
-                                    'chamfer_edges': set()
-                                }
-                    except:
-                        pass
-
-                elif isinstance(entity, adsk.fusion.RevolveFeature):
-                    info = analyze_revolve_feature(entity)
-                    features_data.append((entity, feature_name, info, 'revolve'))
-
-                    try:
-                        for body in entity.bodies:
-                            body_name = body.name
-                            feature_to_body_name[len(features_data) - 1] = body_name
-                            if body_name not in body_modifiers:
-                                body_modifiers[body_name] = {
-                                    'rounding': 0,
-                                    'chamfer': 0,
-                                    'rounding_edges': set(),
-                                    'chamfer_edges': set()
-                                }
-                    except:
-                        pass
-
-                elif isinstance(entity, adsk.fusion.HoleFeature):
-                    info = analyze_hole_feature(entity)
-                    features_data.append((entity, feature_name, info, 'hole'))
-
-                elif isinstance(entity, adsk.fusion.FilletFeature):
-                    info = analyze_fillet_feature(entity)
-                    for body_name in info['affected_body_names']:
-                        if body_name not in body_modifiers:
-                            body_modifiers[body_name] = {
-                                'rounding': 0,
-                                'chamfer': 0,
-                                'rounding_edges': set(),
-                                'chamfer_edges': set()
-                            }
-                        # Update rounding radius (take max if multiple fillets)
-                        body_modifiers[body_name]['rounding'] = max(
-                            body_modifiers[body_name]['rounding'],
-                            info['radius']
-                        )
-                        # Add edge types for selective rounding
-                        body_modifiers[body_name]['rounding_edges'].update(
-                            info.get('edge_types', set())
-                        )
+                    fingerprint = None
+                    if self.fragment_cache is not None:
+                        fingerprint = fingerprint_record(entity, self.parameters, dict(
+                            self.tessellation, exact_arcs=self.exact_arcs, parametric=self.parametric
+                        ))
 
-                elif isinstance(entity, adsk.fusion.ChamferFeature):
-                    info = analyze_chamfer_feature(entity)
-                    for body_name in info['affected_body_names']:
-                        if body_name not in body_modifiers:
-                            body_modifiers[body_name] = {
-                                'rounding': 0,
-                                'chamfer': 0,
-                                'rounding_edges': set(),
-                                'chamfer_edges': set()
-                            }
-                        # Update chamfer distance (take max if multiple chamfers)
-                        body_modifiers[body_name]['chamfer'] = max(
-                            body_modifiers[body_name]['chamfer'],
-                            info['distance']
-                        )
-                        # Add edge types for selective chamfering
-                        body_modifiers[body_name]['chamfer_edges'].update(
-                            info.get('edge_types', set())
+                    info = self._analyze(entity, fingerprint, handler)
+
+                    if handler.modifier:
+                        modifier, key = handler.modifier
+                        for body_name in info['affected_body_names']:
+                            if body_name not in body_modifiers:
+                                body_modifiers[body_name] = new_modifiers()
+                            modifiers = body_modifiers[body_name]
+                            # Take the largest size if several features touch the body
+                            if info[key] > modifiers[modifier]:
+                                modifiers[f'{modifier}_expr'] = info.get('expressions', {}).get(key)
+                            modifiers[modifier] = max(modifiers[modifier], info[key])
+                            # Add edge types for selective rounding/chamfering
+                            modifiers[f'{modifier}_edges'].update(info.get('edge_types', set()))
+
+                    elif handler.copies_features:
+                        self._add_feature_copies(
+                            (entity, feature_name, info, handler, fingerprint),
+                            features_data, feature_index, shared, errors
                         )
 
-                elif isinstance(entity, adsk.fusion.Sketch):
-                    pass
+                    elif handler.generate:
+                        features_data.append((entity, feature_name, info, handler, fingerprint))
+                        feature_index[feature_name] = len(features_data) - 1
+                        if entity.get('entity_token'):
+                            feature_index[entity['entity_token']] = len(features_data) - 1
+
+                        # Cutters do not take on the fillets of the bodies they cut
+                        if handler.creates_bodies and handler.operation(info) == 'union':
+                            try:
+                                for body in entity['bodies']:
+                                    body_name = body['name']
+                                    feature_to_body_name[len(features_data) - 1] = body_name
+                                    if body_name not in body_modifiers:
+                                        body_modifiers[body_name] = new_modifiers()
+                            except:
+                                pass
+
+                except Exception as e:
+                    errors.append(f"// Error analyzing {feature_name}: {str(e)}")
+
+        return features_data, feature_to_body_name, body_modifiers, shared
+
+    def _add_feature_copies(self, item: tuple, features_data: list, feature_index: dict,
+                            shared: dict, errors: list):
+        """Add one copy per input of a pattern or mirror, each drawing its input's shared module"""
+        entity, feature_name, info, handler, fingerprint = item
+        for source in info['inputs']:
+            idx = feature_index.get(source.get('token'), feature_index.get(source['name']))
+            if idx is None:
+                errors.append(f"// Error analyzing {feature_name}: "
+                              f"input {source['name']} is not supported")
+                continue
 
-            except Exception as e:
-                scad_code.append(f"// Error analyzing {feature_name}: {str(e)}")
+            source_entity, source_name, source_info, source_handler = features_data[idx][:4]
+            if idx not in shared:
+                # Names that sanitize alike ("Cut1", "cut1") get a counter
+                base = f"{sanitize_name(source_name)}_feature"
+                name, n = base, 1
+                while name in shared.values():
+                    n += 1
+                    name = f"{base}_{n}"
+                shared[idx] = name
+
+            copy_info = dict(
+                info,
+                module=shared[idx],
+                source=source_name,
+                operation=source_handler.operation(source_info)
+            )
+            # Copies cut or join the pattern or mirror bodies, or else those of the input
+            copy_entity = dict(entity, bodies=entity.get('bodies') or source_entity.get('bodies'))
+            features_data.append((
+                copy_entity, feature_name, copy_info, handler,
+                f"{fingerprint}:{source_name}:{shared[idx]}" if fingerprint else None
+            ))
+
+    def _analyze(self, entity: dict, fingerprint: str, handler: FeatureHandler) -> dict:
+        """Run a feature's analyzer, reusing the cached result for an unchanged feature"""
+        def run():
+            info = self._bind_feature_expressions(entity, handler, handler.analyze(entity))
+            info['tessellation'] = self.tessellation
+            info['exact_arcs'] = self.exact_arcs
+            return info
+
+        if fingerprint is None:
+            return run()
+        return self.fragment_cache.analysis(fingerprint, run)
+
+    def _feature_operation(self, item: tuple) -> str:
+        """Boolean operation of one analyzed feature ('union', 'difference', ...)"""
+        entity, feature_name, info, handler, fingerprint = item[1]
+        return handler.operation(info) if handler.operation else None
+
+    def _submit_features(self, executor, items: list, modifiers: dict) -> dict:
+        """Start generating every feature without a cached fragment on the executor"""
+        pending = {}
+        for idx, (entity, feature_name, info, handler, fingerprint) in items:
+            if fingerprint is not None and self.fragment_cache.has_fragment(
+                    fingerprint, modifiers[idx]):
+                continue
+            pending[idx] = executor.submit(
+                generate_feature_scad, handler.object_type, info, feature_name, modifiers[idx]
+            )
+        return pending
 
-        # PASS 2: Generate SCAD code with modifiers applied
-        current_ops = {'union': [], 'difference': [], 'intersection': []}
+    def _generate_feature(self, item: tuple, modifiers: dict, pending: dict) -> list:
+        """Pass 2: generate SCAD lines for one feature with its modifiers applied.
 
-        default_modifiers = {
-            'rounding': 0,
-            'chamfer': 0,
-            'rounding_edges': set(),
-            'chamfer_edges': set()
-        }
+        Features submitted to a worker pool are collected from their future,
+        so fragments are reassembled in timeline order.
+        """
+        idx, (entity, feature_name, info, handler, fingerprint) = item
 
-        for idx, (entity, feature_name, info, feature_type) in enumerate(features_data):
+        with self.profiler.feature(feature_name):
             try:
-                body_name = feature_to_body_name.get(idx)
-                modifiers = body_modifiers.get(body_name, default_modifiers)
-                rounding = modifiers['rounding']
-                chamfer = modifiers['chamfer']
-                rounding_edges = modifiers.get('rounding_edges', set())
-                chamfer_edges = modifiers.get('chamfer_edges', set())
-
-                if feature_type == 'extrude':
-                    code = generate_extrude_scad(
-                        info, feature_name,
-                        rounding=rounding, chamfer=chamfer,
-                        rounding_edges=rounding_edges, chamfer_edges=chamfer_edges
-                    )
-
-                    if info['operation'] == 'new' or info['operation'] == 'union':
-                        current_ops['union'].extend(code)
-                    elif info['operation'] == 'difference':
-                        current_ops['difference'].extend(code)
-                    elif info['operation'] == 'intersection':
-                        current_ops['intersection'].extend(code)
-
-                elif feature_type == 'revolve':
-                    code = generate_revolve_scad(info, feature_name)
-                    current_ops['union'].extend(code)
-
-                elif feature_type == 'hole':
-                    code = generate_hole_scad(info, feature_name)
-                    current_ops['difference'].extend(code)
+                def generate():
+                    if idx in pending:
+                        return pending[idx].result()
+                    return generate_feature_scad(handler.object_type, info, feature_name, modifiers)
+
+                # Fragments hold unindented lines, so they can be reused anywhere
+                if fingerprint is None:
+                    return generate()
+                return self.fragment_cache.fragment(fingerprint, modifiers, generate)
 
             except Exception as e:
-                scad_code.append(f"// Error generating {feature_name}: {str(e)}")
-
-        # Combine boolean operations
-        if current_ops['difference']:
-            scad_code.append("difference() {")
-            if current_ops['union']:
-                scad_code.append("    union() {")
-                for line in current_ops['union']:
-                    scad_code.append(f"        {line}")
-                scad_code.append("    }")
-            for line in current_ops['difference']:
-                scad_code.append(f"    {line}")
-            scad_code.append("}")
-        elif current_ops['union']:
-            if len(current_ops['union']) > 3:
-                scad_code.append("union() {")
-                for line in current_ops['union']:
-                    scad_code.append(f"    {line}")
-                scad_code.append("}")
-            else:
-                scad_code.extend(current_ops['union'])
+                return [f"// Error generating {feature_name}: {str(e)}"]
 
-        return scad_code
+    def _repeat_key(self, item: tuple):
+        """Repeat key of a cutter leaf, or None if it cannot be shared"""
+        entity, feature_name, info, handler, fingerprint = item[1]
+        if handler.repeat_key is None or handler.generate_module is None:
+            return None
+        try:
+            return (handler.object_type, handler.repeat_key(info))
+        except Exception:
+            return None
+
+    def _repeat_lines(self, node: tuple, modules: dict, module_writer: SCADWriter) -> list:
+        """Lines instantiating a repeat group; registers and writes its module first"""
+        key, group = ('repeat', node[1]), node[2]
+        if key not in modules:
+            handler, info = group[0][1][3], group[0][1][2]
+            number = sum(1 for other in modules if other[0] == 'repeat') + 1
+            modules[key] = f"{handler.kind}_{number}"
+            self._write_module(module_writer, modules[key], handler.generate_module(info))
+        module_name = modules[key]
+
+        names = [item[1][1] for item in group]
+        positions = [pos for item in group for pos in item[1][2]['positions']]
+        label = ", ".join(names[:3]) + (", ..." if len(names) > 3 else "")
+        label += f" ({len(group)} features, {len(positions)} positions)"
+        return list(generate_instances_scad(module_name, positions, label))
+
+    def _write_module(self, module_writer: SCADWriter, module_name: str, lines):
+        """Define one shared or repeat module"""
+        with module_writer.block(f"module {module_name}()"):
+            module_writer.write_lines(lines)
+
+    def _write_modules(self, writer: SCADWriter, module_writer: SCADWriter):
+        """Append the modules used by repeat groups (OpenSCAD hoists modules)"""
+        if not module_writer.line_count:
+            return
+        writer.write_line("")
+        writer.write_line("// Repeated feature modules")
+        writer.write_from(module_writer)
+
+    def _write_profiles(self, writer: SCADWriter, definitions: dict):
+        """Write the profile functions or constants the geometry refers to"""
+        if not definitions:
+            return
+        generate = generate_profile_constants if self.hoist_profiles else generate_profile_function
+        writer.write_line("// Profiles")
+        for name, paths in definitions.items():
+            writer.write_lines(generate(name, paths))
+        writer.write_line("")
+
+    def _write_bodies(self, writer: SCADWriter, bodies: list, global_cutters: list, lines_for,
+                      repeat_lines=None):
+        """Write each body's boolean tree, then cutters not attributed to a body"""
+        def write_all():
+            for body in bodies:
+                writer.write_line(f"// Body: {body['name']}")
+                write_node(writer, body['node'], lines_for, repeat_lines)
+
+        if not global_cutters:
+            write_all()
+            return
+
+        with writer.block("difference()"):
+            if bodies:
+                with writer.block("union()"):
+                    write_all()
+            for cutter in global_cutters:
+                write_node(writer, cutter, lines_for, repeat_lines)
 
     def export(self) -> str:
         """Generate complete OpenSCAD file content"""
-        all_lines = []
+        buffer = io.StringIO()
+        self.export_to(buffer)
+        return buffer.getvalue()
+
+    def export_file(self, filepath: str) -> int:
+        """Stream the OpenSCAD file straight to disk and return its line count"""
+        with open(filepath, 'w') as f:
+            return self.export_to(f)
+
+    def export_to(self, stream) -> int:
+        """Stream the OpenSCAD file to a text stream and return its line count.
+
+        Generators yield their lines into a buffered SCADWriter that applies
+        indentation once, so the complete output is never held in memory.
+        """
+        # Capture up front so it is profiled as its own stage
+        self.capture()
 
-        all_lines.extend(generate_header())
+        writer = SCADWriter(stream)
+        writer.write_lines(generate_header())
 
-        self.extract_parameters()
-        all_lines.extend(generate_parameters_section(self.parameters))
+        with self.profiler.stage('extract_parameters'):
+            self.extract_parameters()
+            writer.write_lines(generate_parameters_section(self.parameters))
 
-        all_lines.extend([
+        writer.write_lines([
             "// ============================================",
             "// Geometry (exported from Fusion 360 features)",
             "// ============================================",
             ""
         ])
 
-        geometry_code = self.process_timeline()
-        all_lines.extend(geometry_code)
+        self.write_timeline(writer)
 
-        return '\n'.join(all_lines)
+        writer.flush()
+        return writer.line_count
 
     def export_debug_json(self) -> dict:
-        """Export detailed debug information from the Fusion 360 API"""
+        """Export detailed debug information from the captured Fusion 360 data.
+
+        Renders from the same snapshot as export(), so the design is only
+        walked once per export.
+        """
+        with self.profiler.stage('debug_json'):
+            return self._export_debug_json(self.capture())
+
+    def _export_debug_json(self, snapshot: dict) -> dict:
         debug_data = {
-            'design_name': self.design.rootComponent.name,
+            'design_name': snapshot['design_name'],
             'parameters': {},
             'features': [],
             'bodies': [],
@@ -279,215 +655,44 @@ class SCADExporter:
         }
 
         # Export parameters
-        params = self.design.userParameters
-        for i in range(params.count):
-            param = params.item(i)
-            debug_data['parameters'][param.name] = {
-                'value': param.value,
-                'value_mm': param.value * CM_TO_MM,
-                'unit': param.unit,
-                'expression': param.expression,
-                'comment': param.comment
+        for param in snapshot['parameters']:
+            debug_data['parameters'][param['name']] = {
+                'value': param['value'],
+                'value_mm': param['value'] * CM_TO_MM,
+                'unit': param['unit'],
+                'expression': param['expression'],
+                'comment': param['comment']
             }
 
         # Export timeline features
-        timeline = self.design.timeline
-        for i in range(timeline.count):
-            item = timeline.item(i)
-            entity = item.entity
-            if entity is None:
-                continue
-
+        for entity in snapshot['timeline']:
             feature_data = {
-                'index': i,
-                'name': item.name if hasattr(item, 'name') else f'feature_{i}',
-                'type': type(entity).__name__,
+                'index': entity['index'],
+                'name': entity['name'],
+                'type': entity['type'],
                 'details': {}
             }
 
-            try:
-                if isinstance(entity, adsk.fusion.ExtrudeFeature):
-                    profiles = entity.profile
-                    profile = profiles if isinstance(profiles, adsk.fusion.Profile) else (profiles.item(0) if profiles.count > 0 else None)
-
-                    if profile:
-                        # Debug: Export profile curve details
-                        profile_debug = {
-                            'loop_count': profile.profileLoops.count,
-                            'loops': []
-                        }
-                        for loop_idx in range(profile.profileLoops.count):
-                            loop = profile.profileLoops.item(loop_idx)
-                            loop_data = {
-                                'is_outer': loop.isOuter,
-                                'curve_count': loop.profileCurves.count,
-                                'curves': []
-                            }
-                            for curve_idx in range(loop.profileCurves.count):
-                                curve = loop.profileCurves.item(curve_idx)
-                                entity_type = type(curve.sketchEntity).__name__
-                                curve_data = {'index': curve_idx, 'type': entity_type}
-                                try:
-                                    curve_geom = curve.geometry
-                                    evaluator = curve_geom.evaluator
-                                    (ret, start_param, end_param) = evaluator.getParameterExtents()
-                                    if ret:
-                                        (ret, start_pt) = evaluator.getPointAtParameter(start_param)
-                                        (ret2, end_pt) = evaluator.getPointAtParameter(end_param)
-                                        if ret:
-                                            curve_data['start'] = {'x': round(start_pt.x * 10, 2), 'y': round(start_pt.y * 10, 2)}
-                                        if ret2:
-                                            curve_data['end'] = {'x': round(end_pt.x * 10, 2), 'y': round(end_pt.y * 10, 2)}
-                                except:
-                                    pass
-                                loop_data['curves'].append(curve_data)
-                            profile_debug['loops'].append(loop_data)
-                        feature_data['details']['profile_curves'] = profile_debug
-
-                        sketch = profile.parentSketch
-                        if sketch:
-                            transform = sketch.transform
-                            origin = sketch.origin
-
-                            feature_data['details']['sketch_name'] = sketch.name
-                            feature_data['details']['sketch_origin'] = {
-                                'x': origin.x * CM_TO_MM,
-                                'y': origin.y * CM_TO_MM,
-                                'z': origin.z * CM_TO_MM
-                            }
-
-                            if transform:
-                                cs = transform.getAsCoordinateSystem()
-                                origin_pt, x_axis, y_axis, z_axis = cs
-
-                                feature_data['details']['transform'] = {
-                                    'origin': {'x': origin_pt.x, 'y': origin_pt.y, 'z': origin_pt.z},
-                                    'x_axis': {'x': x_axis.x, 'y': x_axis.y, 'z': x_axis.z},
-                                    'y_axis': {'x': y_axis.x, 'y': y_axis.y, 'z': y_axis.z},
-                                    'z_axis': {'x': z_axis.x, 'y': z_axis.y, 'z': z_axis.z}
-                                }
-
-                            ref_plane = sketch.referencePlane
-                            if ref_plane:
-                                feature_data['details']['reference_plane'] = str(type(ref_plane).__name__)
-                                if hasattr(ref_plane, 'geometry'):
-                                    plane_geom = ref_plane.geometry
-                                    if hasattr(plane_geom, 'normal'):
-                                        n = plane_geom.normal
-                                        feature_data['details']['plane_normal'] = {'x': n.x, 'y': n.y, 'z': n.z}
-                                    if hasattr(plane_geom, 'origin'):
-                                        o = plane_geom.origin
-                                        feature_data['details']['plane_origin'] = {'x': o.x, 'y': o.y, 'z': o.z}
-
-                    extent_def = entity.extentOne
-                    if isinstance(extent_def, adsk.fusion.DistanceExtentDefinition):
-                        feature_data['details']['height_cm'] = extent_def.distance.value
-                        feature_data['details']['height_mm'] = extent_def.distance.value * CM_TO_MM
-
-                    try:
-                        start_faces = entity.startFaces
-                        if start_faces and start_faces.count > 0:
-                            face = start_faces.item(0)
-                            if hasattr(face, 'geometry') and hasattr(face.geometry, 'normal'):
-                                n = face.geometry.normal
-                                feature_data['details']['start_face_normal'] = {'x': n.x, 'y': n.y, 'z': n.z}
-                    except:
-                        pass
-
-                    try:
-                        end_faces = entity.endFaces
-                        if end_faces and end_faces.count > 0:
-                            face = end_faces.item(0)
-                            if hasattr(face, 'geometry') and hasattr(face.geometry, 'normal'):
-                                n = face.geometry.normal
-                                feature_data['details']['end_face_normal'] = {'x': n.x, 'y': n.y, 'z': n.z}
-                    except:
-                        pass
-
-                    try:
-                        bodies = entity.bodies
-                        body_list = []
-                        for b in range(bodies.count):
-                            body = bodies.item(b)
-                            bbox = body.boundingBox
-                            body_list.append({
-                                'name': body.name,
-                                'bbox_min': {'x': bbox.minPoint.x * CM_TO_MM, 'y': bbox.minPoint.y * CM_TO_MM, 'z': bbox.minPoint.z * CM_TO_MM},
-                                'bbox_max': {'x': bbox.maxPoint.x * CM_TO_MM, 'y': bbox.maxPoint.y * CM_TO_MM, 'z': bbox.maxPoint.z * CM_TO_MM}
-                            })
-                        feature_data['details']['bodies'] = body_list
-                    except:
-                        pass
-
-                    op_map = {
-                        0: 'JoinFeatureOperation',
-                        1: 'CutFeatureOperation',
-                        2: 'IntersectFeatureOperation',
-                        3: 'NewBodyFeatureOperation',
-                        4: 'NewComponentFeatureOperation'
-                    }
-                    feature_data['details']['operation'] = op_map.get(entity.operation, str(entity.operation))
-
-                elif isinstance(entity, adsk.fusion.HoleFeature):
-                    if entity.holeDiameter:
-                        feature_data['details']['diameter'] = entity.holeDiameter.value * CM_TO_MM
-
-                    types = {
-                        0: 'SimpleHole', 1: 'CounterboreHole', 2: 'CountersinkHole'
-                    }
-                    feature_data['details']['hole_type'] = types.get(entity.holeType, str(entity.holeType))
-
-                    if entity.position:
-                        p = entity.position
-                        feature_data['details']['position'] = {'x': p.x * CM_TO_MM, 'y': p.y * CM_TO_MM, 'z': p.z * CM_TO_MM}
-
-                elif isinstance(entity, adsk.fusion.FilletFeature):
-                    try:
-                        edge_sets = entity.edgeSets
-                        feature_data['details']['edge_set_count'] = edge_sets.count
-                        if edge_sets.count > 0:
-                            edge_set = edge_sets.item(0)
-                            feature_data['details']['edge_set_type'] = type(edge_set).__name__
-                            if isinstance(edge_set, adsk.fusion.ConstantRadiusFilletEdgeSet):
-                                feature_data['details']['radius_mm'] = edge_set.radius.value * CM_TO_MM
-
-                        # Try to get affected bodies from fillet faces (more reliable)
-                        body_names = set()
-                        try:
-                            faces = entity.faces
-                            feature_data['details']['face_count'] = faces.count
-                            for j in range(faces.count):
-                                face = faces.item(j)
-                                if face.body:
-                                    body_names.add(face.body.name)
-                        except:
-                            pass
-
-                        feature_data['details']['affected_bodies'] = list(body_names)
-                    except Exception as e:
-                        feature_data['details']['error'] = str(e)
-
-                elif isinstance(entity, adsk.fusion.Sketch):
-                    feature_data['details']['profile_count'] = entity.profiles.count
-                    feature_data['details']['curve_count'] = entity.sketchCurves.count
-
-            except Exception as e:
-                feature_data['error'] = str(e)
+            if 'error' in entity:
+                feature_data['error'] = entity['error']
+            else:
+                try:
+                    feature_data['details'] = self._debug_details(entity)
+                except Exception as e:
+                    feature_data['error'] = str(e)
 
             debug_data['features'].append(feature_data)
 
         # Export bodies from root component
-        try:
-            bodies = self.design.rootComponent.bRepBodies
-            for i in range(bodies.count):
-                body = bodies.item(i)
-                bbox = body.boundingBox
-                debug_data['bodies'].append({
-                    'name': body.name,
-                    'bbox_min': {'x': bbox.minPoint.x * CM_TO_MM, 'y': bbox.minPoint.y * CM_TO_MM, 'z': bbox.minPoint.z * CM_TO_MM},
-                    'bbox_max': {'x': bbox.maxPoint.x * CM_TO_MM, 'y': bbox.maxPoint.y * CM_TO_MM, 'z': bbox.maxPoint.z * CM_TO_MM}
-                })
-        except:
-            pass
+        debug_data['bodies'] = [
+            debug_body(body) for body in snapshot.get('bodies', []) if body.get('bbox')
+        ]
 
         return debug_data
+
+    def _debug_details(self, entity: dict) -> dict:
+        """Build the debug 'details' dict for one captured timeline record"""
+        handler = get_feature_handler(entity)
+        if handler is None or handler.debug is None:
+            return {}
+        return handler.debug(entity)
@@ -0,0 +1,183 @@
+#Author: Fusion2SCAD
+#Description: Per-body boolean (CSG) tree built from feature operations
+#
+# Every body gets its own tree, so a cut or intersect only applies to the
+# bodies Fusion reports it touched instead of to the whole model. Nodes are
+# tuples whose child lists are extended in place while the tree is built:
+#   ('leaf', item)                     one analyzed feature
+#   ('union', [children])
+#   ('difference', base, [cutters])
+#   ('intersection', [children])
+#   ('repeat', key, [items])           cutters that differ only in position
+
+
+def _join(node: tuple, leaf: tuple) -> tuple:
+    if node[0] == 'union':
+        node[1].append(leaf)
+        return node
+    return ('union', [node, leaf])
+
+
+def _cut(node: tuple, leaf: tuple) -> tuple:
+    if node[0] == 'difference':
+        node[2].append(leaf)
+        return node
+    return ('difference', node, [leaf])
+
+
+def _intersect(node: tuple, leaf: tuple) -> tuple:
+    if node[0] == 'intersection':
+        node[1].append(leaf)
+        return node
+    return ('intersection', [node, leaf])
+
+
+def build_body_trees(features: list, operation_of) -> tuple:
+    """Build one boolean tree per body from features in timeline order.
+
+    Args:
+        features: (idx, (record, feature_name, info, ...)) items in timeline order
+        operation_of: operation_of(item) -> 'union', 'difference',
+            'intersection' or None to skip the feature
+
+    Returns:
+        (bodies, global_cutters): bodies as {'name', 'node'} dicts in creation
+        order, and cut leaves that name no known body (older snapshots did
+        not record hole bodies); these apply to every body as before
+    """
+    bodies = []
+    by_name = {}
+    global_cutters = []
+
+    for item in features:
+        operation = operation_of(item)
+        if operation is None:
+            continue
+
+        record, feature_name = item[1][0], item[1][1]
+        leaf = ('leaf', item)
+        names = [body['name'] for body in record.get('bodies') or []]
+
+        targets = []
+        for name in names:
+            body = by_name.get(name)
+            if body is not None and body not in targets:
+                targets.append(body)
+
+        if operation == 'union':
+            if not targets:
+                body = {'name': names[0] if names else feature_name, 'node': leaf}
+                bodies.append(body)
+            else:
+                # A join that touches several bodies merges them into the first
+                body = targets[0]
+                for other in targets[1:]:
+                    body['node'] = _join(body['node'], other['node'])
+                    bodies.remove(other)
+                    for name, mapped in list(by_name.items()):
+                        if mapped is other:
+                            by_name[name] = body
+                body['node'] = _join(body['node'], leaf)
+            for name in names:
+                by_name[name] = body
+
+        elif not targets:
+            if operation == 'difference':
+                global_cutters.append(leaf)
+            else:
+                # An intersect with no known body keeps only the overlap with everything
+                for body in bodies:
+                    body['node'] = _intersect(body['node'], leaf)
+
+        else:
+            apply = _cut if operation == 'difference' else _intersect
+            for body in targets:
+                body['node'] = apply(body['node'], leaf)
+
+    return bodies, global_cutters
+
+
+def group_repeats(cutters: list, key_of) -> list:
+    """Merge cutters that share a repeat key into ('repeat', key, items) nodes.
+
+    A group takes the place of its first member; keys that occur once stay
+    plain leaves.
+    """
+    result = []
+    groups = {}
+    for cutter in cutters:
+        key = key_of(cutter[1]) if cutter[0] == 'leaf' else None
+        if key is None:
+            result.append(cutter)
+        elif key in groups:
+            groups[key][2].append(cutter[1])
+        else:
+            groups[key] = ('repeat', key, [cutter[1]])
+            result.append(groups[key])
+
+    return [
+        ('leaf', node[2][0]) if node[0] == 'repeat' and len(node[2]) == 1 else node
+        for node in result
+    ]
+
+
+def group_tree_repeats(node: tuple, key_of):
+    """Apply group_repeats() to the cutters of every difference in a tree"""
+    kind = node[0]
+    if kind == 'difference':
+        group_tree_repeats(node[1], key_of)
+        node[2][:] = group_repeats(node[2], key_of)
+        for cutter in node[2]:
+            group_tree_repeats(cutter, key_of)
+    elif kind in ('union', 'intersection'):
+        for child in node[1]:
+            group_tree_repeats(child, key_of)
+
+
+def iter_leaves(node: tuple):
+    """Yield every leaf item of a tree, depth first (repeat groups are not leaves)"""
+    kind = node[0]
+    if kind == 'leaf':
+        yield node[1]
+    elif kind == 'repeat':
+        return
+    elif kind == 'difference':
+        yield from iter_leaves(node[1])
+        for cutter in node[2]:
+            yield from iter_leaves(cutter)
+    else:
+        for child in node[1]:
+            yield from iter_leaves(child)
+
+
+def write_node(writer, node: tuple, lines_for, repeat_lines=None, single: bool = False):
+    """Write a tree with a SCADWriter.
+
+    Args:
+        lines_for: lines_for(item) -> SCAD lines of one feature
+        repeat_lines: repeat_lines(node) -> SCAD lines of a repeat group
+        single: The node must be one object (difference base, intersection
+            operand), so a leaf with several shapes is wrapped in union()
+    """
+    kind = node[0]
+    if kind == 'repeat':
+        writer.write_lines(repeat_lines(node))
+    elif kind == 'leaf':
+        if single:
+            with writer.block("union()"):
+                writer.write_lines(lines_for(node[1]))
+        else:
+            writer.write_lines(lines_for(node[1]))
+    elif kind == 'union':
+        with writer.block("union()"):
+            for child in node[1]:
+                write_node(writer, child, lines_for, repeat_lines)
+    elif kind == 'difference':
+        with writer.block("difference()"):
+            write_node(writer, node[1], lines_for, repeat_lines, single=True)
+            for cutter in node[2]:
+                write_node(writer, cutter, lines_for, repeat_lines)
+    elif kind == 'intersection':
+        with writer.block("intersection()"):
+            for child in node[1]:
+                write_node(writer, child, lines_for, repeat_lines, single=True)
@@ -0,0 +1,155 @@
+#Author: Fusion2SCAD
+#Description: Debug JSON details for captured timeline records
+
+from .utils import CM_TO_MM
+from .analyzers import OPERATION_NAMES, HOLE_TYPE_NAMES
+
+
+def debug_xy(point: list) -> dict:
+    return {'x': round(point[0] * 10, 2), 'y': round(point[1] * 10, 2)}
+
+
+def debug_vector(vector: list) -> dict:
+    return {'x': vector[0], 'y': vector[1], 'z': vector[2]}
+
+
+def debug_body(body: dict) -> dict:
+    bbox = body['bbox']
+    return {
+        'name': body['name'],
+        'bbox_min': {axis: v * CM_TO_MM for axis, v in zip('xyz', bbox['min'])},
+        'bbox_max': {axis: v * CM_TO_MM for axis, v in zip('xyz', bbox['max'])}
+    }
+
+
+def debug_extrude_feature(feature: dict) -> dict:
+    """Debug details of a captured extrude: profile curves, sketch placement, bodies"""
+    details = {}
+    profile = feature['profiles'][0] if feature['profiles'] else None
+
+    if profile:
+        # Debug: Export profile curve details
+        profile_debug = {
+            'loop_count': len(profile['loops']),
+            'loops': []
+        }
+        for loop in profile['loops']:
+            loop_data = {
+                'is_outer': loop['is_outer'],
+                'curve_count': len(loop['curves']),
+                'curves': []
+            }
+            for curve_idx, curve in enumerate(loop['curves']):
+                curve_data = {'index': curve_idx, 'type': curve['type']}
+                if not curve.get('fallback'):
+                    if curve.get('start'):
+                        curve_data['start'] = debug_xy(curve['start'])
+                    if curve.get('end'):
+                        curve_data['end'] = debug_xy(curve['end'])
+                loop_data['curves'].append(curve_data)
+            profile_debug['loops'].append(loop_data)
+        details['profile_curves'] = profile_debug
+
+        sketch = feature.get('sketch')
+        if sketch:
+            ox, oy, oz = sketch['origin']
+            details['sketch_name'] = sketch['name']
+            details['sketch_origin'] = {
+                'x': ox * CM_TO_MM,
+                'y': oy * CM_TO_MM,
+                'z': oz * CM_TO_MM
+            }
+
+            transform = sketch['transform']
+            if transform:
+                details['transform'] = {
+                    key: debug_vector(transform[key])
+                    for key in ('origin', 'x_axis', 'y_axis', 'z_axis')
+                }
+
+            ref_plane = sketch.get('reference_plane')
+            if ref_plane:
+                details['reference_plane'] = ref_plane['type']
+                if 'normal' in ref_plane:
+                    details['plane_normal'] = debug_vector(ref_plane['normal'])
+                if 'origin' in ref_plane:
+                    details['plane_origin'] = debug_vector(ref_plane['origin'])
+
+    extent = feature['extent_one']
+    if extent and extent['type'] == 'distance':
+        details['height_cm'] = extent['value']
+        details['height_mm'] = extent['value'] * CM_TO_MM
+
+    if feature.get('start_face_normal'):
+        details['start_face_normal'] = debug_vector(feature['start_face_normal'])
+    if feature.get('end_face_normal'):
+        details['end_face_normal'] = debug_vector(feature['end_face_normal'])
+
+    details['bodies'] = [
+        debug_body(body) for body in feature['bodies'] if body.get('bbox')
+    ]
+
+    details['operation'] = OPERATION_NAMES.get(feature['operation'], str(feature['operation']))
+
+    return details
+
+
+def debug_hole_feature(feature: dict) -> dict:
+    """Debug details of a captured hole"""
+    details = {}
+    if feature['diameter']:
+        details['diameter'] = feature['diameter']['value'] * CM_TO_MM
+
+    details['hole_type'] = HOLE_TYPE_NAMES.get(feature['hole_type'], str(feature['hole_type']))
+
+    if feature['position']:
+        x, y, z = feature['position']
+        details['position'] = {'x': x * CM_TO_MM, 'y': y * CM_TO_MM, 'z': z * CM_TO_MM}
+
+    return details
+
+
+def debug_fillet_feature(feature: dict) -> dict:
+    """Debug details of a captured fillet"""
+    details = {'edge_set_count': feature['edge_set_count']}
+    if feature['edge_set_count'] > 0:
+        details['edge_set_type'] = feature['edge_set_type']
+        if feature['radius']:
+            details['radius_mm'] = feature['radius']['value'] * CM_TO_MM
+    details['face_count'] = feature['face_count']
+    details['affected_bodies'] = sorted({body['name'] for body in feature['affected_bodies']})
+    return details
+
+
+def debug_sketch(sketch: dict) -> dict:
+    """Debug details of a captured sketch"""
+    return {
+        'profile_count': sketch['profile_count'],
+        'curve_count': sketch['curve_count']
+    }
+
+
+def debug_pattern_feature(feature: dict) -> dict:
+    """Debug details of a captured rectangular or circular pattern"""
+    details = {
+        'pattern_type': feature['pattern_type'],
+        'input_features': [source['name'] for source in feature['input_features']],
+        'element_count': len(feature['elements']),
+        'suppressed_count': sum(1 for element in feature['elements'] if element['suppressed'])
+    }
+    for key in ('quantity_one', 'quantity_two', 'quantity'):
+        if feature.get(key):
+            details[key] = feature[key]['value']
+    if feature.get('axis'):
+        details['axis'] = debug_vector(feature['axis']['direction'])
+    return details
+
+
+def debug_mirror_feature(feature: dict) -> dict:
+    """Debug details of a captured mirror"""
+    details = {'input_features': [source['name'] for source in feature['input_features']]}
+    plane = feature.get('plane')
+    if plane:
+        details['plane_origin'] = {axis: v * CM_TO_MM for axis, v in zip('xyz', plane['origin'])}
+        details['plane_normal'] = debug_vector(plane['normal'])
+    return details
@@ -0,0 +1,374 @@
+#Author: Fusion2SCAD
+#Description: Translate Fusion 360 parameter expressions into OpenSCAD expressions
+#
+# Exported models work in millimetres and degrees, so unit suffixes are folded
+# into the numbers they follow ("2 in" -> 50.8). Every translation is checked
+# by evaluating it against the value Fusion computed; expressions that do not
+# reproduce it (unknown functions, ambiguous units) are left numeric.
+
+import re
+import math
+import heapq
+
+from .utils import CM_TO_MM, format_value
+
+# Factors from a unit suffix to millimetres
+LENGTH_UNITS = {
+    'um': 0.001,
+    'mm': 1.0,
+    'cm': 10.0,
+    'm': 1000.0,
+    'in': 25.4,
+    'ft': 304.8
+}
+
+# Factors from a unit suffix to degrees
+ANGLE_UNITS = {
+    'deg': 1.0,
+    'rad': 180.0 / math.pi
+}
+
+# Fusion function name -> OpenSCAD function name. Angles are in degrees on both
+# sides of the translation, which matches OpenSCAD's trigonometry.
+FUNCTIONS = {
+    'sin': 'sin', 'cos': 'cos', 'tan': 'tan',
+    'asin': 'asin', 'acos': 'acos', 'atan': 'atan',
+    'sqrt': 'sqrt', 'abs': 'abs', 'sign': 'sign',
+    'floor': 'floor', 'ceil': 'ceil', 'round': 'round',
+    'min': 'min', 'max': 'max', 'pow': 'pow',
+    'exp': 'exp', 'ln': 'ln', 'log': 'log'
+}
+
+CONSTANTS = {
+    'PI': ('PI', math.pi),
+    'E': ('exp(1)', math.e)
+}
+
+_TOKEN = re.compile(r'\s*(?:(\d+\.?\d*(?:[eE][-+]?\d+)?|\.\d+(?:[eE][-+]?\d+)?)|([A-Za-z_]\w*)|(.))')
+
+
+def _round_half_away(x):
+    return math.copysign(math.floor(abs(x) + 0.5), x)
+
+
+_EVALUATORS = {
+    'sin': lambda x: math.sin(math.radians(x)),
+    'cos': lambda x: math.cos(math.radians(x)),
+    'tan': lambda x: math.tan(math.radians(x)),
+    'asin': lambda x: math.degrees(math.asin(x)),
+    'acos': lambda x: math.degrees(math.acos(x)),
+    'atan': lambda x: math.degrees(math.atan(x)),
+    'sqrt': math.sqrt,
+    'abs': abs,
+    'sign': lambda x: (x > 0) - (x < 0),
+    'floor': math.floor,
+    'ceil': math.ceil,
+    'round': _round_half_away,
+    'min': min,
+    'max': max,
+    'pow': math.pow,
+    'exp': math.exp,
+    'ln': math.log,
+    'log': math.log10
+}
+
+
+class ExpressionError(ValueError):
+    """Raised for expressions that cannot be translated"""
+
+
+def unit_kind(unit: str) -> str:
+    """Classify a Fusion unit string as 'length', 'angle' or 'unitless'"""
+    if unit in LENGTH_UNITS:
+        return 'length'
+    if unit in ANGLE_UNITS:
+        return 'angle'
+    return 'unitless'
+
+
+def to_output_units(value: float, unit: str) -> float:
+    """Convert a Fusion internal value (cm, radians) to exported units (mm, degrees)"""
+    kind = unit_kind(unit)
+    if kind == 'length':
+        return value * CM_TO_MM
+    if kind == 'angle':
+        return math.degrees(value)
+    return value
+
+
+def tokenize(expression: str) -> list:
+    """Split an expression into ('num'|'name'|'op', text) tokens"""
+    tokens = []
+    pos = 0
+    expression = expression.rstrip()
+    while pos < len(expression):
+        match = _TOKEN.match(expression, pos)
+        number, name, op = match.groups()
+        if number is not None:
+            tokens.append(('num', number))
+        elif name is not None:
+            tokens.append(('name', name))
+        else:
+            tokens.append(('op', op))
+        pos = match.end()
+    return tokens
+
+
+class _Parser:
+    """Recursive-descent parser producing tuple nodes:
+    ('num', value), ('param', name), ('const', name), ('call', name, args),
+    ('neg', node), ('bin', op, left, right)
+    """
+
+    def __init__(self, tokens: list, parameters):
+        self.tokens = tokens
+        self.pos = 0
+        self.parameters = parameters
+
+    def peek(self):
+        return self.tokens[self.pos] if self.pos < len(self.tokens) else (None, None)
+
+    def take(self, text: str = None):
+        kind, value = self.peek()
+        if kind is None or (text is not None and value != text):
+            raise ExpressionError(f"Expected {text or 'a value'}")
+        self.pos += 1
+        return kind, value
+
+    def parse(self):
+        node = self.additive()
+        if self.pos != len(self.tokens):
+            raise ExpressionError(f"Unexpected '{self.peek()[1]}'")
+        return node
+
+    def additive(self):
+        node = self.multiplicative()
+        while self.peek() in (('op', '+'), ('op', '-')):
+            op = self.take()[1]
+            node = ('bin', op, node, self.multiplicative())
+        return node
+
+    def multiplicative(self):
+        node = self.unary()
+        while self.peek() in (('op', '*'), ('op', '/'), ('op', '%')):
+            op = self.take()[1]
+            node = ('bin', op, node, self.unary())
+        return node
+
+    def unary(self):
+        if self.peek() == ('op', '-'):
+            self.take()
+            return ('neg', self.unary())
+        if self.peek() == ('op', '+'):
+            self.take()
+            return self.unary()
+        return self.power()
+
+    def power(self):
+        node = self.postfix()
+        if self.peek() == ('op', '^'):
+            self.take()
+            node = ('bin', '^', node, self.unary())
+        return node
+
+    def postfix(self):
+        node = self.primary()
+        kind, value = self.peek()
+        if kind == 'name' and value not in self.parameters:
+            factor = LENGTH_UNITS.get(value, ANGLE_UNITS.get(value))
+            if factor is None:
+                raise ExpressionError(f"Unknown unit '{value}'")
+            self.take()
+            if node[0] == 'num':
+                return ('num', node[1] * factor)
+            if factor != 1.0:
+                return ('bin', '*', node, ('num', factor))
+        return node
+
+    def primary(self):
+        kind, value = self.take()
+        if kind == 'num':
+            return ('num', float(value))
+        if kind == 'op' and value == '(':
+            node = self.additive()
+            self.take(')')
+            return node
+        if kind == 'name':
+            if self.peek() == ('op', '('):
+                if value not in FUNCTIONS:
+                    raise ExpressionError(f"Unsupported function '{value}'")
+                self.take('(')
+                args = [self.additive()]
+                while self.peek() == ('op', ','):
+                    self.take()
+                    args.append(self.additive())
+                self.take(')')
+                return ('call', value, args)
+            if value in self.parameters:
+                return ('param', value)
+            if value in CONSTANTS:
+                return ('const', value)
+            raise ExpressionError(f"Unknown name '{value}'")
+        raise ExpressionError(f"Unexpected '{value}'")
+
+
+def parse_expression(expression: str, parameters) -> tuple:
+    """Parse a Fusion expression; parameters is the set of known parameter names"""
+    if not expression or not expression.strip():
+        raise ExpressionError("Empty expression")
+    return _Parser(tokenize(expression), parameters).parse()
+
+
+def referenced_parameters(node: tuple) -> list:
+    """Parameter names a parsed expression depends on, in order of appearance"""
+    kind = node[0]
+    if kind == 'param':
+        return [node[1]]
+    if kind == 'neg':
+        return referenced_parameters(node[1])
+    if kind == 'bin':
+        return referenced_parameters(node[2]) + referenced_parameters(node[3])
+    if kind == 'call':
+        return [name for arg in node[2] for name in referenced_parameters(arg)]
+    return []
+
+
+# Binding strength of each operator in the emitted OpenSCAD code
+_PRECEDENCE = {'+': 1, '-': 1, '*': 2, '/': 2, '%': 2}
+
+
+def _precedence(node: tuple) -> int:
+    if node[0] == 'bin' and node[1] in _PRECEDENCE:
+        return _PRECEDENCE[node[1]]
+    if node[0] == 'neg':
+        return 3
+    return 4
+
+
+def to_scad(node: tuple, names: dict) -> str:
+    """Emit a parsed expression as OpenSCAD code; names maps parameters to SCAD names"""
+    kind = node[0]
+    if kind == 'num':
+        return format_value(node[1], precision=6)
+    if kind == 'param':
+        return names[node[1]]
+    if kind == 'const':
+        return CONSTANTS[node[1]][0]
+    if kind == 'call':
+        args = ', '.join(to_scad(arg, names) for arg in node[2])
+        return f"{FUNCTIONS[node[1]]}({args})"
+    if kind == 'neg':
+        operand = to_scad(node[1], names)
+        return f"-({operand})" if _precedence(node[1]) < 3 else f"-{operand}"
+
+    op, left, right = node[1], node[2], node[3]
+    if op == '^':
+        return f"pow({to_scad(left, names)}, {to_scad(right, names)})"
+    prec = _PRECEDENCE[op]
+    left_code = to_scad(left, names)
+    right_code = to_scad(right, names)
+    if _precedence(left) < prec:
+        left_code = f"({left_code})"
+    # a - (b - c) and a / (b * c) keep their grouping
+    if _precedence(right) < prec or (_precedence(right) == prec and op in '-/%'):
+        right_code = f"({right_code})"
+    return f"{left_code} {op} {right_code}"
+
+
+def evaluate(node: tuple, values: dict) -> float:
+    """Evaluate a parsed expression with parameter values in exported units"""
+    kind = node[0]
+    try:
+        if kind == 'num':
+            return node[1]
+        if kind == 'param':
+            return values[node[1]]
+        if kind == 'const':
+            return CONSTANTS[node[1]][1]
+        if kind == 'call':
+            return _EVALUATORS[node[1]](*(evaluate(arg, values) for arg in node[2]))
+        if kind == 'neg':
+            return -evaluate(node[1], values)
+
+        op = node[1]
+        left = evaluate(node[2], values)
+        right = evaluate(node[3], values)
+        if op == '+':
+            return left + right
+        if op == '-':
+            return left - right
+        if op == '*':
+            return left * right
+        if op == '/':
+            return left / right
+        if op == '%':
+            return math.fmod(left, right)
+        return math.pow(left, right)
+    except (ArithmeticError, TypeError, ValueError) as e:
+        raise ExpressionError(str(e))
+
+
+def is_compound(node: tuple) -> bool:
+    """Whether emitted code for the node needs parentheses inside other expressions"""
+    return _precedence(node) < 4
+
+
+def translate_expression(expression: str, expected: float, names: dict,
+                         values: dict) -> tuple:
+    """Translate a Fusion expression and check it reproduces the captured value.
+
+    Args:
+        expression: Fusion expression ("width / 2 + 1 mm")
+        expected: The value Fusion computed, in exported units (mm, degrees)
+        names: Fusion parameter name -> OpenSCAD name
+        values: Fusion parameter name -> value in exported units
+
+    Returns:
+        (node, scad_code), or None if the expression cannot be translated
+        faithfully
+    """
+    try:
+        node = parse_expression(expression, names)
+        result = evaluate(node, values)
+    except ExpressionError:
+        return None
+
+    if abs(result - expected) > 1e-6 * max(1.0, abs(expected)):
+        return None
+    return node, to_scad(node, names)
+
+
+def order_by_dependency(parameters: dict) -> tuple:
+    """Order parameters so each one follows the parameters its expression uses.
+
+    Args:
+        parameters: Parameter name -> info dict with an optional 'depends_on' list
+
+    Returns:
+        (ordered, cyclic): names in dependency order (otherwise keeping the
+        original order), and names whose dependencies form a cycle
+    """
+    names = list(parameters)
+    position = {name: i for i, name in enumerate(names)}
+    dependents = {name: [] for name in names}
+    waiting = {}
+
+    for name, info in parameters.items():
+        deps = {dep for dep in info.get('depends_on') or () if dep in position}
+        waiting[name] = len(deps)
+        for dep in deps:
+            dependents[dep].append(name)
+
+    ready = [position[name] for name in names if waiting[name] == 0]
+    heapq.heapify(ready)
+    ordered = []
+    while ready:
+        name = names[heapq.heappop(ready)]
+        ordered.append(name)
+        for dependent in dependents[name]:
+            waiting[dependent] -= 1
+            if waiting[dependent] == 0:
+                heapq.heappush(ready, position[dependent])
+
+    cyclic = [name for name in names if waiting[name] > 0]
+    return ordered, cyclic
@@ -0,0 +1,230 @@
+#Author: Fusion2SCAD
+#Description: Feature handler registry keyed on the Fusion objectType string
+#
+# Each supported timeline feature type registers one FeatureHandler with its
+# analyze/generate/debug callbacks. The exporter dispatches every captured
+# record with a single dict lookup, so new feature types are added here as
+# isolated handlers. Capture callbacks live in exporter.capture because they
+# need the Fusion API.
+
+from .analyzers import (
+    analyze_extrude_feature,
+    analyze_revolve_feature,
+    analyze_hole_feature,
+    analyze_fillet_feature,
+    analyze_chamfer_feature,
+    analyze_pattern_feature,
+    analyze_mirror_feature
+)
+from .generators import (
+    generate_extrude_scad,
+    generate_revolve_scad,
+    generate_hole_scad,
+    hole_repeat_key,
+    generate_hole_module_scad,
+    generate_pattern_scad,
+    generate_mirror_scad
+)
+from .debug import (
+    debug_extrude_feature,
+    debug_hole_feature,
+    debug_fillet_feature,
+    debug_pattern_feature,
+    debug_mirror_feature,
+    debug_sketch
+)
+
+
+class FeatureHandler:
+    """Callbacks and metadata for one Fusion feature type.
+
+    Args:
+        object_type: Fusion objectType ('adsk::fusion::ExtrudeFeature')
+        kind: Short name, also used for generated module names ('extrude')
+        analyze: analyze(record) -> analysis info dict
+        generate: generate(info, feature_name, modifiers) -> iterable of SCAD lines
+        debug: debug(record) -> 'details' dict for the debug JSON
+        operation: operation(info) -> 'union', 'difference', 'intersection'
+            or None to skip
+        modifier: (body modifier, analysis key) for features such as fillets
+            that change the edges of existing bodies instead of emitting code
+        creates_bodies: Whether modifiers can be applied to the bodies it creates
+        bound_values: (analysis key, record key, unit) triples of analyzed
+            values that follow a parameter expression
+        repeat_key: repeat_key(info) -> key shared by cutters that differ only
+            in info['positions'], so they can be written as one module
+            instantiated in a for() loop
+        generate_module: generate_module(info) -> SCAD lines of a module body
+            drawing one instance at the origin
+        copies_features: Whether it instances other timeline features
+            (patterns, mirrors). Its analysis lists them in info['inputs'], and the
+            exporter adds one copy per input with info['module'] naming the
+            module that draws the input, info['source'] its name and
+            info['operation'] its boolean operation
+    """
+
+    def __init__(self, object_type: str, kind: str, analyze=None, generate=None, debug=None,
+                 operation=None, modifier: tuple = None, creates_bodies: bool = False,
+                 bound_values: tuple = (), repeat_key=None, generate_module=None,
+                 copies_features: bool = False):
+        self.object_type = object_type
+        self.kind = kind
+        self.analyze = analyze
+        self.generate = generate
+        self.debug = debug
+        self.operation = operation
+        self.modifier = modifier
+        self.creates_bodies = creates_bodies
+        self.bound_values = bound_values
+        self.repeat_key = repeat_key
+        self.generate_module = generate_module
+        self.copies_features = copies_features
+
+
+# objectType -> FeatureHandler
+FEATURE_HANDLERS = {}
+
+
+def register_feature_handler(handler: FeatureHandler) -> FeatureHandler:
+    """Register (or replace) the handler for a feature type"""
+    FEATURE_HANDLERS[handler.object_type] = handler
+    return handler
+
+
+def get_feature_handler(record: dict) -> FeatureHandler:
+    """Return the handler for a captured timeline record, or None if unsupported"""
+    return FEATURE_HANDLERS.get(record.get('object_type'))
+
+
+def generate_feature_scad(object_type: str, feature_info: dict, feature_name: str,
+                          modifiers: dict) -> list:
+    """Generate the SCAD lines for one analyzed feature.
+
+    Module-level and free of exporter state so it can run in a worker
+    process; modifiers are the fillet/chamfer values of the feature's body.
+    """
+    return list(FEATURE_HANDLERS[object_type].generate(feature_info, feature_name, modifiers))
+
+
+def _generate_extrude(feature_info: dict, feature_name: str, modifiers: dict):
+    return generate_extrude_scad(
+        feature_info, feature_name,
+        rounding=modifiers['rounding'], chamfer=modifiers['chamfer'],
+        rounding_edges=modifiers.get('rounding_edges', set()),
+        chamfer_edges=modifiers.get('chamfer_edges', set()),
+        rounding_expr=modifiers.get('rounding_expr'),
+        chamfer_expr=modifiers.get('chamfer_expr'),
+        profile_refs=modifiers.get('profiles')
+    )
+
+
+def _generate_revolve(feature_info: dict, feature_name: str, modifiers: dict):
+    return generate_revolve_scad(feature_info, feature_name)
+
+
+def _generate_hole(feature_info: dict, feature_name: str, modifiers: dict):
+    return generate_hole_scad(feature_info, feature_name)
+
+
+def _generate_pattern(feature_info: dict, feature_name: str, modifiers: dict):
+    return generate_pattern_scad(feature_info, feature_name)
+
+
+def _generate_mirror(feature_info: dict, feature_name: str, modifiers: dict):
+    return generate_mirror_scad(feature_info, feature_name)
+
+
+def _body_operation(info: dict) -> str:
+    # New bodies start a body tree; joins extend one
+    return 'union' if info['operation'] == 'new' else info['operation']
+
+
+def _difference_operation(info: dict) -> str:
+    return 'difference'
+
+
+register_feature_handler(FeatureHandler(
+    'adsk::fusion::ExtrudeFeature', 'extrude',
+    analyze=analyze_extrude_feature,
+    generate=_generate_extrude,
+    debug=debug_extrude_feature,
+    operation=_body_operation,
+    creates_bodies=True,
+    bound_values=(('height', 'extent_one', 'mm'),)
+))
+
+register_feature_handler(FeatureHandler(
+    'adsk::fusion::RevolveFeature', 'revolve',
+    analyze=analyze_revolve_feature,
+    generate=_generate_revolve,
+    operation=_body_operation,
+    creates_bodies=True,
+    bound_values=(('angle', 'extent', 'deg'),)
+))
+
+register_feature_handler(FeatureHandler(
+    'adsk::fusion::HoleFeature', 'hole',
+    analyze=analyze_hole_feature,
+    generate=_generate_hole,
+    debug=debug_hole_feature,
+    operation=_difference_operation,
+    bound_values=(
+        ('diameter', 'diameter', 'mm'),
+        ('depth', 'extent', 'mm'),
+        ('countersink_diameter', 'countersink_diameter', 'mm'),
+        ('countersink_angle', 'countersink_angle', 'deg'),
+        ('counterbore_diameter', 'counterbore_diameter', 'mm'),
+        ('counterbore_depth', 'counterbore_depth', 'mm')
+    ),
+    repeat_key=hole_repeat_key,
+    generate_module=generate_hole_module_scad
+))
+
+for object_type in ('adsk::fusion::RectangularPatternFeature',
+                    'adsk::fusion::CircularPatternFeature'):
+    register_feature_handler(FeatureHandler(
+        object_type, 'pattern',
+        analyze=analyze_pattern_feature,
+        generate=_generate_pattern,
+        debug=debug_pattern_feature,
+        # Copies take the operation of the feature they copy
+        operation=_body_operation,
+        copies_features=True,
+        bound_values=(
+            ('quantity_one', 'quantity_one', ''),
+            ('quantity_two', 'quantity_two', ''),
+            ('spacing_one', 'distance_one', 'mm'),
+            ('spacing_two', 'distance_two', 'mm'),
+            ('quantity', 'quantity', ''),
+            ('total_angle', 'total_angle', 'deg')
+        )
+    ))
+
+register_feature_handler(FeatureHandler(
+    'adsk::fusion::MirrorFeature', 'mirror',
+    analyze=analyze_mirror_feature,
+    generate=_generate_mirror,
+    debug=debug_mirror_feature,
+    operation=_body_operation,
+    copies_features=True
+))
+
+register_feature_handler(FeatureHandler(
+    'adsk::fusion::FilletFeature', 'fillet',
+    analyze=analyze_fillet_feature,
+    debug=debug_fillet_feature,
+    modifier=('rounding', 'radius'),
+    bound_values=(('radius', 'radius', 'mm'),)
+))
+
+register_feature_handler(FeatureHandler(
+    'adsk::fusion::ChamferFeature', 'chamfer',
+    analyze=analyze_chamfer_feature,
+    modifier=('chamfer', 'distance'),
+    bound_values=(('distance', 'distance', 'mm'),)
+))
+
+register_feature_handler(FeatureHandler(
+    'adsk::fusion::Sketch', 'sketch',
+    debug=debug_sketch
+))
@@ -0,0 +1,96 @@
+#Author: Fusion2SCAD
+#Description: Per-feature cache of analysis results and generated SCAD fragments
+
+import json
+import hashlib
+
+from .utils import expression_identifiers
+
+
+def fingerprint_record(record: dict, parameters: dict = None, settings: dict = None) -> str:
+    """Fingerprint a captured timeline record and the parameters it depends on.
+
+    The record covers the entity token, feature parameters and referenced
+    profile geometry. Its timeline index is left out so fragments survive
+    features being inserted or deleted earlier in the timeline. settings are
+    export options that change the analysis (arc tessellation, parametric).
+    """
+    content = {key: value for key, value in record.items() if key != 'index'}
+
+    referenced = {}
+    if parameters:
+        for value in record.values():
+            if isinstance(value, dict) and value.get('expression'):
+                for token in expression_identifiers(value['expression']):
+                    param = parameters.get(token)
+                    if param is not None:
+                        referenced[token] = (param['value'], param['expression'])
+
+    text = json.dumps([content, referenced, settings], sort_keys=True, separators=(',', ':'), default=str)
+    return hashlib.sha1(text.encode('utf-8')).hexdigest()
+
+
+class FragmentCache:
+    """Reuses per-feature analysis and SCAD fragments between exports.
+
+    Keep one instance alive across exports (e.g. for a Fusion session) and
+    pass it to SCADExporter. Features whose fingerprint is unchanged skip
+    analyze_*/generate_* and reuse the cached result. Entries not used by
+    the latest export are dropped, so the cache stays the size of one design.
+    """
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self._entries = {}
+        self._previous = {}
+
+    def start_export(self):
+        """Begin a new export; entries it does not use are dropped after it"""
+        self._previous = self._entries
+        self._entries = {}
+        self.hits = 0
+        self.misses = 0
+
+    def _lookup(self, key, build):
+        if key in self._entries:
+            self.hits += 1
+            return self._entries[key]
+        if key in self._previous:
+            self.hits += 1
+            value = self._entries[key] = self._previous.pop(key)
+            return value
+
+        self.misses += 1
+        value = build()
+        self._entries[key] = value
+        return value
+
+    def analysis(self, fingerprint: str, analyze):
+        """Return the cached analysis for a fingerprint, running analyze() on a miss"""
+        return self._lookup(('analysis', fingerprint), analyze)
+
+    @staticmethod
+    def _fragment_key(fingerprint: str, modifiers: dict) -> tuple:
+        # Fillets and chamfers later in the timeline change an extrude's
+        # output, so its body modifiers are part of the key, as are the
+        # shared profiles it refers to
+        return ('fragment', fingerprint,
+                modifiers['rounding'], modifiers['chamfer'],
+                modifiers.get('rounding_expr'), modifiers.get('chamfer_expr'),
+                tuple(sorted(modifiers.get('rounding_edges', ()))),
+                tuple(sorted(modifiers.get('chamfer_edges', ()))),
+                modifiers.get('profiles'))
+
+    def has_fragment(self, fingerprint: str, modifiers: dict) -> bool:
+        """Whether a fragment is cached for this feature and body modifiers"""
+        key = self._fragment_key(fingerprint, modifiers)
+        return key in self._entries or key in self._previous
+
+    def fragment(self, fingerprint: str, modifiers: dict, generate) -> tuple:
+        """Return the cached SCAD lines for a feature, running generate() on a miss"""
+        return self._lookup(self._fragment_key(fingerprint, modifiers), lambda: tuple(generate()))
+
+    def stats(self) -> dict:
+        """Hit/miss counts of the latest export"""
+        return {'hits': self.hits, 'misses': self.misses, 'entries': len(self._entries)}
@@ -6,6 +6,7 @@ import os
 import math
 
 from .utils import CM_TO_MM, format_value
+from .expressions import order_by_dependency
 
 # Try to import profile_utils
 try:
@@ -14,8 +15,11 @@ try:
         sys.path.append(script_dir)
     from profile_utils import (
         extract_profile_polygon,
+        extract_profile_path,
+        format_path_scad,
         format_polygon_scad,
-        format_polygon_with_holes_scad
+        format_polygon_with_holes_scad,
+        format_points
     )
     PROFILE_UTILS_AVAILABLE = True
 except ImportError:
@@ -42,11 +46,20 @@ def generate_header() -> list:
 
 
 def generate_parameters_section(parameters: dict) -> list:
-    """Generate OpenSCAD variable declarations from Fusion parameters"""
+    """Generate OpenSCAD variable declarations from Fusion parameters.
+
+    Parameters with a translated expression ('scad_expression') are declared
+    with it, after the parameters they depend on.
+    """
+    ordered, cyclic = order_by_dependency(parameters)
     lines = []
-    for orig_name, param_info in parameters.items():
+    for orig_name in ordered + cyclic:
+        param_info = parameters[orig_name]
+        value = param_info.get('scad_expression') if orig_name not in cyclic else None
+        if value is None:
+            value = format_value(param_info['value'])
         comment = f"  // {param_info['comment']}" if param_info['comment'] else ""
-        lines.append(f"{param_info['name']} = {format_value(param_info['value'])};{comment}")
+        lines.append(f"{param_info['name']} = {value};{comment}")
     if lines:
         lines.append("")
     return lines
@@ -117,6 +130,14 @@ def generate_transform_prefix(feature_info: dict, profile_center: tuple) -> tupl
     return lines, indent
 
 
+def scad_value(feature_info: dict, key: str, value: float = None) -> str:
+    """Return the parameter expression bound to a feature value, or the number"""
+    expression = feature_info.get('expressions', {}).get(key)
+    if expression is not None:
+        return expression
+    return format_value(feature_info[key] if value is None else value)
+
+
 def format_edges_param(edge_types: set) -> str:
     """Format edge types into BOSL2 edges parameter.
 
@@ -146,9 +167,13 @@ def format_edges_param(edge_types: set) -> str:
 
 def generate_extrude_scad(feature_info: dict, feature_name: str,
                           rounding: float = None, chamfer: float = None,
-                          rounding_edges: set = None, chamfer_edges: set = None) -> list:
+                          rounding_edges: set = None, chamfer_edges: set = None,
+                          rounding_expr: str = None, chamfer_expr: str = None,
+                          profile_refs: tuple = None):
     """Generate BOSL2 code for an extrusion with optional rounding/chamfer.
 
+    Yields SCAD lines so callers can stream them to a writer.
+
     Args:
         feature_info: Feature analysis data
         feature_name: Name of the feature for comments
@@ -156,9 +181,15 @@ def generate_extrude_scad(feature_info: dict, feature_name: str,
         chamfer: Chamfer distance (mm)
         rounding_edges: Set of edge types for rounding ('Z', 'TOP', 'BOTTOM')
         chamfer_edges: Set of edge types for chamfer ('Z', 'TOP', 'BOTTOM')
+        rounding_expr: Parameter expression for the fillet radius, if any
+        chamfer_expr: Parameter expression for the chamfer distance, if any
+        profile_refs: (profile index, shape code, outer path code, offset) of
+            polygon profiles defined once as shared functions or constants
     """
-    lines = []
-    height = format_value(feature_info['height'])
+    height = scad_value(feature_info, 'height')
+    shared_profiles = {ref[0]: ref[1:] for ref in profile_refs or ()}
+    rounding_value = rounding_expr or (format_value(rounding) if rounding else None)
+    chamfer_value = chamfer_expr or (format_value(chamfer) if chamfer else None)
 
     # Default to empty sets if None
     if rounding_edges is None:
@@ -166,8 +197,8 @@ def generate_extrude_scad(feature_info: dict, feature_name: str,
     if chamfer_edges is None:
         chamfer_edges = set()
 
-    for profile in feature_info['profiles']:
-        lines.append(f"// {feature_name} (plane: {feature_info.get('sketch_plane', 'XY')})")
+    for profile_idx, profile in enumerate(feature_info['profiles']):
+        yield f"// {feature_name} (plane: {feature_info.get('sketch_plane', 'XY')})"
 
         if profile['is_circle']:
             radius = format_value(profile['radius'])
@@ -177,29 +208,29 @@ def generate_extrude_scad(feature_info: dict, feature_name: str,
             # For cylinders, use rounding1/rounding2 for selective edges
             if rounding and rounding > 0:
                 if 'TOP' in rounding_edges and 'BOTTOM' in rounding_edges:
-                    cyl_params.append(f"rounding={format_value(rounding)}")
+                    cyl_params.append(f"rounding={rounding_value}")
                 elif 'TOP' in rounding_edges:
-                    cyl_params.append(f"rounding2={format_value(rounding)}")
+                    cyl_params.append(f"rounding2={rounding_value}")
                 elif 'BOTTOM' in rounding_edges:
-                    cyl_params.append(f"rounding1={format_value(rounding)}")
+                    cyl_params.append(f"rounding1={rounding_value}")
                 elif not rounding_edges:
                     # No edge info, apply to all (fallback)
-                    cyl_params.append(f"rounding={format_value(rounding)}")
+                    cyl_params.append(f"rounding={rounding_value}")
             if chamfer and chamfer > 0:
                 if 'TOP' in chamfer_edges and 'BOTTOM' in chamfer_edges:
-                    cyl_params.append(f"chamfer={format_value(chamfer)}")
+                    cyl_params.append(f"chamfer={chamfer_value}")
                 elif 'TOP' in chamfer_edges:
-                    cyl_params.append(f"chamfer2={format_value(chamfer)}")
+                    cyl_params.append(f"chamfer2={chamfer_value}")
                 elif 'BOTTOM' in chamfer_edges:
-                    cyl_params.append(f"chamfer1={format_value(chamfer)}")
+                    cyl_params.append(f"chamfer1={chamfer_value}")
                 elif not chamfer_edges:
-                    cyl_params.append(f"chamfer={format_value(chamfer)}")
+                    cyl_params.append(f"chamfer={chamfer_value}")
             cyl_params.append("anchor=BOTTOM")
             cyl_call = f"cyl({', '.join(cyl_params)});"
 
             transform_lines, indent = generate_transform_prefix(feature_info, (cx, cy))
-            lines.extend(transform_lines)
-            lines.append(f"{indent}{cyl_call}")
+            yield from transform_lines
+            yield f"{indent}{cyl_call}"
 
         elif profile.get('is_rounded_rect'):
             width = format_value(profile['bbox']['width'])
@@ -219,13 +250,13 @@ def generate_extrude_scad(feature_info: dict, feature_name: str,
                 cuboid_params.append(f"edges={edges_param}")
 
             if chamfer and chamfer > 0:
-                cuboid_params.append(f"chamfer={format_value(chamfer)}")
+                cuboid_params.append(f"chamfer={chamfer_value}")
             cuboid_params.append("anchor=BOTTOM")
             cuboid_call = f"cuboid({', '.join(cuboid_params)});"
 
             transform_lines, indent = generate_transform_prefix(feature_info, (cx, cy))
-            lines.extend(transform_lines)
-            lines.append(f"{indent}{cuboid_call}")
+            yield from transform_lines
+            yield f"{indent}{cuboid_call}"
 
         elif profile['is_rectangle']:
             width = format_value(profile['bbox']['width'])
@@ -236,14 +267,14 @@ def generate_extrude_scad(feature_info: dict, feature_name: str,
 
             # Apply rounding with selective edges
             if rounding and rounding > 0:
-                cuboid_params.append(f"rounding={format_value(rounding)}")
+                cuboid_params.append(f"rounding={rounding_value}")
                 edges_param = format_edges_param(rounding_edges)
                 if edges_param:
                     cuboid_params.append(f"edges={edges_param}")
 
             # Apply chamfer with selective edges
             if chamfer and chamfer > 0:
-                cuboid_params.append(f"chamfer={format_value(chamfer)}")
+                cuboid_params.append(f"chamfer={chamfer_value}")
                 # Note: BOSL2 uses same edges param for both rounding and chamfer
                 # If both are specified, edges applies to both
                 if not rounding and chamfer_edges:
@@ -255,156 +286,379 @@ def generate_extrude_scad(feature_info: dict, feature_name: str,
             cuboid_call = f"cuboid({', '.join(cuboid_params)});"
 
             transform_lines, indent = generate_transform_prefix(feature_info, (cx, cy))
-            lines.extend(transform_lines)
-            lines.append(f"{indent}{cuboid_call}")
+            yield from transform_lines
+            yield f"{indent}{cuboid_call}"
 
         else:
             cx, cy = profile.get('center', (0, 0))
             transform_lines, indent = generate_transform_prefix(feature_info, (0, 0))
-            lines.extend(transform_lines)
-
-            if PROFILE_UTILS_AVAILABLE and 'profile_obj' in profile:
+            yield from transform_lines
+
+            exact_ref = None
+            if feature_info.get('exact_arcs') and profile_idx not in shared_profiles:
+                exact_ref = _exact_profile_ref(profile)
+
+            if profile_idx in shared_profiles or exact_ref:
+                yield from _shared_profile_scad(
+                    shared_profiles.get(profile_idx) or exact_ref, indent, height,
+                    rounding_value if rounding and rounding > 0 else None,
+                    chamfer_value if chamfer and chamfer > 0 else None
+                )
+            elif PROFILE_UTILS_AVAILABLE and 'profile_data' in profile:
                 try:
-                    poly_data = extract_profile_polygon(profile['profile_obj'])
+                    poly_data = profile.get('polygon') or extract_profile_polygon(
+                        profile['profile_data'], **(feature_info.get('tessellation') or {})
+                    )
+                    snap_decimals = poly_data.get('snap_decimals')
                     if poly_data['holes']:
                         polygon_code = format_polygon_with_holes_scad(
-                            poly_data['outer'], poly_data['holes']
+                            poly_data['outer'], poly_data['holes'], snap_decimals=snap_decimals
                         )
                     else:
-                        polygon_code = format_polygon_scad(poly_data['outer'])
+                        polygon_code = format_polygon_scad(
+                            poly_data['outer'], snap_decimals=snap_decimals
+                        )
 
                     if rounding and rounding > 0:
-                        lines.append(f"{indent}// Using BOSL2 offset_sweep for rounded extrusion")
-                        lines.append(f"{indent}offset_sweep(")
+                        yield f"{indent}// Using BOSL2 offset_sweep for rounded extrusion"
+                        yield f"{indent}offset_sweep("
                         # offset_sweep expects a path (list of points), not polygon()
-                        # Format the points as a path array
-                        formatted_pts = []
-                        for x, y in poly_data['outer']:
-                            fx = f"{x:.4f}".rstrip('0').rstrip('.')
-                            fy = f"{y:.4f}".rstrip('0').rstrip('.')
-                            formatted_pts.append(f"[{fx}, {fy}]")
-                        points_str = ", ".join(formatted_pts)
-                        lines.append(f"{indent}    [{points_str}],")
-                        lines.append(f"{indent}    height={height},")
-                        lines.append(f"{indent}    top=os_circle(r={format_value(rounding)}),")
-                        lines.append(f"{indent}    bottom=os_circle(r={format_value(rounding)})")
-                        lines.append(f"{indent});")
+                        points_str = format_points(poly_data['outer'], snap_decimals=snap_decimals)
+                        yield f"{indent}    [{points_str}],"
+                        yield f"{indent}    height={height},"
+                        yield f"{indent}    top=os_circle(r={rounding_value}),"
+                        yield f"{indent}    bottom=os_circle(r={rounding_value})"
+                        yield f"{indent});"
                     elif chamfer and chamfer > 0:
-                        lines.append(f"{indent}// Using BOSL2 offset_sweep for chamfered extrusion")
-                        lines.append(f"{indent}offset_sweep(")
+                        yield f"{indent}// Using BOSL2 offset_sweep for chamfered extrusion"
+                        yield f"{indent}offset_sweep("
                         # offset_sweep expects a path (list of points), not polygon()
-                        formatted_pts = []
-                        for x, y in poly_data['outer']:
-                            fx = f"{x:.4f}".rstrip('0').rstrip('.')
-                            fy = f"{y:.4f}".rstrip('0').rstrip('.')
-                            formatted_pts.append(f"[{fx}, {fy}]")
-                        points_str = ", ".join(formatted_pts)
-                        lines.append(f"{indent}    [{points_str}],")
-                        lines.append(f"{indent}    height={height},")
-                        lines.append(f"{indent}    top=os_chamfer(height={format_value(chamfer)}),")
-                        lines.append(f"{indent}    bottom=os_chamfer(height={format_value(chamfer)})")
-                        lines.append(f"{indent});")
+                        points_str = format_points(poly_data['outer'], snap_decimals=snap_decimals)
+                        yield f"{indent}    [{points_str}],"
+                        yield f"{indent}    height={height},"
+                        yield f"{indent}    top=os_chamfer(height={chamfer_value}),"
+                        yield f"{indent}    bottom=os_chamfer(height={chamfer_value})"
+                        yield f"{indent});"
                     else:
-                        lines.append(f"{indent}linear_extrude(height={height})")
+                        yield f"{indent}linear_extrude(height={height})"
                         poly_lines = polygon_code.split('\n')
                         for i, poly_line in enumerate(poly_lines):
                             if i == len(poly_lines) - 1:
                                 # Add semicolon to last line
-                                lines.append(f"{indent}    {poly_line};")
+                                yield f"{indent}    {poly_line};"
                             else:
-                                lines.append(f"{indent}    {poly_line}")
+                                yield f"{indent}    {poly_line}"
                 except:
-                    lines.append(f"{indent}// Complex profile - manual adjustment needed")
-                    lines.append(f"{indent}linear_extrude(height={height})")
-                    lines.append(f"{indent}    polygon(points=[/* extracted points would go here */]);")
+                    yield f"{indent}// Complex profile - manual adjustment needed"
+                    yield f"{indent}linear_extrude(height={height})"
+                    yield f"{indent}    polygon(points=[/* extracted points would go here */]);"
             else:
-                lines.append(f"{indent}// Complex profile - install profile_utils for auto-extraction")
-                lines.append(f"{indent}linear_extrude(height={height})")
-                lines.append(f"{indent}    polygon(points=[/* extracted points would go here */]);")
-
-    return lines
+                yield f"{indent}// Complex profile - install profile_utils for auto-extraction"
+                yield f"{indent}linear_extrude(height={height})"
+                yield f"{indent}    polygon(points=[/* extracted points would go here */]);"
 
 
-def generate_revolve_scad(feature_info: dict, feature_name: str) -> list:
-    """Generate BOSL2 code for a revolution"""
-    lines = []
-    angle = format_value(feature_info['angle'])
+def _exact_profile_ref(profile: dict) -> tuple:
+    """(shape, outer path, offset) drawing a profile as BOSL2 arc()/point paths.
 
-    lines.append(f"// {feature_name}")
-    if feature_info['angle'] == 360:
-        lines.append("rotate_extrude()")
+    Returns None when profile_utils is missing or a curve has no exact data,
+    so the profile is written as a sampled polygon instead.
+    """
+    if not PROFILE_UTILS_AVAILABLE or 'profile_data' not in profile:
+        return None
+    try:
+        path = extract_profile_path(profile['profile_data'])
+        if not path['outer']:
+            return None
+        loops = [format_path_scad(loop) for loop in [path['outer']] + path['holes']]
+    except Exception:
+        return None
+    if len(loops) == 1:
+        return f"polygon({loops[0]})", loops[0], (0, 0)
+    return f"region([{', '.join(loops)}])", loops[0], (0, 0)
+
+
+def _shared_profile_scad(ref: tuple, indent: str, height: str,
+                         rounding_value: str, chamfer_value: str):
+    """Extrude a profile drawn by a SCAD expression (shared definition or exact path)"""
+    shape, path, (dx, dy) = ref
+    if rounding_value or chamfer_value:
+        if dx or dy:
+            path = f"move([{format_value(dx)}, {format_value(dy)}], p={path})"
+        if rounding_value:
+            yield f"{indent}// Using BOSL2 offset_sweep for rounded extrusion"
+            ends = f"os_circle(r={rounding_value})"
+        else:
+            yield f"{indent}// Using BOSL2 offset_sweep for chamfered extrusion"
+            ends = f"os_chamfer(height={chamfer_value})"
+        yield f"{indent}offset_sweep("
+        yield f"{indent}    {path},"
+        yield f"{indent}    height={height},"
+        yield f"{indent}    top={ends},"
+        yield f"{indent}    bottom={ends}"
+        yield f"{indent});"
     else:
-        lines.append(f"rotate_extrude(angle={angle})")
-    lines.append("    polygon(points=[/* profile points */]);")
+        yield f"{indent}linear_extrude(height={height})"
+        if dx or dy:
+            yield f"{indent}    translate([{format_value(dx)}, {format_value(dy)}])"
+            yield f"{indent}        {shape};"
+        else:
+            yield f"{indent}    {shape};"
 
-    return lines
 
+def generate_revolve_scad(feature_info: dict, feature_name: str):
+    """Generate BOSL2 code for a revolution (yields SCAD lines)"""
+    angle = scad_value(feature_info, 'angle')
 
-def generate_hole_scad(feature_info: dict, feature_name: str) -> list:
-    """Generate BOSL2 code for holes including countersink and counterbore"""
-    lines = []
+    yield f"// {feature_name}"
+    if feature_info['angle'] == 360:
+        yield "rotate_extrude()"
+    else:
+        yield f"rotate_extrude(angle={angle})"
+    yield "    polygon(points=[/* profile points */]);"
 
+
+def _hole_shape_scad(feature_info: dict, indent: str):
+    """Yield the lines of one hole at the origin, oriented along its axis"""
+    expressions = feature_info.get('expressions', {})
     diameter = feature_info['diameter']
-    radius = format_value(diameter / 2)
+    diameter_expr = expressions.get('diameter')
+    radius = f"{diameter_expr} / 2" if diameter_expr else format_value(diameter / 2)
     depth = feature_info['depth']
+    depth_expr = expressions.get('depth')
     matrix = feature_info.get('matrix')
     hole_type = feature_info.get('hole_type', 'simple')
 
-    lines.append(f"// {feature_name} ({hole_type})")
+    epsilon = 1.0
+    if depth_expr:
+        total_h = f"{depth_expr} + {format_value(epsilon)}"
+    else:
+        total_h = format_value(depth + epsilon)
 
+    if matrix:
+        matrix_str = "[\n"
+        for row in matrix:
+            row_str = ", ".join(format_value(v) for v in row)
+            matrix_str += f"        [{row_str}],\n"
+        matrix_str = matrix_str.rstrip(",\n") + "\n    ]"
+        yield f"{indent}multmatrix({matrix_str})"
+
+    if hole_type == 'countersink':
+        cs_diameter = feature_info.get('countersink_diameter', diameter * 2)
+        cs_angle = feature_info.get('countersink_angle', 90)
+        cs_radius = cs_diameter / 2
+        # Calculate countersink depth from angle and radius difference
+        # For a 90° countersink: depth = radius_diff
+        # For other angles: depth = radius_diff / tan(angle/2)
+        radius_diff = cs_radius - (diameter / 2)
+        half_angle_rad = math.radians(cs_angle / 2)
+        cs_depth = radius_diff / math.tan(half_angle_rad) if half_angle_rad > 0 else radius_diff
+
+        cs_diameter_expr = expressions.get('countersink_diameter')
+        cs_angle_expr = expressions.get('countersink_angle')
+        if (diameter_expr or cs_diameter_expr or cs_angle_expr) and half_angle_rad > 0:
+            # Keep the cone parametric when any of its inputs is
+            cs_radius_code = f"{cs_diameter_expr or format_value(cs_diameter)} / 2"
+            cs_depth_code = (
+                f"({cs_radius_code} - {radius}) / "
+                f"tan({cs_angle_expr or format_value(cs_angle)} / 2)"
+            )
+            cs_offset_code = f"-({cs_depth_code})"
+            cs_height_code = f"{cs_depth_code} + {format_value(epsilon)}"
+        else:
+            cs_radius_code = format_value(cs_radius)
+            cs_offset_code = f"-{format_value(cs_depth)}"
+            cs_height_code = format_value(cs_depth + epsilon)
+
+        yield f"{indent}union() {{"
+        yield f"{indent}    // Main hole"
+        yield f"{indent}    translate([0, 0, -{epsilon}])"
+        yield f"{indent}        cyl(h={total_h}, r={radius}, anchor=BOTTOM);"
+        yield f"{indent}    // Countersink cone"
+        yield f"{indent}    translate([0, 0, {cs_offset_code}])"
+        yield f"{indent}        cyl(h={cs_height_code}, r1={cs_radius_code}, r2={radius}, anchor=BOTTOM);"
+        yield f"{indent}}}"
+
+    elif hole_type == 'counterbore':
+        cb_diameter = feature_info.get('counterbore_diameter', diameter * 1.5)
+        cb_depth = feature_info.get('counterbore_depth', 2)
+        cb_diameter_expr = expressions.get('counterbore_diameter')
+        cb_depth_expr = expressions.get('counterbore_depth')
+        if cb_diameter_expr:
+            cb_radius = f"{cb_diameter_expr} / 2"
+        else:
+            cb_radius = format_value(cb_diameter / 2)
+        if cb_depth_expr:
+            cb_offset = cb_depth_expr
+            cb_height = f"{cb_depth_expr} + {format_value(epsilon)}"
+        else:
+            cb_offset = format_value(cb_depth)
+            cb_height = format_value(cb_depth + epsilon)
+
+        yield f"{indent}union() {{"
+        yield f"{indent}    // Main hole"
+        yield f"{indent}    translate([0, 0, -{epsilon}])"
+        yield f"{indent}        cyl(h={total_h}, r={radius}, anchor=BOTTOM);"
+        yield f"{indent}    // Counterbore"
+        yield f"{indent}    translate([0, 0, -{cb_offset}])"
+        yield f"{indent}        cyl(h={cb_height}, r={cb_radius}, anchor=BOTTOM);"
+        yield f"{indent}}}"
+
+    else:
+        # Simple hole
+        yield f"{indent}translate([0, 0, -{epsilon}])"
+        yield f"{indent}cyl(h={total_h}, r={radius}, anchor=BOTTOM);"
+
+
+def generate_hole_scad(feature_info: dict, feature_name: str):
+    """Generate BOSL2 code for holes including countersink and counterbore (yields SCAD lines)"""
+    hole_type = feature_info.get('hole_type', 'simple')
+
+    yield f"// {feature_name} ({hole_type})"
+
+    shape = None
     for x, y, z in feature_info['positions']:
-        epsilon = 1.0
-        total_h = format_value(depth + epsilon)
+        yield f"translate([{format_value(x)}, {format_value(y)}, {format_value(z)}])"
+        if shape is None:
+            shape = list(_hole_shape_scad(feature_info, "    "))
+        yield from shape
 
-        lines.append(f"translate([{format_value(x)}, {format_value(y)}, {format_value(z)}])")
 
-        if matrix:
-            matrix_str = "[\n"
-            for row in matrix:
-                row_str = ", ".join(format_value(v) for v in row)
-                matrix_str += f"        [{row_str}],\n"
-            matrix_str = matrix_str.rstrip(",\n") + "\n    ]"
-            lines.append(f"    multmatrix({matrix_str})")
+def hole_repeat_key(feature_info: dict) -> tuple:
+    """Key shared by holes that differ only in position (type, sizes, axis)"""
+    matrix = feature_info.get('matrix')
+    return (
+        feature_info.get('hole_type', 'simple'),
+        round(feature_info['diameter'], 6),
+        round(feature_info['depth'], 6),
+        round(feature_info.get('countersink_diameter', 0), 6),
+        round(feature_info.get('countersink_angle', 0), 6),
+        round(feature_info.get('counterbore_diameter', 0), 6),
+        round(feature_info.get('counterbore_depth', 0), 6),
+        tuple(tuple(round(v, 6) for v in row) for row in matrix) if matrix else None,
+        tuple(sorted(feature_info.get('expressions', {}).items()))
+    )
 
-        indent = "    "
 
-        if hole_type == 'countersink':
-            cs_diameter = feature_info.get('countersink_diameter', diameter * 2)
-            cs_angle = feature_info.get('countersink_angle', 90)
-            cs_radius = cs_diameter / 2
-            # Calculate countersink depth from angle and radius difference
-            # For a 90° countersink: depth = radius_diff
-            # For other angles: depth = radius_diff / tan(angle/2)
-            radius_diff = cs_radius - (diameter / 2)
-            half_angle_rad = math.radians(cs_angle / 2)
-            cs_depth = radius_diff / math.tan(half_angle_rad) if half_angle_rad > 0 else radius_diff
-
-            lines.append(f"{indent}union() {{")
-            lines.append(f"{indent}    // Main hole")
-            lines.append(f"{indent}    translate([0, 0, -{epsilon}])")
-            lines.append(f"{indent}        cyl(h={total_h}, r={radius}, anchor=BOTTOM);")
-            lines.append(f"{indent}    // Countersink cone")
-            lines.append(f"{indent}    translate([0, 0, -{format_value(cs_depth)}])")
-            lines.append(f"{indent}        cyl(h={format_value(cs_depth + epsilon)}, r1={format_value(cs_radius)}, r2={radius}, anchor=BOTTOM);")
-            lines.append(f"{indent}}}")
-
-        elif hole_type == 'counterbore':
-            cb_diameter = feature_info.get('counterbore_diameter', diameter * 1.5)
-            cb_depth = feature_info.get('counterbore_depth', 2)
-            cb_radius = format_value(cb_diameter / 2)
+def generate_hole_module_scad(feature_info: dict):
+    """Generate the body of a module drawing one hole at the origin (yields SCAD lines)"""
+    return _hole_shape_scad(feature_info, "")
 
-            lines.append(f"{indent}union() {{")
-            lines.append(f"{indent}    // Main hole")
-            lines.append(f"{indent}    translate([0, 0, -{epsilon}])")
-            lines.append(f"{indent}        cyl(h={total_h}, r={radius}, anchor=BOTTOM);")
-            lines.append(f"{indent}    // Counterbore")
-            lines.append(f"{indent}    translate([0, 0, -{format_value(cb_depth)}])")
-            lines.append(f"{indent}        cyl(h={format_value(cb_depth + epsilon)}, r={cb_radius}, anchor=BOTTOM);")
-            lines.append(f"{indent}}}")
 
+def generate_instances_scad(module_name: str, positions: list, label: str):
+    """Instantiate a module at every position with a for() loop (yields SCAD lines)"""
+    points = ", ".join(
+        f"[{format_value(x)}, {format_value(y)}, {format_value(z)}]" for x, y, z in positions
+    )
+    yield f"// {label}"
+    yield f"for (pos = [{points}])"
+    yield f"    translate(pos) {module_name}();"
+
+
+def _format_vector(vector) -> str:
+    return "[" + ", ".join(format_value(v) for v in vector) + "]"
+
+
+def _pattern_range(feature_info: dict, key: str, symmetric: bool) -> str:
+    """OpenSCAD range over the copy indices of one pattern direction"""
+    expression = feature_info.get('expressions', {}).get(key)
+    if expression is not None:
+        start = f"1 - {expression}" if symmetric else "0"
+        return f"[{start}:{expression} - 1]"
+    count = feature_info[key]
+    return f"[{-(count - 1) if symmetric else 0}:{count - 1}]"
+
+
+def _pattern_step(feature_info: dict, n: str) -> str:
+    """Offset between neighbouring copies in one direction, as a SCAD vector"""
+    direction = feature_info[f'direction_{n}']
+    expression = feature_info.get('expressions', {}).get(f'spacing_{n}')
+    if expression is not None:
+        return f"{expression} * {_format_vector(direction)}"
+    spacing = feature_info[f'spacing_{n}']
+    return _format_vector(tuple(spacing * v for v in direction))
+
+
+def _about_point(origin, transform: str, call: str) -> str:
+    """Apply a transform about a point instead of the origin"""
+    if all(abs(v) < 1e-9 for v in origin):
+        return f"{transform} {call}"
+    return (
+        f"translate({_format_vector(origin)}) {transform} "
+        f"translate({_format_vector(tuple(-v for v in origin))}) {call}"
+    )
+
+
+def _rotate_about_axis(feature_info: dict, angle: str, call: str) -> str:
+    rotate = f"rotate(a={angle}, v={_format_vector(feature_info['axis_direction'])})"
+    return _about_point(feature_info['axis_origin'], rotate, call)
+
+
+def generate_pattern_scad(feature_info: dict, feature_name: str):
+    """Generate one pattern copy loop around a shared feature module (yields SCAD lines).
+
+    The copied feature is drawn once by its module; the original instance is
+    written where the feature itself appears, so every loop skips it.
+    """
+    call = f"{feature_info['module']}();"
+    label = f"{feature_name}: {feature_info['source']}"
+
+    if feature_info['pattern_type'] == 'rectangular':
+        if feature_info['offsets'] is not None:
+            yield from generate_instances_scad(
+                feature_info['module'], feature_info['offsets'],
+                f"{label} (rectangular, {len(feature_info['offsets'])} copies)"
+            )
+            return
+
+        one = _pattern_range(feature_info, 'quantity_one', feature_info['symmetric_one'])
+        step_one = _pattern_step(feature_info, 'one')
+        yield (
+            f"// {label} (rectangular, "
+            f"{feature_info['quantity_one']} x {feature_info['quantity_two']})"
+        )
+        if feature_info['quantity_two'] == 1 and 'quantity_two' not in feature_info.get('expressions', {}):
+            yield f"for (i = {one})"
+            yield f"    if (i != 0) translate(i * {step_one}) {call}"
         else:
-            # Simple hole
-            lines.append(f"{indent}translate([0, 0, -{epsilon}])")
-            lines.append(f"{indent}cyl(h={total_h}, r={radius}, anchor=BOTTOM);")
+            two = _pattern_range(feature_info, 'quantity_two', feature_info['symmetric_two'])
+            step_two = _pattern_step(feature_info, 'two')
+            yield f"for (i = {one}, j = {two})"
+            yield f"    if (i != 0 || j != 0) translate(i * {step_one} + j * {step_two}) {call}"
+        return
+
+    if feature_info['angles'] is not None:
+        angles = ", ".join(format_value(a) for a in feature_info['angles'])
+        yield f"// {label} (circular, {len(feature_info['angles'])} copies)"
+        yield f"for (a = [{angles}])"
+        yield f"    {_rotate_about_axis(feature_info, 'a', call)}"
+        return
+
+    expressions = feature_info.get('expressions', {})
+    if 'quantity' in expressions or 'total_angle' in expressions:
+        quantity = scad_value(feature_info, 'quantity')
+        total = scad_value(feature_info, 'total_angle')
+        divisor = quantity if feature_info['full_circle'] else f"({quantity} - 1)"
+        step = f"({total} / {divisor})"
+        last = f"{quantity} - 1"
+    else:
+        step = format_value(feature_info['step_angle'])
+        last = str(feature_info['quantity'] - 1)
 
-    return lines
+    yield (
+        f"// {label} (circular, {feature_info['quantity']} over "
+        f"{format_value(feature_info['total_angle'])} deg)"
+    )
+    yield f"for (i = [1:{last}])"
+    yield f"    {_rotate_about_axis(feature_info, f'i * {step}', call)}"
+
+
+def generate_mirror_scad(feature_info: dict, feature_name: str):
+    """Generate the mirrored instance of a shared feature module (yields SCAD lines)"""
+    normal = feature_info['plane_normal']
+    # Only the plane's offset along its normal matters to the mirror
+    distance = sum(o * n for o, n in zip(feature_info['plane_origin'], normal))
+    mirror = f"mirror({_format_vector(normal)})"
+
+    yield f"// {feature_name}: {feature_info['source']} (mirror)"
+    yield _about_point(tuple(distance * n for n in normal), mirror, f"{feature_info['module']}();")
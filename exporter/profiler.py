@@ -0,0 +1,160 @@
+#Author: Fusion2SCAD
+#Description: Stage and feature level export profiler with a JSON report
+
+import sys
+import time
+import datetime
+import tracemalloc
+from contextlib import contextmanager
+
+# Identifies profile reports written by ExportProfiler.report()
+PROFILE_FORMAT = 'fusion2scad-profile'
+PROFILE_VERSION = 1
+
+
+class _Span:
+    """Timing of one stage or feature"""
+
+    __slots__ = ('name', 'wall', 'cpu', 'peak', 'mem_start', 'features')
+
+    def __init__(self, name: str):
+        self.name = name
+        self.wall = 0.0
+        self.cpu = 0.0
+        self.peak = None
+        self.mem_start = 0
+        self.features = []
+
+    def as_dict(self) -> dict:
+        result = {
+            'name': self.name,
+            'wall_ms': round(self.wall * 1000, 3),
+            'cpu_ms': round(self.cpu * 1000, 3),
+            'peak_kib': round(self.peak / 1024, 1) if self.peak is not None else None
+        }
+        if self.features:
+            result['features'] = [f.as_dict() for f in self.features]
+        return result
+
+
+class ExportProfiler:
+    """Records wall time, CPU time and peak memory per export stage and feature.
+
+    Stages are entered with stage(name) and features inside a stage with
+    feature(name). Peak memory is the tracemalloc peak above the memory in
+    use when the span started, and is only recorded with trace_memory=True
+    because tracing slows Python down considerably.
+
+    A disabled profiler (the default for SCADExporter) records nothing.
+    """
+
+    def __init__(self, enabled: bool = True, trace_memory: bool = False):
+        self.enabled = enabled
+        self.trace_memory = trace_memory and enabled
+        self.stages = []
+        self._stack = []
+        self._started_tracing = False
+
+    def _enter(self, span: _Span) -> tuple:
+        if self.trace_memory:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+                self._started_tracing = True
+            current, peak = tracemalloc.get_traced_memory()
+            # Fold the peak so far into the enclosing span before resetting it
+            if self._stack:
+                parent = self._stack[-1]
+                parent.peak = max(parent.peak or 0, peak - parent.mem_start)
+            tracemalloc.reset_peak()
+            span.mem_start = current
+        self._stack.append(span)
+        return time.perf_counter(), time.process_time()
+
+    def _exit(self, span: _Span, start: tuple):
+        wall_start, cpu_start = start
+        span.wall += time.perf_counter() - wall_start
+        span.cpu += time.process_time() - cpu_start
+        self._stack.pop()
+
+        if self.trace_memory:
+            _, peak = tracemalloc.get_traced_memory()
+            span.peak = max(span.peak or 0, peak - span.mem_start)
+            if self._stack:
+                parent = self._stack[-1]
+                parent.peak = max(parent.peak or 0, peak - parent.mem_start)
+            elif self._started_tracing:
+                tracemalloc.stop()
+                self._started_tracing = False
+
+    @contextmanager
+    def stage(self, name: str):
+        """Profile one export stage"""
+        if not self.enabled:
+            yield
+            return
+
+        span = _Span(name)
+        self.stages.append(span)
+        start = self._enter(span)
+        try:
+            yield
+        finally:
+            self._exit(span, start)
+
+    @contextmanager
+    def resume(self, name: str):
+        """Charge work done inside the current stage to the earlier stage name.
+
+        Lets a streaming export generate features lazily while writing and
+        still report generation and writing as separate stages.
+        """
+        span = next((s for s in reversed(self.stages) if s.name == name), None)
+        if not self.enabled or not self._stack or span is None or span is self._stack[-1]:
+            yield
+            return
+
+        parent = self._stack[-1]
+        wall, cpu = span.wall, span.cpu
+        start = self._enter(span)
+        try:
+            yield
+        finally:
+            self._exit(span, start)
+            parent.wall -= span.wall - wall
+            parent.cpu -= span.cpu - cpu
+
+    @contextmanager
+    def feature(self, name: str):
+        """Profile one timeline feature inside the current stage"""
+        if not self.enabled or not self._stack:
+            yield
+            return
+
+        span = _Span(name)
+        self._stack[-1].features.append(span)
+        start = self._enter(span)
+        try:
+            yield
+        finally:
+            self._exit(span, start)
+
+    def report(self, design_name: str = None, **extra) -> dict:
+        """Build a machine-readable report of all recorded stages"""
+        stages = [stage.as_dict() for stage in self.stages]
+        peaks = [s['peak_kib'] for s in stages if s['peak_kib'] is not None]
+        return {
+            'format': PROFILE_FORMAT,
+            'version': PROFILE_VERSION,
+            'design_name': design_name,
+            'timestamp': datetime.datetime.now().isoformat(timespec='seconds'),
+            'python': sys.version.split()[0],
+            'trace_memory': self.trace_memory,
+            'totals': {
+                'wall_ms': round(sum(s['wall_ms'] for s in stages), 3),
+                'cpu_ms': round(sum(s['cpu_ms'] for s in stages), 3),
+                'peak_kib': max(peaks) if peaks else None,
+                'features': sum(len(s.get('features', [])) for s in stages)
+            },
+            'stages': stages,
+            **extra
+        }
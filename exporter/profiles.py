@@ -0,0 +1,199 @@
+#Author: Fusion2SCAD
+#Description: Content-addressed table of polygon profiles shared between features
+#
+# A sketch profile that is extruded at several places would otherwise be
+# written out in full every time. Each extracted polygon is moved into its
+# local frame (outer loop's bounding box minimum at the origin) and hashed,
+# so identical shapes get the same name wherever they sit in the sketch.
+# Profiles are first grouped by a cheap key on their raw curve data; only
+# groups that can share a definition are extracted and hashed here, the
+# rest are left to the generation workers.
+#
+# Shared profiles are written as functions. With hoisting enabled every
+# polygon profile is instead written as top-level points/paths constants.
+
+import hashlib
+
+from .utils import format_value
+from .generators import PROFILE_UTILS_AVAILABLE
+
+if PROFILE_UTILS_AVAILABLE:
+    from profile_utils import extract_profile_polygon, format_units
+
+
+def is_polygon_profile(profile: dict) -> bool:
+    """Whether an analyzed profile is written as a polygon rather than a primitive"""
+    return not (profile['is_circle'] or profile.get('is_rounded_rect') or profile['is_rectangle'])
+
+
+# Decimal places (in cm) of the raw coordinates compared by profile_key()
+KEY_DECIMALS = 6
+
+
+def _key_value(value, ox: float, oy: float):
+    """Rounded, translated copy of a captured curve value"""
+    if isinstance(value, (list, tuple)):
+        if len(value) == 2 and not isinstance(value[0], (list, tuple)):
+            return (round(value[0] - ox, KEY_DECIMALS), round(value[1] - oy, KEY_DECIMALS))
+        return tuple(_key_value(item, ox, oy) for item in value)
+    if isinstance(value, float):
+        return round(value, KEY_DECIMALS)
+    return value
+
+
+def profile_key(profile_data: dict) -> tuple:
+    """Cheap translation-invariant key of a captured profile.
+
+    Raw curve coordinates are taken relative to the profile's bounding box
+    and rounded, so copies of a shape get the same key without extracting
+    or formatting their polygons.
+    """
+    ox, oy = profile_data.get('bbox', {}).get('min', (0, 0))[:2]
+    return tuple(
+        (loop.get('is_outer'), tuple(
+            tuple(sorted((field, _key_value(value, ox, oy)) for field, value in curve.items()))
+            for curve in loop['curves']
+        ))
+        for loop in profile_data['loops']
+    )
+
+
+def profile_polygon(profile: dict, tessellation: dict = None) -> dict:
+    """Extract an analyzed profile's polygon once and keep it on the profile.
+
+    Analysis results are reused between exports by the fragment cache, so
+    an unchanged profile is not extracted again. tessellation holds the
+    extract_profile_polygon() arc settings of the export.
+    """
+    if 'polygon' not in profile:
+        profile['polygon'] = extract_profile_polygon(profile['profile_data'], **(tessellation or {}))
+    return profile['polygon']
+
+
+def local_profile(polygon: dict) -> tuple:
+    """Move a polygon into its local frame.
+
+    Returns:
+        (paths, offset): outer loop followed by holes, as formatted
+        coordinate pairs, and the (x, y) offset in mm that puts it back in place
+    """
+    outer = polygon['outer']
+    dx = min(x for x, y in outer)
+    dy = min(y for x, y in outer)
+    loops = [[(x - dx, y - dy) for x, y in loop] for loop in [outer] + polygon['holes']]
+
+    # Outlines repeat most coordinates; format each distinct value once
+    values = {c for loop in loops for point in loop for c in point}
+    decimals = polygon.get('snap_decimals')
+    if decimals is None:
+        text = {value: format_value(value) for value in values}
+    else:
+        text = {value: format_units(value, decimals) for value in values}
+        dx, dy = dx / 10 ** decimals, dy / 10 ** decimals
+    paths = tuple(tuple((text[x], text[y]) for x, y in loop) for loop in loops)
+    return paths, (dx, dy)
+
+
+def profile_name(paths: tuple) -> str:
+    """Content-addressed OpenSCAD name of a local-frame profile"""
+    text = ';'.join(','.join(f"{x} {y}" for x, y in loop) for loop in paths)
+    return f"profile_{hashlib.sha1(text.encode('utf-8')).hexdigest()[:8]}"
+
+
+# Points per line of hoisted profile constants
+POINTS_PER_LINE = 8
+
+
+def generate_profile_function(name: str, paths: tuple) -> list:
+    """Define a profile as a function returning its loops (a BOSL2 region)"""
+    loops = ", ".join(
+        "[" + ", ".join(f"[{x}, {y}]" for x, y in loop) + "]" for loop in paths
+    )
+    return [f"function {name}() = [{loops}];"]
+
+
+def generate_profile_constants(name: str, paths: tuple) -> list:
+    """Define a profile as top-level {name}_points (and {name}_paths) constants"""
+    points = [f"[{x}, {y}]" for loop in paths for x, y in loop]
+    lines = [f"{name}_points = ["]
+    for start in range(0, len(points), POINTS_PER_LINE):
+        row = ", ".join(points[start:start + POINTS_PER_LINE])
+        lines.append(f"    {row}," if start + POINTS_PER_LINE < len(points) else f"    {row}")
+    lines.append("];")
+
+    if len(paths) > 1:
+        ranges = []
+        start = 0
+        for loop in paths:
+            ranges.append(f"[each [{start}:{start + len(loop) - 1}]]")
+            start += len(loop)
+        lines.append(f"{name}_paths = [{', '.join(ranges)}];")
+    return lines
+
+
+def profile_reference(name: str, paths: tuple, hoisted: bool) -> tuple:
+    """SCAD code drawing a defined profile and selecting its outer path.
+
+    Returns:
+        (shape, outer_path)
+    """
+    if not hoisted:
+        return f"region({name}())", f"{name}()[0]"
+    if len(paths) == 1:
+        return f"polygon(points={name}_points)", f"{name}_points"
+    return (
+        f"polygon(points={name}_points, paths={name}_paths)",
+        f"select({name}_points, {name}_paths[0])"
+    )
+
+
+def find_shared_profiles(features: list, hoist: bool = False) -> tuple:
+    """Find polygon profiles used more than once, or every one when hoisting.
+
+    Args:
+        features: (idx, info) pairs of analyzed features
+        hoist: Define every polygon profile as top-level constants
+
+    Returns:
+        (refs, definitions): refs maps a feature idx to ((profile index,
+        shape code, outer path code, offset), ...) for its defined profiles;
+        definitions maps each name to its local-frame paths
+    """
+    groups = {}
+    for idx, info in features:
+        for profile_idx, profile in enumerate(info.get('profiles') or ()):
+            if not is_polygon_profile(profile) or 'profile_data' not in profile:
+                continue
+            try:
+                key = profile_key(profile['profile_data'])
+            except Exception:
+                continue
+            groups.setdefault(key, []).append((idx, profile_idx, profile, info.get('tessellation')))
+
+    # Only profiles with a possible twin (or all, when hoisting) are extracted here
+    uses = {}
+    for places in groups.values():
+        if len(places) < 2 and not hoist:
+            continue
+        for idx, profile_idx, profile, tessellation in places:
+            try:
+                polygon = profile_polygon(profile, tessellation)
+                if not polygon['outer']:
+                    continue
+                paths, offset = local_profile(polygon)
+            except Exception:
+                continue
+            name = profile_name(paths)
+            uses.setdefault(name, (paths, []))[1].append((idx, profile_idx, offset))
+
+    refs = {}
+    definitions = {}
+    for name, (paths, places) in uses.items():
+        if len(places) < 2 and not hoist:
+            continue
+        definitions[name] = paths
+        shape, outer_path = profile_reference(name, paths, hoist)
+        for idx, profile_idx, offset in places:
+            refs.setdefault(idx, []).append((profile_idx, shape, outer_path, offset))
+
+    return {idx: tuple(places) for idx, places in refs.items()}, definitions
@@ -0,0 +1,54 @@
+#Author: Fusion2SCAD
+#Description: Versioned design snapshot format for headless replay of exports
+
+import json
+
+# Identifies snapshot files written by capture_design()
+SNAPSHOT_FORMAT = 'fusion2scad-snapshot'
+
+# Bump when the layout of captured records changes incompatibly
+SNAPSHOT_VERSION = 1
+
+
+def new_snapshot(design_name: str) -> dict:
+    """Create an empty snapshot with the current format header"""
+    return {
+        'format': SNAPSHOT_FORMAT,
+        'version': SNAPSHOT_VERSION,
+        'design_name': design_name,
+        'capture': {},
+        'parameters': [],
+        'timeline': [],
+        'bodies': []
+    }
+
+
+def validate_snapshot(snapshot: dict) -> dict:
+    """Check the format header of a snapshot and return it unchanged.
+
+    Raises:
+        ValueError: If the data is not a snapshot or has an unsupported version
+    """
+    if not isinstance(snapshot, dict) or snapshot.get('format') != SNAPSHOT_FORMAT:
+        raise ValueError("Not a Fusion2SCAD snapshot")
+
+    version = snapshot.get('version')
+    if version != SNAPSHOT_VERSION:
+        raise ValueError(
+            f"Unsupported snapshot version {version} (expected {SNAPSHOT_VERSION})"
+        )
+
+    return snapshot
+
+
+def save_snapshot(snapshot: dict, filepath: str):
+    """Write a snapshot to a JSON file"""
+    with open(filepath, 'w') as f:
+        json.dump(snapshot, f, indent=1)
+
+
+def load_snapshot(filepath: str) -> dict:
+    """Read and validate a snapshot from a JSON file"""
+    with open(filepath, 'r') as f:
+        snapshot = json.load(f)
+    return validate_snapshot(snapshot)
@@ -2,10 +2,14 @@
 #Description: Utility functions for OpenSCAD export
 
 import math
+import re
 
 # Conversion factor: Fusion 360 uses cm internally, OpenSCAD typically uses mm
 CM_TO_MM = 10.0
 
+# Identifiers (parameter names, units, functions) inside a Fusion expression
+_IDENTIFIER = re.compile(r'[A-Za-z_][A-Za-z0-9_]*')
+
 
 def sanitize_name(name: str) -> str:
     """Convert Fusion parameter name to valid OpenSCAD variable name"""
@@ -22,6 +26,13 @@ def format_value(value: float, precision: int = 4) -> str:
     return f"{value:.{precision}f}".rstrip('0').rstrip('.')
 
 
+def expression_identifiers(expression: str) -> list:
+    """Split a Fusion expression into the identifiers it references"""
+    if not expression:
+        return []
+    return _IDENTIFIER.findall(expression)
+
+
 def normal_to_rotation(nx: float, ny: float, nz: float) -> tuple:
     """Convert a normal vector to rotation angles (rx, ry, rz) in degrees.
     This rotates the Z-axis to align with the given normal."""
@@ -40,38 +51,47 @@ def normal_to_rotation(nx: float, ny: float, nz: float) -> tuple:
     return (rx, ry, 0)
 
 
+def _cross(a: tuple, b: tuple) -> tuple:
+    return (
+        a[1] * b[2] - a[2] * b[1],
+        a[2] * b[0] - a[0] * b[2],
+        a[0] * b[1] - a[1] * b[0]
+    )
+
+
+def _normalize(v: tuple) -> tuple:
+    length = math.sqrt(v[0]*v[0] + v[1]*v[1] + v[2]*v[2])
+    if length < 1e-12:
+        return tuple(v)
+    return (v[0] / length, v[1] / length, v[2] / length)
+
+
 def get_rotation_matrix_from_axis(axis) -> list:
     """Construct a rotation matrix (4x4) aligning Z to the given axis.
 
     Args:
-        axis: An adsk.core.Vector3D object
+        axis: (x, y, z) direction vector
 
     Returns:
         4x4 rotation matrix as nested list
     """
-    import adsk.core
-
     # Ensure normalized
-    z_vec = axis.copy()
-    z_vec.normalize()
+    z_vec = _normalize(axis)
 
     # Pick arbitrary vector not parallel to Z
-    if abs(z_vec.x) < 0.9:
-        ref = adsk.core.Vector3D.create(1, 0, 0)
+    if abs(z_vec[0]) < 0.9:
+        ref = (1, 0, 0)
     else:
-        ref = adsk.core.Vector3D.create(0, 1, 0)
+        ref = (0, 1, 0)
 
     # Construct basis vectors
-    x_vec = ref.crossProduct(z_vec)
-    x_vec.normalize()
-
-    y_vec = z_vec.crossProduct(x_vec)
-    y_vec.normalize()
+    x_vec = _normalize(_cross(ref, z_vec))
+    y_vec = _normalize(_cross(z_vec, x_vec))
 
     # Build 4x4 matrix (basis vectors as columns)
     return [
-        [x_vec.x, y_vec.x, z_vec.x, 0],
-        [x_vec.y, y_vec.y, z_vec.y, 0],
-        [x_vec.z, y_vec.z, z_vec.z, 0],
+        [x_vec[0], y_vec[0], z_vec[0], 0],
+        [x_vec[1], y_vec[1], z_vec[1], 0],
+        [x_vec[2], y_vec[2], z_vec[2], 0],
         [0, 0, 0, 1]
     ]
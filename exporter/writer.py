@@ -0,0 +1,80 @@
+#Author: Fusion2SCAD
+#Description: Buffered, indentation-aware writer for streaming SCAD output
+
+import shutil
+from contextlib import contextmanager
+
+
+class SCADWriter:
+    """Streams SCAD lines to a text stream, applying block indentation once.
+
+    Lines are joined with newlines (no trailing newline, matching
+    '\\n'.join()) and handed to the stream in chunks, so the full output is
+    never held in memory.
+    """
+
+    def __init__(self, stream, indent: str = "    ", chunk_lines: int = 1024):
+        self.stream = stream
+        self.indent_str = indent
+        self.chunk_lines = chunk_lines
+        self.depth = 0
+        self.line_count = 0
+        self._prefix = ""
+        self._chunk = []
+
+    def write_line(self, line: str):
+        """Write one line at the current indentation"""
+        if self.line_count:
+            self._chunk.append("\n")
+        self._chunk.append(self._prefix)
+        self._chunk.append(line)
+        self.line_count += 1
+        if len(self._chunk) >= self.chunk_lines * 3:
+            self.flush()
+
+    def write_lines(self, lines):
+        """Write an iterable of lines at the current indentation"""
+        for line in lines:
+            self.write_line(line)
+
+    def _set_depth(self, depth: int):
+        self.depth = depth
+        self._prefix = self.indent_str * depth
+
+    @contextmanager
+    def indented(self):
+        """Indent lines written inside the block by one level"""
+        self._set_depth(self.depth + 1)
+        try:
+            yield self
+        finally:
+            self._set_depth(self.depth - 1)
+
+    @contextmanager
+    def block(self, header: str):
+        """Write 'header {', indent the body, and close it with '}'"""
+        self.write_line(f"{header} {{")
+        with self.indented():
+            yield self
+        self.write_line("}")
+
+    def write_from(self, other: 'SCADWriter'):
+        """Copy everything written to another writer over a readable, seekable stream.
+
+        The other writer's lines keep their own indentation.
+        """
+        other.flush()
+        if not other.line_count:
+            return
+        if self.line_count:
+            self._chunk.append("\n")
+        self.flush()
+        other.stream.seek(0)
+        shutil.copyfileobj(other.stream, self.stream)
+        self.line_count += other.line_count
+
+    def flush(self):
+        """Hand buffered text to the stream"""
+        if self._chunk:
+            self.stream.write(''.join(self._chunk))
+            self._chunk = []
@@ -1,11 +1,95 @@
 #Author: Fusion2SCAD
 #Description: Utilities for extracting and converting Fusion 360 sketch profiles to OpenSCAD polygons
+#
+# Profiles are the plain records produced by exporter.capture, so nothing here
+# needs the Fusion API.
+#
+# With NumPy installed, point generation and duplicate removal for large
+# curves run on arrays; the pure-Python loops remain as the fallback.
 
-import adsk.core, adsk.fusion
 import math
 
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
 CM_TO_MM = 10.0
 
+# Point count from which the NumPy backend is used; below it the array
+# setup costs more than the scalar loop
+NUMPY_MIN_POINTS = 64
+
+
+def _use_numpy(count: int) -> bool:
+    return NUMPY_AVAILABLE and count >= NUMPY_MIN_POINTS
+
+
+def _np_point_list(xs, ys) -> list:
+    """(x, y) float tuples from coordinate arrays"""
+    return list(zip(xs.tolist(), ys.tolist()))
+
+
+def tessellation_segments(radius: float, angle_span: float, chord_tolerance: float,
+                          max_segment_angle: float) -> int:
+    """
+    Number of segments for an arc so that no chord strays further than
+    chord_tolerance from the arc and no segment spans more than max_segment_angle.
+
+    Args:
+        radius: Arc radius in mm
+        angle_span: Swept angle in radians (sign ignored)
+        chord_tolerance: Maximum chord deviation (sagitta) in mm
+        max_segment_angle: Maximum angle per segment in degrees
+
+    Returns:
+        Segment count, at least 1
+
+    Raises:
+        ValueError: chord_tolerance or max_segment_angle is not positive
+    """
+    if chord_tolerance <= 0 or max_segment_angle <= 0:
+        raise ValueError("chord_tolerance and max_segment_angle must be positive")
+    step = math.radians(max_segment_angle)
+    if radius > chord_tolerance / 2:
+        # sagitta = r * (1 - cos(step / 2))
+        step = min(step, 2 * math.acos(1 - chord_tolerance / radius))
+    return max(1, int(math.ceil(abs(angle_span) / step - 1e-9)))
+
+
+def _arc_points(center: tuple, radius: float, start_angle: float, angle_span: float,
+                segments: int) -> list:
+    """Points from start_angle through a signed angle_span, both ends included"""
+    if _use_numpy(segments + 1):
+        angles = start_angle + angle_span * np.arange(segments + 1) / segments
+        return _np_point_list(center[0] + radius * np.cos(angles),
+                              center[1] + radius * np.sin(angles))
+    return [
+        (center[0] + radius * math.cos(start_angle + angle_span * i / segments),
+         center[1] + radius * math.sin(start_angle + angle_span * i / segments))
+        for i in range(segments + 1)
+    ]
+
+
+def _sampled_arc_span(curve: dict, center: tuple, start: tuple, end: tuple) -> tuple:
+    """(start angle, signed span) of a captured arc, with the direction its samples run"""
+    start_angle = math.atan2(start[1] - center[1], start[0] - center[0])
+    end_angle = math.atan2(end[1] - center[1], end[0] - center[0])
+    span = (end_angle - start_angle) % (2 * math.pi)
+    if span < 1e-9:
+        span = 2 * math.pi
+
+    samples = curve.get('samples') or []
+    probe = samples[1] if len(samples) > 1 else curve.get('mid')
+    if probe is not None:
+        px, py = _mm(probe)
+        probe_angle = math.atan2(py - center[1], px - center[0])
+        turn = (probe_angle - start_angle + math.pi) % (2 * math.pi) - math.pi
+        if turn < 0:
+            span -= 2 * math.pi
+    return start_angle, span
+
 
 def approximate_arc_points(center_x: float, center_y: float, radius: float,
                            start_angle: float, end_angle: float,
@@ -29,6 +113,11 @@ def approximate_arc_points(center_x: float, center_y: float, radius: float,
     if angle_span < 0:
         angle_span += 2 * math.pi
 
+    if _use_numpy(segments + 1):
+        angles = start_angle + np.arange(segments + 1) / segments * angle_span
+        return _np_point_list(center_x + radius * np.cos(angles),
+                              center_y + radius * np.sin(angles))
+
     for i in range(segments + 1):
         t = i / segments
         angle = start_angle + t * angle_span
@@ -59,6 +148,13 @@ def approximate_ellipse_points(center_x: float, center_y: float,
     cos_rot = math.cos(rotation)
     sin_rot = math.sin(rotation)
 
+    if _use_numpy(segments):
+        t = 2 * math.pi * np.arange(segments) / segments
+        px = major_radius * np.cos(t)
+        py = minor_radius * np.sin(t)
+        return _np_point_list(center_x + px * cos_rot - py * sin_rot,
+                              center_y + px * sin_rot + py * cos_rot)
+
     for i in range(segments):
         t = 2 * math.pi * i / segments
         # Point on unrotated ellipse
@@ -72,82 +168,85 @@ def approximate_ellipse_points(center_x: float, center_y: float,
     return points
 
 
-def approximate_spline_points(spline, segments: int = 32) -> list:
+def approximate_spline_points(curve: dict) -> list:
     """
     Approximate a spline curve with a series of points.
 
     Args:
-        spline: Fusion 360 SketchFittedSpline or SketchFixedSpline
-        segments: Number of segments
+        curve: Captured SketchFittedSpline or SketchFixedSpline curve record
 
     Returns:
-        List of (x, y) tuples
+        List of (x, y) tuples, including the end point
     """
-    points = []
-    evaluator = spline.geometry.evaluator
+    if 'end' not in curve:
+        return []
 
-    # Get the parameter range
-    (return_val, start_param, end_param) = evaluator.getParameterExtents()
-    if not return_val:
-        return points
-
-    param_span = end_param - start_param
+    points = [(x * CM_TO_MM, y * CM_TO_MM) for x, y in curve.get('samples', [])]
+    points.append((curve['end'][0] * CM_TO_MM, curve['end'][1] * CM_TO_MM))
+    return points
 
-    for i in range(segments + 1):
-        t = start_param + (i / segments) * param_span
-        (return_val, point) = evaluator.getPointAtParameter(t)
-        if return_val:
-            points.append((point.x * CM_TO_MM, point.y * CM_TO_MM))
 
-    return points
+def _mm(point) -> tuple:
+    return (point[0] * CM_TO_MM, point[1] * CM_TO_MM)
 
 
-def extract_profile_polygon(profile: adsk.fusion.Profile, arc_segments: int = 16) -> dict:
+def extract_profile_polygon(profile: dict, arc_segments: int = 16,
+                            chord_tolerance: float = None,
+                            max_segment_angle: float = 15.0,
+                            simplify_tolerance: float = None,
+                            snap_decimals: int = None) -> dict:
     """
-    Extract a complete polygon representation from a Fusion 360 profile.
+    Extract a complete polygon representation from a captured profile.
 
     This function handles curves that may be oriented in either direction by checking
     continuity and using the appropriate endpoint when curves are reversed.
 
     Args:
-        profile: Fusion 360 Profile object
+        profile: Captured profile record (see exporter.capture.capture_profile)
         arc_segments: Number of segments for arc approximation
+        chord_tolerance: Maximum chord deviation in mm. When set, arcs, circles
+            and ellipses are tessellated from their exact geometry with
+            tessellation_segments() instead of fixed segment counts
+        max_segment_angle: Maximum angle per segment in degrees (with chord_tolerance)
+        simplify_tolerance: When set, the loops are reduced with
+            simplify_profile_polygon() to this distance in mm
+        snap_decimals: When set, points are snapped to a grid of
+            10**-snap_decimals mm with snap_polygon() and kept as integers
 
     Returns:
-        Dictionary with 'outer' points and 'holes' list of point lists
+        Dictionary with 'outer' points and 'holes' list of point lists,
+        plus 'snap_decimals' when the points are integer grid units
     """
+    if chord_tolerance is not None and (chord_tolerance <= 0 or max_segment_angle <= 0):
+        # Checked up front: the per-curve fallback below would drop the arcs
+        raise ValueError("chord_tolerance and max_segment_angle must be positive")
+
     result = {
         'outer': [],
         'holes': []
     }
 
-    for loop_idx in range(profile.profileLoops.count):
-        loop = profile.profileLoops.item(loop_idx)
+    def segments(radius, angle_span, fixed):
+        if chord_tolerance is None:
+            return fixed
+        return tessellation_segments(radius, angle_span, chord_tolerance, max_segment_angle)
+
+    for loop in profile['loops']:
         points = []
         last_end = None  # Track the end point of the previous curve for continuity
 
-        curve_count = loop.profileCurves.count
-        for curve_idx in range(curve_count):
-            curve = loop.profileCurves.item(curve_idx)
-            entity = curve.sketchEntity
-            curve_geom = curve.geometry
+        for curve in loop['curves']:
+            curve_type = curve['type']
 
             try:
-                evaluator = curve_geom.evaluator
-                (ret, start_param, end_param) = evaluator.getParameterExtents()
-
-                if not ret:
-                    continue
-
-                # Get both start and end points
-                (ret_s, start_pt) = evaluator.getPointAtParameter(start_param)
-                (ret_e, end_pt) = evaluator.getPointAtParameter(end_param)
+                if curve.get('fallback'):
+                    raise ValueError("curve could not be evaluated")
 
-                if not ret_s or not ret_e:
+                if 'start' not in curve or 'end' not in curve:
                     continue
 
-                start_xy = (start_pt.x * CM_TO_MM, start_pt.y * CM_TO_MM)
-                end_xy = (end_pt.x * CM_TO_MM, end_pt.y * CM_TO_MM)
+                start_xy = _mm(curve['start'])
+                end_xy = _mm(curve['end'])
 
                 # Check if curve is reversed (end connects to last_end instead of start)
                 is_reversed = False
@@ -156,7 +255,7 @@ def extract_profile_polygon(profile: adsk.fusion.Profile, arc_segments: int = 16
                     dist_end = math.sqrt((end_xy[0] - last_end[0])**2 + (end_xy[1] - last_end[1])**2)
                     is_reversed = dist_end < dist_start
 
-                if isinstance(entity, adsk.fusion.SketchLine):
+                if curve_type == 'SketchLine':
                     # For lines, add the connecting point
                     if is_reversed:
                         points.append(end_xy)
@@ -165,73 +264,48 @@ def extract_profile_polygon(profile: adsk.fusion.Profile, arc_segments: int = 16
                         points.append(start_xy)
                         last_end = end_xy
 
-                elif isinstance(entity, adsk.fusion.SketchArc):
-                    # Sample points along the arc in the correct direction
-                    param_span = end_param - start_param
-                    arc_pts = []
-                    for i in range(arc_segments):
-                        t = start_param + (i / arc_segments) * param_span
-                        (ret, pt) = evaluator.getPointAtParameter(t)
-                        if ret:
-                            arc_pts.append((pt.x * CM_TO_MM, pt.y * CM_TO_MM))
-
-                    if is_reversed:
-                        arc_pts.reverse()
-
-                    points.extend(arc_pts)
-                    last_end = end_xy if not is_reversed else start_xy
-
-                elif isinstance(entity, adsk.fusion.SketchCircle):
-                    center = entity.centerSketchPoint.geometry
+                elif curve_type == 'SketchCircle':
+                    cx, cy = _mm(curve['center'])
                     circle_points = approximate_arc_points(
-                        center.x * CM_TO_MM,
-                        center.y * CM_TO_MM,
-                        entity.radius * CM_TO_MM,
+                        cx,
+                        cy,
+                        curve['radius'] * CM_TO_MM,
                         0,
                         2 * math.pi,
-                        arc_segments * 2
+                        segments(curve['radius'] * CM_TO_MM, 2 * math.pi, arc_segments * 2)
                     )
                     points.extend(circle_points[:-1])
                     last_end = circle_points[-2] if circle_points else None
 
-                elif isinstance(entity, adsk.fusion.SketchEllipse):
-                    center = entity.centerSketchPoint.geometry
+                elif curve_type == 'SketchEllipse':
+                    cx, cy = _mm(curve['center'])
                     ellipse_points = approximate_ellipse_points(
-                        center.x * CM_TO_MM,
-                        center.y * CM_TO_MM,
-                        entity.majorRadius * CM_TO_MM,
-                        entity.minorRadius * CM_TO_MM,
+                        cx,
+                        cy,
+                        curve['major_radius'] * CM_TO_MM,
+                        curve['minor_radius'] * CM_TO_MM,
                         0,
-                        arc_segments * 2
+                        segments(curve['major_radius'] * CM_TO_MM, 2 * math.pi, arc_segments * 2)
                     )
                     points.extend(ellipse_points)
                     last_end = ellipse_points[-1] if ellipse_points else None
 
-                elif isinstance(entity, (adsk.fusion.SketchFittedSpline, adsk.fusion.SketchFixedSpline)):
-                    param_span = end_param - start_param
-                    num_samples = arc_segments * 2
-                    spline_pts = []
-                    for i in range(num_samples):
-                        t = start_param + (i / num_samples) * param_span
-                        (ret, pt) = evaluator.getPointAtParameter(t)
-                        if ret:
-                            spline_pts.append((pt.x * CM_TO_MM, pt.y * CM_TO_MM))
-
-                    if is_reversed:
-                        spline_pts.reverse()
-
-                    points.extend(spline_pts)
-                    last_end = end_xy if not is_reversed else start_xy
-
                 else:
-                    # Unknown curve type - sample it
-                    param_span = end_param - start_param
-                    curve_pts = []
-                    for i in range(arc_segments):
-                        t = start_param + (i / arc_segments) * param_span
-                        (ret, pt) = evaluator.getPointAtParameter(t)
-                        if ret:
-                            curve_pts.append((pt.x * CM_TO_MM, pt.y * CM_TO_MM))
+                    # Arcs, splines and unknown curve types were sampled at capture
+                    # time in the direction of their parameter range
+                    exact = curve_type == 'SketchArc' and 'center' in curve and (
+                        chord_tolerance is not None or not curve.get('samples')
+                    )
+                    if exact:
+                        # Re-tessellate from the exact arc, running the same way as the samples
+                        center = _mm(curve['center'])
+                        radius = curve['radius'] * CM_TO_MM
+                        start_angle, span = _sampled_arc_span(curve, center, start_xy, end_xy)
+                        curve_pts = _arc_points(
+                            center, radius, start_angle, span, segments(radius, span, arc_segments)
+                        )[:-1]
+                    else:
+                        curve_pts = [_mm(pt) for pt in curve.get('samples', [])]
 
                     if is_reversed:
                         curve_pts.reverse()
@@ -242,11 +316,9 @@ def extract_profile_polygon(profile: adsk.fusion.Profile, arc_segments: int = 16
             except Exception:
                 # Fallback
                 try:
-                    if isinstance(entity, adsk.fusion.SketchLine):
-                        start = entity.startSketchPoint.geometry
-                        end = entity.endSketchPoint.geometry
-                        start_xy = (start.x * CM_TO_MM, start.y * CM_TO_MM)
-                        end_xy = (end.x * CM_TO_MM, end.y * CM_TO_MM)
+                    if curve_type == 'SketchLine':
+                        start_xy = _mm(curve['start'])
+                        end_xy = _mm(curve['end'])
 
                         # Check continuity
                         if last_end is not None:
@@ -262,15 +334,18 @@ def extract_profile_polygon(profile: adsk.fusion.Profile, arc_segments: int = 16
                             points.append(start_xy)
                             last_end = end_xy
 
-                    elif isinstance(entity, adsk.fusion.SketchArc):
-                        center = entity.centerSketchPoint.geometry
+                    elif curve_type == 'SketchArc':
+                        cx, cy = _mm(curve['center'])
+                        span = curve['end_angle'] - curve['start_angle']
+                        if span < 0:
+                            span += 2 * math.pi
                         arc_points = approximate_arc_points(
-                            center.x * CM_TO_MM,
-                            center.y * CM_TO_MM,
-                            entity.radius * CM_TO_MM,
-                            entity.startAngle,
-                            entity.endAngle,
-                            arc_segments
+                            cx,
+                            cy,
+                            curve['radius'] * CM_TO_MM,
+                            curve['start_angle'],
+                            curve['end_angle'],
+                            segments(curve['radius'] * CM_TO_MM, span, arc_segments)
                         )
                         points.extend(arc_points[:-1])
                         last_end = arc_points[-2] if len(arc_points) > 1 else None
@@ -281,19 +356,186 @@ def extract_profile_polygon(profile: adsk.fusion.Profile, arc_segments: int = 16
         cleaned_points = remove_duplicate_points(points)
 
         # Assign to outer or holes based on loop type
-        if loop.isOuter:
+        if loop['is_outer']:
             result['outer'] = cleaned_points
         else:
             result['holes'].append(cleaned_points)
 
+    if simplify_tolerance:
+        result = simplify_profile_polygon(result, simplify_tolerance)
+    if snap_decimals is not None:
+        result = snap_polygon(result, snap_decimals)
     return result
 
 
+def snap_polygon(polygon: dict, decimals: int) -> dict:
+    """
+    Snap a polygon's points to an integer grid of 10**-decimals mm.
+
+    Points become (x, y) integer tuples counting grid units, so vertices
+    that round to the same grid point are exact duplicates and collapse,
+    and the output text no longer depends on float rounding.
+
+    Args:
+        polygon: Dictionary from extract_profile_polygon() with mm points
+        decimals: Grid resolution in decimal places (3 is 1 micron)
+
+    Returns:
+        Dictionary with 'outer' and 'holes' in grid units and 'snap_decimals'
+    """
+    if decimals < 0:
+        raise ValueError(f"decimals must be 0 or more, got {decimals}")
+    scale = 10 ** decimals
+
+    def snap(loop):
+        points = []
+        for x, y in loop:
+            point = (int(round(x * scale)), int(round(y * scale)))
+            if not points or point != points[-1]:
+                points.append(point)
+        if len(points) > 1 and points[0] == points[-1]:
+            points.pop()
+        return points
+
+    return {
+        'outer': snap(polygon['outer']),
+        'holes': [snap(hole) for hole in polygon['holes']],
+        'snap_decimals': decimals
+    }
+
+
+def format_units(value: int, decimals: int) -> str:
+    """Text of an integer count of 10**-decimals mm grid units (41951, 3 -> "41.951")"""
+    if decimals == 0:
+        return str(value)
+    digits = str(abs(value)).rjust(decimals + 1, '0')
+    whole, fraction = digits[:-decimals], digits[-decimals:].rstrip('0')
+    sign = '-' if value < 0 else ''
+    return f"{sign}{whole}.{fraction}" if fraction else f"{sign}{whole}"
+
+
+def extract_profile_path(profile: dict) -> dict:
+    """
+    Extract a captured profile as exact path segments instead of points.
+
+    Lines and sampled curves (splines, ellipses) become straight runs; arcs
+    and circles keep their center, radius and angles so OpenSCAD can
+    tessellate them at its own $fn.
+
+    Args:
+        profile: Captured profile record (see exporter.capture.capture_profile)
+
+    Returns:
+        Dictionary with 'outer' segments and 'holes' list of segment lists.
+        Segments are ('points', [(x, y), ...]) or
+        ('arc', (cx, cy), radius, start_deg, end_deg), each running up to
+        (not including) the start of the next one
+
+    Raises:
+        ValueError: A curve could not be evaluated at capture time
+    """
+    result = {
+        'outer': [],
+        'holes': []
+    }
+
+    for loop in profile['loops']:
+        segments = []
+        last_end = None
+
+        for curve in loop['curves']:
+            curve_type = curve['type']
+            if curve.get('fallback'):
+                raise ValueError(f"{curve_type} could not be evaluated")
+
+            if curve_type == 'SketchCircle':
+                segments.append(('arc', _mm(curve['center']), curve['radius'] * CM_TO_MM, 0, 360))
+                continue
+            if curve_type == 'SketchEllipse':
+                cx, cy = _mm(curve['center'])
+                segments.append(('points', approximate_ellipse_points(
+                    cx, cy, curve['major_radius'] * CM_TO_MM, curve['minor_radius'] * CM_TO_MM, 0
+                )))
+                continue
+
+            start_xy = _mm(curve['start'])
+            end_xy = _mm(curve['end'])
+            is_reversed = False
+            if last_end is not None:
+                dist_start = math.hypot(start_xy[0] - last_end[0], start_xy[1] - last_end[1])
+                dist_end = math.hypot(end_xy[0] - last_end[0], end_xy[1] - last_end[1])
+                is_reversed = dist_end < dist_start
+            last_end = start_xy if is_reversed else end_xy
+
+            if curve_type == 'SketchLine':
+                segments.append(('points', [end_xy if is_reversed else start_xy]))
+            elif curve_type == 'SketchArc' and 'center' in curve:
+                center = _mm(curve['center'])
+                start_angle, span = _sampled_arc_span(curve, center, start_xy, end_xy)
+                if is_reversed:
+                    start_angle, span = start_angle + span, -span
+                segments.append((
+                    'arc', center, curve['radius'] * CM_TO_MM,
+                    math.degrees(start_angle), math.degrees(start_angle + span)
+                ))
+            else:
+                curve_pts = [_mm(pt) for pt in curve.get('samples', [])]
+                if is_reversed:
+                    curve_pts.reverse()
+                segments.append(('points', curve_pts))
+
+        # Merge consecutive straight runs
+        merged = []
+        for segment in segments:
+            if segment[0] == 'points' and merged and merged[-1][0] == 'points':
+                merged[-1] = ('points', merged[-1][1] + segment[1])
+            else:
+                merged.append(segment)
+
+        if loop['is_outer']:
+            result['outer'] = merged
+        else:
+            result['holes'].append(merged)
+
+    return result
+
+
+def format_path_scad(segments: list, precision: int = 4) -> str:
+    """
+    Format exact path segments as a BOSL2 path expression.
+
+    Args:
+        segments: One loop from extract_profile_path()
+        precision: Decimal precision for coordinates and angles
+
+    Returns:
+        OpenSCAD expression: a point list, an arc() call, or concat() of them
+    """
+
+    parts = []
+    for segment in segments:
+        if segment[0] == 'points':
+            parts.append(f"[{format_points(segment[1], precision)}]")
+        else:
+            (cx, cy), radius, start, end = segment[1:]
+            r, cx, cy, start, end = format_coordinates((radius, cx, cy, start, end), precision)
+            parts.append(
+                f"arc(r={r}, cp=[{cx}, {cy}], angle=[{start}, {end}], endpoint=false)"
+            )
+
+    if len(parts) == 1:
+        return parts[0]
+    return f"concat({', '.join(parts)})"
+
+
 def remove_duplicate_points(points: list, tolerance: float = 0.001) -> list:
     """Remove consecutive duplicate points within tolerance"""
     if not points:
         return points
 
+    if _use_numpy(len(points)):
+        return _np_remove_duplicate_points(points, tolerance)
+
     cleaned = [points[0]]
     for pt in points[1:]:
         last = cleaned[-1]
@@ -304,28 +546,325 @@ def remove_duplicate_points(points: list, tolerance: float = 0.001) -> list:
     return cleaned
 
 
-def format_polygon_scad(points: list, precision: int = 4) -> str:
+def _segment_distance(pt: tuple, a: tuple, b: tuple) -> float:
+    """Distance from pt to the segment a-b"""
+    dx, dy = b[0] - a[0], b[1] - a[1]
+    length_sq = dx * dx + dy * dy
+    if length_sq == 0:
+        return math.hypot(pt[0] - a[0], pt[1] - a[1])
+    t = max(0.0, min(1.0, ((pt[0] - a[0]) * dx + (pt[1] - a[1]) * dy) / length_sq))
+    return math.hypot(pt[0] - a[0] - t * dx, pt[1] - a[1] - t * dy)
+
+
+def _rdp_indices(points: list, first: int, last: int, tolerance: float) -> list:
+    """Ramer-Douglas-Peucker on points[first..last]; kept indices, last excluded"""
+    kept = []
+    stack = [(first, last)]
+    while stack:
+        start, end = stack.pop()
+        farthest, max_dist = None, tolerance
+        for i in range(start + 1, end):
+            dist = _segment_distance(points[i], points[start], points[end])
+            if dist > max_dist:
+                farthest, max_dist = i, dist
+        if farthest is None:
+            kept.append(start)
+        else:
+            # Second half is pushed first so the first half is finished first
+            stack.append((farthest, end))
+            stack.append((start, farthest))
+    return kept
+
+
+def _simplify_loop(loop: list, tolerance: float) -> list:
+    """RDP on a closed loop, split at its first point and the point farthest from it"""
+    n = len(loop)
+    if n <= 3:
+        return list(range(n))
+    split = max(range(1, n), key=lambda i: math.hypot(loop[i][0] - loop[0][0],
+                                                      loop[i][1] - loop[0][1]))
+    closed = loop + [loop[0]]
+    kept = _rdp_indices(closed, 0, split, tolerance) + _rdp_indices(closed, split, n, tolerance)
+    if len(kept) < 3:
+        # Keep at least a triangle: add the point farthest from the split chord
+        apex = max((i for i in range(1, n) if i != split),
+                   key=lambda i: _segment_distance(loop[i], loop[0], loop[split]))
+        kept = sorted([0, split, apex])
+    return kept
+
+
+def _orientation(a: tuple, b: tuple, c: tuple) -> float:
+    return (b[0] - a[0]) * (c[1] - a[1]) - (b[1] - a[1]) * (c[0] - a[0])
+
+
+def _segments_cross(p1: tuple, p2: tuple, q1: tuple, q2: tuple) -> bool:
+    """Whether two segments intersect or touch"""
+    d1 = _orientation(q1, q2, p1)
+    d2 = _orientation(q1, q2, p2)
+    d3 = _orientation(p1, p2, q1)
+    d4 = _orientation(p1, p2, q2)
+    if ((d1 > 0) != (d2 > 0) and d1 != 0 and d2 != 0
+            and (d3 > 0) != (d4 > 0) and d3 != 0 and d4 != 0):
+        return True
+
+    def on_segment(a, b, c, d):
+        return d == 0 and min(a[0], b[0]) <= c[0] <= max(a[0], b[0]) \
+            and min(a[1], b[1]) <= c[1] <= max(a[1], b[1])
+
+    return (on_segment(q1, q2, p1, d1) or on_segment(q1, q2, p2, d2)
+            or on_segment(p1, p2, q1, d3) or on_segment(p1, p2, q2, d4))
+
+
+def _point_in_loop(pt: tuple, loop: list) -> bool:
+    """Even-odd point in polygon test"""
+    inside = False
+    x, y = pt
+    j = len(loop) - 1
+    for i in range(len(loop)):
+        (xi, yi), (xj, yj) = loop[i], loop[j]
+        if (yi > y) != (yj > y) and x < (xj - xi) * (y - yi) / (yj - yi) + xi:
+            inside = not inside
+        j = i
+    return inside
+
+
+def _crossing_spans(loops: list, kept: list) -> set:
+    """(loop, span) pairs of simplified segments that touch another segment.
+
+    A sweep over x finds segment pairs whose extents overlap; neighbouring
+    segments of the same loop share an end point and are skipped.
+    """
+    segments = []
+    for loop_idx, (loop, indices) in enumerate(zip(loops, kept)):
+        count = len(indices)
+        for k in range(count):
+            a, b = loop[indices[k]], loop[indices[(k + 1) % count]]
+            segments.append((min(a[0], b[0]), max(a[0], b[0]), loop_idx, k, count, a, b))
+    segments.sort(key=lambda segment: segment[0])
+
+    bad = set()
+    active = []
+    for segment in segments:
+        min_x, max_x, loop_idx, k, count, a, b = segment
+        active = [other for other in active if other[1] >= min_x]
+        for other in active:
+            if other[2] == loop_idx:
+                gap = abs(other[3] - k)
+                if gap == 1 or gap == count - 1:
+                    continue
+            if max(a[1], b[1]) < min(other[5][1], other[6][1]) or \
+                    min(a[1], b[1]) > max(other[5][1], other[6][1]):
+                continue
+            if _segments_cross(a, b, other[5], other[6]):
+                bad.add((loop_idx, k))
+                bad.add((other[2], other[3]))
+        active.append(segment)
+    return bad
+
+
+def _containment_spans(loops: list, kept: list) -> set:
+    """(loop, span) pairs whose simplification moved another loop in or out of it"""
+    simplified = [[loop[i] for i in indices] for loop, indices in zip(loops, kept)]
+    bad = set()
+    for i, loop in enumerate(loops):
+        for j, other in enumerate(loops):
+            if i == j:
+                continue
+            probe = other[kept[j][0]]
+            if _point_in_loop(probe, loop) != _point_in_loop(probe, simplified[i]):
+                count = len(kept[i])
+                nearest = min(range(count), key=lambda k: _segment_distance(
+                    probe, simplified[i][k], simplified[i][(k + 1) % count]))
+                bad.add((i, nearest))
+    return bad
+
+
+def simplify_profile_polygon(polygon: dict, tolerance: float) -> dict:
+    """
+    Simplify a polygon's loops with Ramer-Douglas-Peucker.
+
+    Each loop keeps only the points needed to stay within tolerance of the
+    original. Simplified segments that would touch another segment, or that
+    would move a hole across the outer loop (or one hole across another),
+    get back the farthest dropped point of their span until the loops are
+    as disjoint as the originals.
+
+    Args:
+        polygon: Dictionary from extract_profile_polygon()
+        tolerance: Maximum distance in mm a dropped point may lie from the result
+
+    Returns:
+        Dictionary with 'outer' points and 'holes' list of point lists
+    """
+    if not tolerance or tolerance <= 0 or not polygon['outer']:
+        return polygon
+
+    loops = [polygon['outer']] + polygon['holes']
+    kept = [_simplify_loop(loop, tolerance) for loop in loops]
+
+    while True:
+        bad = _crossing_spans(loops, kept) | _containment_spans(loops, kept)
+        if not bad:
+            break
+
+        restored = {}
+        for loop_idx, k in bad:
+            loop, indices = loops[loop_idx], kept[loop_idx]
+            n = len(loop)
+            start = indices[k]
+            end = indices[(k + 1) % len(indices)]
+            span = range(start + 1, end if end > start else end + n)
+            farthest = max(span, default=None, key=lambda i: _segment_distance(
+                loop[i % n], loop[start], loop[end]))
+            if farthest is not None:
+                restored.setdefault(loop_idx, set()).add(farthest % n)
+
+        for loop_idx, indices in restored.items():
+            kept[loop_idx] = sorted(set(kept[loop_idx]) | indices)
+
+        if not restored:
+            # Crossings that remain are in the original geometry
+            break
+
+    return {
+        'outer': [loops[0][i] for i in kept[0]],
+        'holes': [[loop[i] for i in indices] for loop, indices in zip(loops[1:], kept[1:])]
+    }
+
+
+def _np_remove_duplicate_points(points: list, tolerance: float) -> list:
+    """remove_duplicate_points() with the distances to the previous point as an array.
+
+    A point is compared with the last kept point, which is its predecessor
+    unless that was dropped, so only the runs following a dropped point are
+    walked one by one.
+    """
+    coords = np.asarray(points, dtype=float)
+    gaps = np.hypot(*(coords[1:] - coords[:-1]).T)
+    close = np.flatnonzero(gaps <= tolerance) + 1
+    if not len(close):
+        return list(points)
+
+    keep = np.ones(len(points), dtype=bool)
+    resume = 0  # first point after the last walked run; it is kept
+    for i in close.tolist():
+        if i <= resume:
+            continue
+        last = coords[i - 1]
+        while i < len(points) and math.hypot(coords[i][0] - last[0],
+                                             coords[i][1] - last[1]) <= tolerance:
+            keep[i] = False
+            i += 1
+        resume = i
+    return [pt for pt, kept in zip(points, keep.tolist()) if kept]
+
+
+# Coordinates looked at to choose how format_points() formats a point list
+FORMAT_SAMPLE_SIZE = 1024
+
+
+def _strip_zeros(text: str, precision: int) -> str:
+    """Strip trailing zeros (and the point) from every "%.Nf" number followed by , or ]"""
+    if precision < 1:
+        # "%.0f" has no decimals; its zeros belong to the integer part
+        return text
+    step = 1
+    while step * 2 <= precision:
+        step *= 2
+    # Runs of up to 2 * step - 1 zeros come off in one replace per power of two
+    while step:
+        zeros = '0' * step
+        text = text.replace(zeros + ',', ',').replace(zeros + ']', ']')
+        step //= 2
+    return text.replace('.,', ',').replace('.]', ']')
+
+
+def format_coordinates(values, precision: int = 4) -> list:
+    """
+    Format numbers for OpenSCAD output, each distinct value only once.
+
+    The text matches f"{value:.{precision}f}" with trailing zeros and point
+    stripped. Integer values skip the float formatting, and negative zero is
+    written as "0".
+
+    Args:
+        values: Iterable of numbers
+        precision: Decimal precision
+
+    Returns:
+        List of strings, one per value
+    """
+    values = list(values)
+    spec = f".{precision}f"
+    table = {}
+    for value in set(values):
+        if value == int(value):
+            table[value] = str(int(value))
+        else:
+            text = format(value, spec)
+            if precision > 0:
+                text = text.rstrip('0').rstrip('.')
+            table[value] = '0' if text == '-0' else text
+    return [table[value] for value in values]
+
+
+def format_points(points: list, precision: int = 4, separator: str = ", ",
+                  snap_decimals: int = None) -> str:
+    """
+    Format a point list as OpenSCAD "[x, y]" text in one pass.
+
+    Outlines made of lines and symmetric arcs repeat most coordinates, so
+    when at most half of a leading sample is distinct each coordinate is
+    formatted once (format_coordinates). Otherwise the whole list is
+    formatted with a single % operation and the trailing zeros are stripped
+    from the text.
+
+    Args:
+        points: List of (x, y) tuples
+        precision: Decimal precision
+        separator: Text between points
+        snap_decimals: The points are integer grid units (see snap_polygon());
+            each distinct value is written with format_units()
+
+    Returns:
+        The "[x, y]" strings joined with separator
+    """
+    if not points:
+        return ""
+    flat = [c for point in points for c in point]
+    if snap_decimals is not None:
+        table = {value: format_units(value, snap_decimals) for value in set(flat)}
+        texts = iter([table[value] for value in flat])
+        return separator.join(["[%s, %s]" % pair for pair in zip(texts, texts)])
+
+    sample = flat[:FORMAT_SAMPLE_SIZE]
+    if 2 * len(set(sample)) <= len(sample):
+        texts = iter(format_coordinates(flat, precision))
+        return separator.join(["[%s, %s]" % pair for pair in zip(texts, texts)])
+
+    item = f"[%.{precision}f, %.{precision}f]"
+    text = _strip_zeros(separator.join([item] * len(points)) % tuple(flat) + ",", precision)[:-1]
+    return text.replace("[-0,", "[0,").replace(" -0]", " 0]")
+
+
+def format_polygon_scad(points: list, precision: int = 4, snap_decimals: int = None) -> str:
     """
     Format a list of points as an OpenSCAD polygon.
 
     Args:
         points: List of (x, y) tuples
         precision: Decimal precision for coordinates
+        snap_decimals: The points are integer grid units (see snap_polygon())
 
     Returns:
         OpenSCAD polygon() call as string
     """
-    formatted_points = []
-    for x, y in points:
-        fx = f"{x:.{precision}f}".rstrip('0').rstrip('.')
-        fy = f"{y:.{precision}f}".rstrip('0').rstrip('.')
-        formatted_points.append(f"[{fx}, {fy}]")
-
-    points_str = ",\n        ".join(formatted_points)
+    points_str = format_points(points, precision, ",\n        ", snap_decimals)
     return f"polygon(points=[\n        {points_str}\n    ])"
 
 
-def format_polygon_with_holes_scad(outer: list, holes: list, precision: int = 4) -> str:
+def format_polygon_with_holes_scad(outer: list, holes: list, precision: int = 4,
+                                   snap_decimals: int = None) -> str:
     """
     Format a polygon with holes for OpenSCAD.
 
@@ -333,6 +872,7 @@ def format_polygon_with_holes_scad(outer: list, holes: list, precision: int = 4)
         outer: List of (x, y) tuples for outer boundary
         holes: List of lists of (x, y) tuples for holes
         precision: Decimal precision
+        snap_decimals: The points are integer grid units (see snap_polygon())
 
     Returns:
         OpenSCAD polygon() call with paths as string
@@ -345,22 +885,26 @@ def format_polygon_with_holes_scad(outer: list, holes: list, precision: int = 4)
         all_points.extend(hole)
         paths.append(list(range(start_idx, start_idx + len(hole))))
 
-    # Format points
-    formatted_points = []
-    for x, y in all_points:
-        fx = f"{x:.{precision}f}".rstrip('0').rstrip('.')
-        fy = f"{y:.{precision}f}".rstrip('0').rstrip('.')
-        formatted_points.append(f"[{fx}, {fy}]")
-
-    points_str = ",\n        ".join(formatted_points)
+    points_str = format_points(all_points, precision, ",\n        ", snap_decimals)
     paths_str = ", ".join(str(p) for p in paths)
 
     return f"polygon(\n    points=[\n        {points_str}\n    ],\n    paths=[{paths_str}]\n)"
 
 
-def detect_shape_type(profile: adsk.fusion.Profile) -> dict:
+def _bbox_center_size(profile: dict) -> tuple:
+    """Return (center, width, height) in mm from a captured profile bounding box"""
+    min_pt = profile['bbox']['min']
+    max_pt = profile['bbox']['max']
+    width = (max_pt[0] - min_pt[0]) * CM_TO_MM
+    height = (max_pt[1] - min_pt[1]) * CM_TO_MM
+    center_x = (min_pt[0] + max_pt[0]) / 2 * CM_TO_MM
+    center_y = (min_pt[1] + max_pt[1]) / 2 * CM_TO_MM
+    return (center_x, center_y), width, height
+
+
+def detect_shape_type(profile: dict) -> dict:
     """
-    Analyze a profile to detect if it's a standard shape.
+    Analyze a captured profile to detect if it's a standard shape.
 
     Returns dict with:
         - 'type': 'circle', 'rectangle', 'rounded_rect', 'polygon'
@@ -368,72 +912,49 @@ def detect_shape_type(profile: adsk.fusion.Profile) -> dict:
     """
     result = {'type': 'polygon'}
 
-    loops = profile.profileLoops
-    if loops.count != 1:
+    loops = profile['loops']
+    if len(loops) != 1:
         return result  # Has holes, treat as polygon
 
-    loop = loops.item(0)
-    curves = loop.profileCurves
+    curves = loops[0]['curves']
 
     # Single circle
-    if curves.count == 1:
-        entity = curves.item(0).sketchEntity
-        if isinstance(entity, adsk.fusion.SketchCircle):
-            center = entity.centerSketchPoint.geometry
+    if len(curves) == 1:
+        curve = curves[0]
+        if curve['type'] == 'SketchCircle':
             return {
                 'type': 'circle',
-                'center': (center.x * CM_TO_MM, center.y * CM_TO_MM),
-                'radius': entity.radius * CM_TO_MM
+                'center': _mm(curve['center']),
+                'radius': curve['radius'] * CM_TO_MM
             }
 
     # Rectangle (4 lines)
-    if curves.count == 4:
-        all_lines = all(
-            isinstance(curves.item(i).sketchEntity, adsk.fusion.SketchLine)
-            for i in range(4)
-        )
+    if len(curves) == 4:
+        all_lines = all(c['type'] == 'SketchLine' for c in curves)
         if all_lines:
-            bbox = profile.boundingBox
-            min_pt = bbox.minPoint
-            max_pt = bbox.maxPoint
-            width = (max_pt.x - min_pt.x) * CM_TO_MM
-            height = (max_pt.y - min_pt.y) * CM_TO_MM
-            center_x = (min_pt.x + max_pt.x) / 2 * CM_TO_MM
-            center_y = (min_pt.y + max_pt.y) / 2 * CM_TO_MM
+            center, width, height = _bbox_center_size(profile)
 
             return {
                 'type': 'rectangle',
-                'center': (center_x, center_y),
+                'center': center,
                 'width': width,
                 'height': height
             }
 
     # Rounded rectangle (4 lines + 4 arcs)
-    if curves.count == 8:
-        lines = []
-        arcs = []
-        for i in range(curves.count):
-            entity = curves.item(i).sketchEntity
-            if isinstance(entity, adsk.fusion.SketchLine):
-                lines.append(entity)
-            elif isinstance(entity, adsk.fusion.SketchArc):
-                arcs.append(entity)
+    if len(curves) == 8:
+        lines = [c for c in curves if c['type'] == 'SketchLine']
+        arcs = [c for c in curves if c['type'] == 'SketchArc']
 
         if len(lines) == 4 and len(arcs) == 4:
             # Check if all arcs have same radius
-            radii = [arc.radius * CM_TO_MM for arc in arcs]
+            radii = [arc['radius'] * CM_TO_MM for arc in arcs]
             if max(radii) - min(radii) < 0.01:  # Within tolerance
-                bbox = profile.boundingBox
-                min_pt = bbox.minPoint
-                max_pt = bbox.maxPoint
-                width = (max_pt.x - min_pt.x) * CM_TO_MM
-                height = (max_pt.y - min_pt.y) * CM_TO_MM
-                center_x = (min_pt.x + max_pt.x) / 2 * CM_TO_MM
-                center_y = (min_pt.y + max_pt.y) / 2 * CM_TO_MM
+                center, width, height = _bbox_center_size(profile)
 
                 return {
                     'type': 'rounded_rect',
-                    'center': (center_x, center_y),
+                    'center': center,
                     'width': width,
                     'height': height,
                     'rounding': radii[0]
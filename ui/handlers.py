@@ -8,17 +8,35 @@ import os
 import json
 import datetime
 
-from exporter import SCADExporter
+from exporter import SCADExporter, FragmentCache
+from exporter.profiler import ExportProfiler
 
 # Global app references
 app = adsk.core.Application.get()
 ui = app.userInterface
 
+# Per-feature SCAD fragments reused between exports in this Fusion session
+fragment_cache = FragmentCache()
+
 # Command identifiers
 COMMAND_ID = 'Fusion2SCAD_Export'
 COMMAND_NAME = 'Export to OpenSCAD'
 COMMAND_DESCRIPTION = 'Export parametric design to OpenSCAD with BOSL2 support'
 
+# Command dialog options; all of them are off by default
+SAVE_SNAPSHOT_INPUT = 'Fusion2SCAD_SaveSnapshot'
+CACHE_API_READS_INPUT = 'Fusion2SCAD_CacheAPIReads'
+PROFILE_EXPORT_INPUT = 'Fusion2SCAD_ProfileExport'
+
+
+def _option(inputs, input_id: str) -> bool:
+    """Value of a command dialog checkbox (False when it is missing)"""
+    try:
+        control = inputs.itemById(input_id)
+        return bool(control and control.value)
+    except:
+        return False
+
 
 class ExportCommandExecuteHandler(adsk.core.CommandEventHandler):
     """Handler for when the export command is executed"""
@@ -29,6 +47,7 @@ class ExportCommandExecuteHandler(adsk.core.CommandEventHandler):
     def notify(self, args):
         try:
             design = adsk.fusion.Design.cast(app.activeProduct)
+            inputs = args.command.commandInputs
 
             if not design:
                 ui.messageBox('No active Fusion 360 design found.\nPlease open a design first.')
@@ -55,26 +74,55 @@ class ExportCommandExecuteHandler(adsk.core.CommandEventHandler):
             filepath = file_dialog.filename
 
             # Export the design
-            exporter = SCADExporter(design)
-            scad_content = exporter.export()
+            profiling = _option(inputs, PROFILE_EXPORT_INPUT)
+            profiler = ExportProfiler(enabled=profiling)
+            exporter = SCADExporter(
+                design,
+                cache_api_reads=_option(inputs, CACHE_API_READS_INPUT),
+                collect_api_stats=profiling,
+                profiler=profiler,
+                fragment_cache=fragment_cache
+            )
 
-            # Write SCAD file
-            with open(filepath, 'w') as f:
-                f.write(scad_content)
+            # Stream the SCAD file straight to disk
+            exporter.export_file(filepath)
 
             # Also export debug JSON
             debug_filepath = filepath.replace('.scad', '_debug.json')
             debug_data = exporter.export_debug_json()
-            with open(debug_filepath, 'w') as f:
-                json.dump(debug_data, f, indent=2)
+            with profiler.stage('write_debug_json'):
+                with open(debug_filepath, 'w') as f:
+                    json.dump(debug_data, f, indent=2)
+
+            written = [f'SCAD File: {filepath}', f'Debug JSON: {debug_filepath}']
+
+            # Save the captured snapshot for headless replay when asked to
+            if _option(inputs, SAVE_SNAPSHOT_INPUT):
+                snapshot_filepath = filepath.replace('.scad', '_snapshot.json')
+                exporter.save_snapshot(snapshot_filepath)
+                written.append(f'Snapshot: {snapshot_filepath}')
+
+            # Write the Fusion API call summary for profiling slow designs
+            if profiling:
+                api_stats_filepath = filepath.replace('.scad', '_api_stats.json')
+                with open(api_stats_filepath, 'w') as f:
+                    json.dump(exporter.api_stats_report(), f, indent=2)
+                written.append(f'API stats: {api_stats_filepath}')
+
+            # Write the stage/feature timing report
+            if profiling:
+                profile_filepath = filepath.replace('.scad', '_profile.json')
+                with open(profile_filepath, 'w') as f:
+                    json.dump(exporter.profile_report(), f, indent=2)
+                written.append(f'Profile: {profile_filepath}')
 
             # Show success message with summary
             param_count = len(exporter.parameters)
             feature_count = len(debug_data['features'])
+            written_files = '\n'.join(written)
             ui.messageBox(
                 f'Export successful!\n\n'
-                f'SCAD File: {filepath}\n'
-                f'Debug JSON: {debug_filepath}\n\n'
+                f'{written_files}\n\n'
                 f'Parameters exported: {param_count}\n'
                 f'Features exported: {feature_count}\n\n'
                 f'Note: Make sure BOSL2 is installed in your OpenSCAD libraries folder.'
@@ -95,6 +143,12 @@ class ExportCommandCreatedHandler(adsk.core.CommandCreatedEventHandler):
         try:
             cmd = args.command
 
+            # Optional outputs, chosen before the file dialog opens
+            inputs = cmd.commandInputs
+            inputs.addBoolValueInput(SAVE_SNAPSHOT_INPUT, 'Save snapshot for replay', True, '', False)
+            inputs.addBoolValueInput(CACHE_API_READS_INPUT, 'Cache Fusion API reads', True, '', False)
+            inputs.addBoolValueInput(PROFILE_EXPORT_INPUT, 'Write profiling reports', True, '', False)
+
             # Connect to the execute event
             on_execute = ExportCommandExecuteHandler()
             cmd.execute.add(on_execute)